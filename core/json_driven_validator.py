@@ -20,13 +20,27 @@ Usage:
 import json
 import os
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple
 import sys
 
 # Add reference code path
 _current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.join(_current_dir, 'reference code'))
-from step99 import get_loan_terms_metadata
+from step99 import get_loan_terms_metadata, LOAN_TERMS_LABELS
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str, date_format: str = '%Y-%m-%d') -> Tuple[Optional[datetime], Optional[str]]:
+    """Parse a date string once for all rules; returns (datetime, None) or (None, error text)."""
+    try:
+        return datetime.strptime(value, date_format), None
+    except ValueError as e:
+        return None, str(e)
+
+
+# "TABLE:FIELD" -> display name, shared by every validator instance
+_DISPLAY_NAMES = {f"{table}:{field}": display_name for (table, field), display_name in LOAN_TERMS_LABELS.items()}
 
 
 class JSONValidator:
@@ -47,14 +61,12 @@ class JSONValidator:
         self.rules_file = rules_file
         self.metadata = get_loan_terms_metadata()
         self._metadata_lookup = self._build_metadata_lookup()
+        # path -> (mtime, parsed rules); files are re-read only when they change
+        self._rules_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
 
     def _build_metadata_lookup(self) -> Dict[str, str]:
         """Build quick lookup for field display names."""
-        lookup = {}
-        for meta in self.metadata:
-            key = f"{meta['TABLE']}:{meta['FIELD']}"
-            lookup[key] = meta['DISPLAYNAME']
-        return lookup
+        return _DISPLAY_NAMES
 
     def _get_display_name(self, table: str, field: str) -> str:
         """Get display name for a field."""
@@ -62,10 +74,21 @@ class JSONValidator:
         return self._metadata_lookup.get(key, field)
 
     def load_rules(self, rules_file: Optional[str] = None) -> Dict[str, Any]:
-        """Load validation rules from JSON file."""
+        """Load validation rules from JSON file (cached until the file is modified)."""
         file_path = rules_file or self.rules_file
+        mtime = os.path.getmtime(file_path)
+        cached = self._rules_cache.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
         with open(file_path, 'r') as f:
-            return json.load(f)
+            rules_data = json.load(f)
+        self._rules_cache[file_path] = (mtime, rules_data)
+        return rules_data
+
+    def warm(self) -> None:
+        """Load the rules file ahead of the first validation."""
+        self.load_rules()
 
     def validate(
         self,
@@ -203,11 +226,10 @@ class JSONValidator:
         for record in records:
             for field in fields:
                 if field in record:
-                    try:
-                        datetime.strptime(record[field], date_format)
-                    except ValueError as e:
+                    _, error = _parse_date(record[field], date_format)
+                    if error is not None:
                         display_name = self._get_display_name(entity, field)
-                        user_msg = str(e).replace('%Y-%m-%d', 'YYYY-MM-DD')
+                        user_msg = error.replace('%Y-%m-%d', 'YYYY-MM-DD')
                         message = f'"{display_name}" has a problem: {user_msg}.'
                         self._add_message(buffer, entity, record.get('ID'), field, message)
 
@@ -262,8 +284,12 @@ class JSONValidator:
         for record in records:
             if field1 in record and field2 in record:
                 try:
-                    dt1 = datetime.strptime(record[field1], '%Y-%m-%d').date()
-                    dt2 = datetime.strptime(record[field2], '%Y-%m-%d').date()
+                    parsed1, error1 = _parse_date(record[field1])
+                    parsed2, error2 = _parse_date(record[field2])
+                    if error1 is not None or error2 is not None:
+                        continue
+                    dt1 = parsed1.date()
+                    dt2 = parsed2.date()
 
                     # Check relationship
                     op_symbol = operator_map.get(operator, '<')
@@ -1,10 +1,49 @@
 #!/usr/bin/env python
 
-from typing import Any, Dict
+from collections import namedtuple
+from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
 
 
+_INV_360 = 1.0 / 360.0
+
+# Only the pricing fields read while walking the schedule, extracted once per zone
+PricingZone = namedtuple(
+    "PricingZone",
+    [
+        "interest_rate_type",
+        "accrual_rate",
+        "all_in_rate",
+        "index_code",
+        "floor_rate",
+        "ceiling_rate",
+        "spread",
+        "interest_accrual_method",
+        "partial_interest_accrual_method",
+    ],
+)
+
+
+def compact_pricing_zones(pricing_details: List[Dict[str, Any]]) -> List[PricingZone]:
+    """Convert PRICING_DETAILS into a list of PricingZone tuples, indexed by zone."""
+    return [
+        PricingZone(
+            interest_rate_type=zone["LLC_BI__INTEREST_RATE_TYPE__C"],
+            accrual_rate=zone.get("CM_ACCRUED_RATE__C", 0),
+            all_in_rate=zone.get("LLC_BI__ALL_IN_RATE__C"),
+            index_code=zone.get("LLC_BI__INDEX__C"),
+            floor_rate=zone.get("LLC_BI__RATE_FLOOR__C", 0),
+            ceiling_rate=zone.get("LLC_BI__RATE_CEILING__C", 9999),
+            spread=zone.get("LLC_BI__SPREAD__C", 0),
+            interest_accrual_method=zone.get("CM_INTEREST_ACCRUAL_METHOD__C", "Actual_360"),
+            partial_interest_accrual_method=zone.get("CM_PARTIAL_PERIOD_INTERST_ACCRUAL_METHOD__C"),
+        )
+        for zone in pricing_details
+    ]
+
+
 def get_index_value(index_code: str, index_date, work_days_prior_to_index: int) -> float:
     """Fetch the index rate for the given code/date (currently stubbed)."""
     print(
@@ -16,36 +55,31 @@ def get_index_value(index_code: str, index_date, work_days_prior_to_index: int)
 
 
 def get_interest_rate(
-    row: Dict[str, Any],
-    pricing_details: Dict[str, Any],
+    accrual_start_date,
+    zone: PricingZone,
     loan_closing_date,
 ) -> tuple[float, float, float]:
-    """Determine interest rate details for the given accrual row and pricing descriptor."""
+    """Determine interest rate details for the given accrual period and pricing zone."""
 
     work_days_prior_to_index = 2
-    interest_rate_type = pricing_details["LLC_BI__INTEREST_RATE_TYPE__C"]
-    accrual_rate = pricing_details.get("CM_ACCRUED_RATE__C", 0)
+    interest_rate_type = zone.interest_rate_type
+    accrual_rate = zone.accrual_rate
 
     if interest_rate_type == "Fixed":
-        all_in_rate = pricing_details["LLC_BI__ALL_IN_RATE__C"]
-        base_rate = all_in_rate - accrual_rate
+        base_rate = zone.all_in_rate - accrual_rate
     else:
-        index_code = pricing_details["LLC_BI__INDEX__C"]
         if interest_rate_type == "Floating with Index":
-            start_date = row["accrual_start_date"]
+            start_date = accrual_start_date
         else:  # Fixed with Index
             start_date = loan_closing_date
 
-        index_rate = get_index_value(index_code, start_date, work_days_prior_to_index)
-        floor_rate = pricing_details.get("LLC_BI__RATE_FLOOR__C", 0)
-        ceiling_rate = pricing_details.get("LLC_BI__RATE_CEILING__C", 9999)
-        spread = pricing_details.get("LLC_BI__SPREAD__C", 0)
+        index_rate = get_index_value(zone.index_code, start_date, work_days_prior_to_index)
 
-        base_rate = max(index_rate, floor_rate)
-        if ceiling_rate > 0:
-            base_rate = min(base_rate, ceiling_rate)
+        base_rate = max(index_rate, zone.floor_rate)
+        if zone.ceiling_rate > 0:
+            base_rate = min(base_rate, zone.ceiling_rate)
 
-        base_rate = base_rate + spread - accrual_rate
+        base_rate = base_rate + zone.spread - accrual_rate
 
     return interest_rate_type, base_rate, accrual_rate
 
@@ -70,7 +104,7 @@ def adjust_accrual_days_for_30_360(accrual_start_date, accrual_end_date, interes
 
 
 def get_interest_accrual_multiplier(
-    pricing_details,
+    zone: PricingZone,
     is_complete_period,
     units,
     accrual_start_date,
@@ -78,9 +112,9 @@ def get_interest_accrual_multiplier(
 ):
 
     if not is_complete_period:
-        interest_accrual_method = pricing_details["CM_PARTIAL_PERIOD_INTERST_ACCRUAL_METHOD__C"]
+        interest_accrual_method = zone.partial_interest_accrual_method
     else:
-        interest_accrual_method = pricing_details.get("CM_INTEREST_ACCRUAL_METHOD__C", "Actual_360")
+        interest_accrual_method = zone.interest_accrual_method
 
     actual_accrual_days, adjusted_30_360_accrual_days = adjust_accrual_days_for_30_360(
         accrual_start_date, accrual_end_date, interest_accrual_method
@@ -88,12 +122,12 @@ def get_interest_accrual_multiplier(
 
     interest_accrual_multiplier = 0
     if interest_accrual_method == "Actual_360":
-        interest_accrual_multiplier = (1 / 360) * actual_accrual_days
+        interest_accrual_multiplier = actual_accrual_days * _INV_360
     if interest_accrual_method == "30_360":
-       interest_accrual_multiplier = (1 / 360) * adjusted_30_360_accrual_days 
+       interest_accrual_multiplier = adjusted_30_360_accrual_days * _INV_360
 
     # for P&I 
-    p_n_i_interest_multiplier = (1 / 360) * adjusted_30_360_accrual_days  
+    p_n_i_interest_multiplier = adjusted_30_360_accrual_days * _INV_360
 
 
 
@@ -101,14 +135,27 @@ def get_interest_accrual_multiplier(
     return interest_accrual_multiplier, interest_accrual_method, actual_accrual_days, adjusted_30_360_accrual_days, p_n_i_interest_multiplier
 
 
+# Columns produced by process_amort_row, in the order of the tuple it returns
+AMORT_ROW_COLUMNS = [
+    ("interest_accrual_method", object),
+    ("actual_accrual_days", np.int64),
+    ("adjusted_30_360_accrual_days", np.float64),
+    ("interest_rate_type", object),
+    ("period_multiplier", np.float64),
+    ("p_n_i_interest_multiplier", np.float64),
+    ("base_interest_rate", np.float64),
+    ("accrual_interest_rate", np.float64),
+]
+
+
 def process_amort_row(
-    row: Dict[str, Any],
-    pricing_details: Dict[str, Any],
+    accrual_start_date,
+    accrual_end_date,
+    is_complete_period,
+    units,
+    zone: PricingZone,
     loan_closing_date,
-) -> Dict[str, Any]:
-    accrual_start_date = row["accrual_start_date"]
-    accrual_end_date = row["accrual_end_date"]
-
+) -> tuple:
     (
         interest_accrual_multiplier,
         interest_accrual_method,
@@ -116,28 +163,22 @@ def process_amort_row(
         adjusted_30_360_accrual_days,
         p_n_i_interest_multiplier
     ) = get_interest_accrual_multiplier(
-        pricing_details, row["_is_complete_period"], row["_units"], accrual_start_date, accrual_end_date
+        zone, is_complete_period, units, accrual_start_date, accrual_end_date
     )
     interest_rate_type, base_rate, accrual_rate = get_interest_rate(
-        row, pricing_details, loan_closing_date
+        accrual_start_date, zone, loan_closing_date
     )
 
-    row.update(
-        {
-            "interest_accrual_method": interest_accrual_method,
-            "actual_accrual_days": actual_accrual_days,
-            "adjusted_30_360_accrual_days": adjusted_30_360_accrual_days,
-            "interest_rate_type": interest_rate_type,
-            "period_multiplier": interest_accrual_multiplier,
-            "p_n_i_interest_multiplier": p_n_i_interest_multiplier,
-            "base_interest_rate": base_rate,
-            "accrual_interest_rate": accrual_rate,
-            "period_base_interest_multiplier": (base_rate / 100) * interest_accrual_multiplier,
-            "period_accrual_interest_multiplier": (accrual_rate / 100) * interest_accrual_multiplier,
-            "period_p_n_i_interest_multiplier": (base_rate / 100) * p_n_i_interest_multiplier
-        }
+    return (
+        interest_accrual_method,
+        actual_accrual_days,
+        adjusted_30_360_accrual_days,
+        interest_rate_type,
+        interest_accrual_multiplier,
+        p_n_i_interest_multiplier,
+        base_rate,
+        accrual_rate,
     )
-    return row
 
 
 def generate_interest_and_pik_multipliers(
@@ -154,9 +195,36 @@ def generate_interest_and_pik_multipliers(
     Returns:
         DataFrame containing interest and PIK multipliers.
     """
-    records = transactions_with_draws.to_dict("records")
-    for row in records:
-        zone_index = int(row["_pricing_zone_index"])
-        pricing_details = loan_terms["PRICING_DETAILS"][zone_index]
-        process_amort_row(row, pricing_details, loan_terms["LLC_BI__CLOSEDATE__C"])
-    return pd.DataFrame(records)
+    zones = compact_pricing_zones(loan_terms["PRICING_DETAILS"])
+    loan_closing_date = loan_terms["LLC_BI__CLOSEDATE__C"]
+
+    n = len(transactions_with_draws)
+    outputs = [np.empty(n, dtype=dtype) for _, dtype in AMORT_ROW_COLUMNS]
+
+    rows = transactions_with_draws[
+        ["accrual_start_date", "accrual_end_date", "_is_complete_period", "_units", "_pricing_zone_index"]
+    ].itertuples(index=False, name=None)
+    for i, (accrual_start_date, accrual_end_date, is_complete_period, units, zone_index) in enumerate(rows):
+        values = process_amort_row(
+            accrual_start_date,
+            accrual_end_date,
+            is_complete_period,
+            units,
+            zones[int(zone_index)],
+            loan_closing_date,
+        )
+        for output, value in zip(outputs, values):
+            output[i] = value
+
+    new_columns = {name: output for (name, _), output in zip(AMORT_ROW_COLUMNS, outputs)}
+    # rates are in percent; the period multipliers are derived over whole columns
+    base_rate_fraction = new_columns["base_interest_rate"] / 100
+    new_columns["period_base_interest_multiplier"] = base_rate_fraction * new_columns["period_multiplier"]
+    new_columns["period_accrual_interest_multiplier"] = (
+        new_columns["accrual_interest_rate"] / 100
+    ) * new_columns["period_multiplier"]
+    new_columns["period_p_n_i_interest_multiplier"] = base_rate_fraction * new_columns["p_n_i_interest_multiplier"]
+    # a handful of distinct labels repeated on every row
+    new_columns["interest_accrual_method"] = pd.Categorical(new_columns["interest_accrual_method"])
+    new_columns["interest_rate_type"] = pd.Categorical(new_columns["interest_rate_type"])
+    return transactions_with_draws.assign(**new_columns)
@@ -1,29 +1,60 @@
 #!/usr/bin/env python
 
-from typing import Any, Dict
+from typing import Dict
 
 import json
-from datetime import datetime
 
 import numpy as np
 import numpy_financial as npf
 import pandas as pd
 
-capitalized_draw_unfunded_bucket: Dict[str, float] = {}
+# payment_type_next_month is held as a categorical; the loop branches on its int8 codes
+PAYMENT_TYPE_DTYPE = pd.CategoricalDtype(categories=["Interest Only", "Principal & Interest"])
+INTEREST_ONLY = 0
+PRINCIPAL_AND_INTEREST = 1
+NO_PAYMENT_TYPE = -1
+END_OF_SCHEDULE = -2  # last row has no next month - the outstanding principal falls due
 
 
-def parse_date(value: Any):
-    if isinstance(value, str):
-        return datetime.strptime(value, "%Y-%m-%d").date()
-    return value
+DRAW_DETAILS_DATE_KEYS = ("CM_DRAW_DATE_DEADLINE__C", "END_DATE")
 
 
-def apply_row_index_for_principal_calc(pricing_schedule: pd.DataFrame) -> None:
-    mask = (pricing_schedule["calculate_principal_for_next_month"] == 1) & (
-        pricing_schedule["payment_type_next_month"] == "Principal & Interest"
-    )
-    pricing_schedule["principal_payment_index"] = 0
-    pricing_schedule.loc[mask, "principal_payment_index"] = range(1, mask.sum() + 1)
+def decode_draw_details(details_values: np.ndarray) -> np.ndarray:
+    """
+    Decode a draw:<draw_type>:details column once per schedule.
+
+    Returns an object array holding the parsed dict for each row (None where the row has no
+    details), with the date fields already converted to datetime.date.
+    """
+    decoded = np.full(len(details_values), None, dtype=object)
+    present = np.flatnonzero(pd.notna(details_values))
+    decoded[present] = [json.loads(details_values[i]) for i in present]
+
+    for key in DRAW_DETAILS_DATE_KEYS:
+        dates = pd.to_datetime(
+            pd.Series([decoded[i].get(key) for i in present], dtype=object),
+            format="%Y-%m-%d",
+            errors="coerce",
+        )
+        for i, value in zip(present, dates):
+            decoded[i][key] = None if pd.isna(value) else value.date()
+    return decoded
+
+
+def get_principal_payment_index(calculate_principal_for_next_month: pd.Series, payment_type_next_month: pd.Series) -> np.ndarray:
+    """Number the P&I rows 1, 2, ... in schedule order; every other row gets 0."""
+    mask = ((calculate_principal_for_next_month == 1) & (payment_type_next_month == "Principal & Interest")).to_numpy()
+    principal_payment_index = np.zeros(len(mask), dtype=np.int64)
+    principal_payment_index[mask] = np.arange(1, mask.sum() + 1)
+    return principal_payment_index
+
+
+def get_payment_type_codes(payment_type_next_month: pd.Series) -> np.ndarray:
+    """Return int8 codes for the categorical payment_type_next_month column."""
+    codes = payment_type_next_month.cat.codes.to_numpy(dtype=np.int8, copy=True)
+    if len(codes) > 0:
+        codes[-1] = END_OF_SCHEDULE
+    return codes
 
 
 def cumprinc(rate, nper, pv, start_period, end_period, when=0, a_b_factor=1):
@@ -34,45 +65,64 @@ def cumprinc(rate, nper, pv, start_period, end_period, when=0, a_b_factor=1):
     return payment / a_b_factor
 
 
-def calc_draw_amount(row, principal_due_at_start_of_period, interest_due_at_start_of_period, cummulative_pik_amount_due):
+def get_draw_column_groups(columns):
+    """
+    Group the draw:<draw_type>:details columns with their amount/unfunded counterparts.
+
+    Returns a list of (details_column, amount_column, unfunded_column, is_capitalized_interest)
+    tuples, computed once per schedule instead of once per row.
+    """
+    groups = []
+    for details_column in columns:
+        if details_column.startswith('draw:') and details_column.endswith(':details'):
+            groups.append((
+                details_column,
+                details_column.replace('details', 'amount'),
+                details_column.replace('details', 'unfunded'),
+                'Capitalized Interest' in details_column,
+            ))
+    return groups
+
+
+def calc_draw_amount(i, is_draw, accrual_start_date, draw_groups, draw_values, draw_details_values, amount_drawn, interest_due_at_start_of_period, capitalized_draw_unfunded_bucket):
     # dynamic draw calc - draw must be calculated before interest and principals are calculated
+    # draw_values maps every draw:* column to its (writable) column array; i is the current row position
+    # draw_details_values maps each Capitalized Interest details column to its decoded rows (see decode_draw_details)
+    # capitalized_draw_unfunded_bucket tracks what is left in each unfunded bucket for the schedule being processed
+    # returns True when a capitalized interest draw was added to amount_drawn[i]
 
-        #identfy columns that are of format draw:<draw_type>:details
-        col_starting_with_draw = [type for type in row.keys() if type.startswith('draw:')]
-        col_ending_with_details = [type for type in col_starting_with_draw if type.endswith(':details')]
-        draw_types = [d.split(':')[1].split('[')[0].strip() for d in col_ending_with_details]
-    
-        for i,draw_type in enumerate(draw_types):
-            corresponding_amount_column_name = col_ending_with_details[i].replace('details','amount')
-            corresponding_unfunded_column_name = col_ending_with_details[i].replace('details','unfunded')
-            actual_column_name = col_ending_with_details[i]
-
-            if(row['is_draw'] == 1):
+        drew = False
+        for actual_column_name, corresponding_amount_column_name, corresponding_unfunded_column_name, is_capitalized_interest in draw_groups:
+            amount_values = draw_values[corresponding_amount_column_name]
+            unfunded_values = draw_values[corresponding_unfunded_column_name]
+
+            if(is_draw == 1):
                 
                 if(corresponding_unfunded_column_name not in capitalized_draw_unfunded_bucket.keys()):
-                    capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] = row[corresponding_unfunded_column_name]
+                    capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] = unfunded_values[i]
                      
-                #get the draw_details json
-                draw_details = row[actual_column_name]
-                
-                if('Capitalized Interest' in actual_column_name):
+                if(is_capitalized_interest):
                     
-                    if(pd.isna(draw_details)):
+                    #get the decoded draw_details
+                    draw_details = draw_details_values[actual_column_name][i]
+
+                    if(draw_details is None):
                         # this will happen when draw is happening from a different bucket and not from this current bucket
-                        row[corresponding_unfunded_column_name] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]                    
+                        unfunded_values[i] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]                    
                     else:
-                        draw_details = json.loads(draw_details)
                         #account = draw_details['ACCOUNT']
                         
-                        if('CM_DRAW_RESET_TYPE__C' in draw_details.keys() and draw_details['CM_DRAW_RESET_TYPE__C'] == 'Push to Deadline' and parse_date(draw_details['CM_DRAW_DATE_DEADLINE__C']) == row['accrual_start_date'].date()):
-                            row['amount_drawn'] = row['amount_drawn'] + capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
-                            row[corresponding_amount_column_name] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
-                            row[corresponding_unfunded_column_name] = 0
+                        if('CM_DRAW_RESET_TYPE__C' in draw_details.keys() and draw_details['CM_DRAW_RESET_TYPE__C'] == 'Push to Deadline' and draw_details['CM_DRAW_DATE_DEADLINE__C'] == accrual_start_date):
+                            amount_drawn[i] = amount_drawn[i] + capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
+                            drew = True
+                            amount_values[i] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
+                            unfunded_values[i] = 0
                             
-                        elif('CM_DRAW_RESET_TYPE__C' in draw_details.keys() and draw_details['CM_DRAW_RESET_TYPE__C'] == 'Push to End Date' and parse_date(draw_details['END_DATE']) == row['accrual_start_date'].date()):
-                            row['amount_drawn'] = row['amount_drawn'] + capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
-                            row[corresponding_amount_column_name] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
-                            row[corresponding_unfunded_column_name] = 0
+                        elif('CM_DRAW_RESET_TYPE__C' in draw_details.keys() and draw_details['CM_DRAW_RESET_TYPE__C'] == 'Push to End Date' and draw_details['END_DATE'] == accrual_start_date):
+                            amount_drawn[i] = amount_drawn[i] + capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
+                            drew = True
+                            amount_values[i] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
+                            unfunded_values[i] = 0
                             
                         else:
 
@@ -80,120 +130,217 @@ def calc_draw_amount(row, principal_due_at_start_of_period, interest_due_at_star
                             if(capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] < interest_due_at_start_of_period):
                                 paid_out_of_capitalized_interest_bucket = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] #whatever is left
                                 
-                            row['amount_drawn'] = row['amount_drawn'] + paid_out_of_capitalized_interest_bucket
-                            row[corresponding_amount_column_name] = paid_out_of_capitalized_interest_bucket
-                            row[corresponding_unfunded_column_name] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] - paid_out_of_capitalized_interest_bucket
+                            amount_drawn[i] = amount_drawn[i] + paid_out_of_capitalized_interest_bucket
+                            drew = True
+                            amount_values[i] = paid_out_of_capitalized_interest_bucket
+                            unfunded_values[i] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] - paid_out_of_capitalized_interest_bucket
                                 
-                        capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] = row[corresponding_unfunded_column_name]             
-
-            elif('Capitalized Interest' in actual_column_name): #no draw but we are still working with a Capitalied Interest
-                row[corresponding_unfunded_column_name] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
-
+                        capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name] = unfunded_values[i]             
+
+            elif(is_capitalized_interest): #no draw but we are still working with a Capitalied Interest
+                unfunded_values[i] = capitalized_draw_unfunded_bucket[corresponding_unfunded_column_name]
+
+        return drew
+
+
+
+# Columns written by calc_interest_and_principal_dues. The first four are only filled on
+# some rows (depending on whether interest is due) and stay NaN elsewhere.
+DUES_COLUMNS = [
+    "interest_paid_at_start",
+    "p_n_i_interest_due_at_start",
+    "base_interest_amount_unpaid_from_previous_period",
+    "p_n_i_interest_carried_from_previous_period",
+    "principal_paid_at_start",
+    "cummulative_outstanding_principal",
+    "base_interest_amount_due_for_this_period",
+    "base_interest_amount_due_at_start_of_next_period",
+    "p_n_i_interest_due_for_this_period",
+    "p_n_i_interest_amount_due_at_start_of_next_period",
+    "cummulative_pik_amount_due",
+    "principal_due_at_start_of_next_period",
+]
+
+# Principal columns that stay int64 (as the per-row dicts produced) when every value
+# in them is an int: integer draws with no P&I amortization or capitalized interest
+INT_PRINCIPAL_COLUMNS = [
+    "principal_paid_at_start",
+    "cummulative_outstanding_principal",
+    "principal_due_at_start_of_next_period",
+]
+
+# Columns read by calc_interest_and_principal_dues, in the order of the row tuple it receives
+DUES_INPUT_COLUMNS = [
+    "is_draw",
+    "accrual_start_date",
+    "is_interest_due_at_start",
+    "period_base_interest_multiplier",
+    "period_p_n_i_interest_multiplier",
+    "period_accrual_interest_multiplier",
+    "calculate_principal_for_next_month",
+    "amortization_term",
+    "principal_payment_index",
+]
 
 
 def calc_interest_and_principal_dues(
+    i,
     row,
+    payment_type_code,
+    out,
+    draw_groups,
+    draw_values,
+    draw_details_values,
+    amount_drawn,
+    capitalized_draw_unfunded_bucket,
     cumulative_outstanding_principal,
     principal_due_at_start_of_period,
     interest_due_at_start_of_period,
     cumulative_pik_amount_due,
     p_n_i_interest_accrued,
-    a_b_amount_factor=1
+    a_b_amount_factor=1,
+    amount_drawn_is_int=False,
 ):
-    calc_draw_amount(row, principal_due_at_start_of_period, interest_due_at_start_of_period, cumulative_pik_amount_due)
+    (
+        is_draw,
+        accrual_start_date,
+        is_interest_due_at_start,
+        period_base_interest_multiplier,
+        period_p_n_i_interest_multiplier,
+        period_accrual_interest_multiplier,
+        calculate_principal_for_next_month,
+        amortization_term,
+        principal_payment_index,
+    ) = row
+
+    drew = calc_draw_amount(
+        i, is_draw, accrual_start_date, draw_groups, draw_values, draw_details_values, amount_drawn,
+        interest_due_at_start_of_period, capitalized_draw_unfunded_bucket,
+    )
 
 
-    row["principal_paid_at_start"] = principal_due_at_start_of_period
+    out["principal_paid_at_start"][i] = principal_due_at_start_of_period
 
     interest_moved = 0
     p_n_i_interest_moved = 0
-    if row["is_interest_due_at_start"] == 1:
-        row["interest_paid_at_start"] = interest_due_at_start_of_period
-        row["p_n_i_interest_due_at_start"] = p_n_i_interest_accrued 
+    if is_interest_due_at_start == 1:
+        out["interest_paid_at_start"][i] = interest_due_at_start_of_period
+        out["p_n_i_interest_due_at_start"][i] = p_n_i_interest_accrued 
 
     else:
         interest_moved = interest_due_at_start_of_period
-        row["base_interest_amount_unpaid_from_previous_period"] = interest_moved
+        out["base_interest_amount_unpaid_from_previous_period"][i] = interest_moved
 
         p_n_i_interest_moved = p_n_i_interest_accrued
-        row["p_n_i_interest_carried_from_previous_period"] = p_n_i_interest_moved
+        out["p_n_i_interest_carried_from_previous_period"][i] = p_n_i_interest_moved
 
 
-    row["cummulative_outstanding_principal"] = (
-        cumulative_outstanding_principal + row["amount_drawn"] - row["principal_paid_at_start"]
+    # Integer draws keep the principal columns in integer arithmetic (and int64 in the
+    # output); a capitalized interest draw makes the row's amount a float
+    amount = int(amount_drawn[i]) if amount_drawn_is_int and not drew else amount_drawn[i]
+    cummulative_outstanding_principal = (
+        cumulative_outstanding_principal + amount - principal_due_at_start_of_period
     )
+    out["cummulative_outstanding_principal"][i] = cummulative_outstanding_principal
 
-    row["base_interest_amount_due_for_this_period"] = (
-        row["period_base_interest_multiplier"] * row["cummulative_outstanding_principal"]
+    out["base_interest_amount_due_for_this_period"][i] = (
+        period_base_interest_multiplier * cummulative_outstanding_principal
     )
-    row["base_interest_amount_due_at_start_of_next_period"] = interest_moved + (
-        row["period_base_interest_multiplier"] * row["cummulative_outstanding_principal"]
+    base_interest_amount_due_at_start_of_next_period = interest_moved + (
+        period_base_interest_multiplier * cummulative_outstanding_principal
     )
+    out["base_interest_amount_due_at_start_of_next_period"][i] = base_interest_amount_due_at_start_of_next_period
 
-    row["p_n_i_interest_due_for_this_period"] = (
-        row["period_p_n_i_interest_multiplier"] * row["cummulative_outstanding_principal"]
+    out["p_n_i_interest_due_for_this_period"][i] = (
+        period_p_n_i_interest_multiplier * cummulative_outstanding_principal
     ) 
 
-    row["p_n_i_interest_amount_due_at_start_of_next_period"] = p_n_i_interest_moved + (
-        row["period_p_n_i_interest_multiplier"] * row["cummulative_outstanding_principal"]
+    p_n_i_interest_amount_due_at_start_of_next_period = p_n_i_interest_moved + (
+        period_p_n_i_interest_multiplier * cummulative_outstanding_principal
     )
+    out["p_n_i_interest_amount_due_at_start_of_next_period"][i] = p_n_i_interest_amount_due_at_start_of_next_period
 
 
 
-    row["cummulative_pik_amount_due"] = cumulative_pik_amount_due + (
-        row["cummulative_outstanding_principal"] + cumulative_pik_amount_due
-    ) * row["period_accrual_interest_multiplier"]
+    cummulative_pik_amount_due = cumulative_pik_amount_due + (
+        cummulative_outstanding_principal + cumulative_pik_amount_due
+    ) * period_accrual_interest_multiplier
+    out["cummulative_pik_amount_due"][i] = cummulative_pik_amount_due
 
-    row["principal_due_at_start_of_next_period"] = 0
-    if not row["payment_type_next_month"]:
-        row["principal_due_at_start_of_next_period"] = row["cummulative_outstanding_principal"]
-    elif row["payment_type_next_month"] == "Interest Only":
-        row["principal_due_at_start_of_next_period"] = 0
-    elif row["payment_type_next_month"] == "Principal & Interest":
+    principal_due_at_start_of_next_period = 0
+    if payment_type_code == END_OF_SCHEDULE:
+        principal_due_at_start_of_next_period = cummulative_outstanding_principal
+    elif payment_type_code == INTEREST_ONLY:
+        principal_due_at_start_of_next_period = 0
+    elif payment_type_code == PRINCIPAL_AND_INTEREST:
         # Only calculate P&I if the next row actually has principal due (not a draw/maturity row)
-        if row.get("calculate_principal_for_next_month") == True:
-            amortization_term = row["amortization_term"]
-            row["principal_due_at_start_of_next_period"] = cumprinc(
-                row["period_p_n_i_interest_multiplier"],
-                amortization_term - row["principal_payment_index"] + 1,
-                row["cummulative_outstanding_principal"],
-                row["principal_payment_index"],
-                row["principal_payment_index"],
+        if calculate_principal_for_next_month == True:
+            principal_due_at_start_of_next_period = cumprinc(
+                period_p_n_i_interest_multiplier,
+                amortization_term - principal_payment_index + 1,
+                cummulative_outstanding_principal,
+                principal_payment_index,
+                principal_payment_index,
                 0,
                 a_b_amount_factor,
-            ) - row["p_n_i_interest_amount_due_at_start_of_next_period"]
-        # else: principal_due_at_start_of_next_period remains 0 (set at line 147)
+            ) - p_n_i_interest_amount_due_at_start_of_next_period
+        # else: principal_due_at_start_of_next_period remains 0
+    out["principal_due_at_start_of_next_period"][i] = principal_due_at_start_of_next_period
 
     return (
-        row["cummulative_outstanding_principal"],
-        row["principal_due_at_start_of_next_period"],
-        row["base_interest_amount_due_at_start_of_next_period"],
-        row["cummulative_pik_amount_due"],
-        row["p_n_i_interest_amount_due_at_start_of_next_period"]
+        cummulative_outstanding_principal,
+        principal_due_at_start_of_next_period,
+        base_interest_amount_due_at_start_of_next_period,
+        cummulative_pik_amount_due,
+        p_n_i_interest_amount_due_at_start_of_next_period
 
     )
 
 
 def calc_interest_and_principal(pricing_schedule: pd.DataFrame, a_b_amount_factor: float = 1) -> pd.DataFrame:
-    pricing_schedule["amount_drawn"] = pricing_schedule["amount_drawn"].fillna(0)
-    pricing_schedule["principal_paid_at_start"] = pricing_schedule["principal_paid_at_start"].fillna(0)
-    pricing_schedule["is_interest_due_at_start"] = pricing_schedule["is_interest_due_at_start"].fillna(0)
-
-    pricing_schedule["payment_type_next_month"] = pricing_schedule["payment_type"].shift(-1)
+    # pricing_schedule is only read; every derived or updated column goes into new_cols
+    filled = pricing_schedule[["amount_drawn", "is_interest_due_at_start"]].fillna(
+        {"amount_drawn": 0.0, "is_interest_due_at_start": 0}
+    )
+    new_cols = {
+        "amount_drawn": filled["amount_drawn"],
+        "is_interest_due_at_start": filled["is_interest_due_at_start"],
+        "payment_type_next_month": pricing_schedule["payment_type"].shift(-1).astype(PAYMENT_TYPE_DTYPE),
+    }
 
     if('is_principal_due_at_start' in pricing_schedule):
-        pricing_schedule["calculate_principal_for_next_month"] = pricing_schedule["is_principal_due_at_start"].shift(-1)
+        new_cols["calculate_principal_for_next_month"] = pricing_schedule["is_principal_due_at_start"].shift(-1)
     else: 
-        pricing_schedule["is_principal_due_at_start"] = 0
-        pricing_schedule["calculate_principal_for_next_month"] = pricing_schedule["is_principal_due_at_start"].shift(-1)
+        new_cols["is_principal_due_at_start"] = pd.Series(0, index=pricing_schedule.index)
+        new_cols["calculate_principal_for_next_month"] = new_cols["is_principal_due_at_start"].shift(-1)
 
 
     if('amortization_term' in pricing_schedule.keys()):
-        pricing_schedule["amortization_term"] = pricing_schedule["amortization_term"].shift(-1)
+        new_cols["amortization_term"] = pricing_schedule["amortization_term"].shift(-1)
 
-    apply_row_index_for_principal_calc(pricing_schedule)
+    new_cols["principal_payment_index"] = get_principal_payment_index(
+        new_cols["calculate_principal_for_next_month"], new_cols["payment_type_next_month"]
+    )
 
-    records = pricing_schedule.to_dict("records")
+    n = len(pricing_schedule)
+    out = {col: np.full(n, np.nan) for col in DUES_COLUMNS}
+    if "interest_paid_at_start" in pricing_schedule:
+        out["interest_paid_at_start"] = pricing_schedule["interest_paid_at_start"].to_numpy(dtype=np.float64, copy=True)
+
+    # draw columns are updated in place by calc_draw_amount
+    draw_groups = get_draw_column_groups(pricing_schedule.columns)
+    amount_drawn_is_int = pd.api.types.is_integer_dtype(new_cols["amount_drawn"])
+    amount_drawn = new_cols["amount_drawn"].to_numpy(dtype=np.float64, copy=True)
+    draw_values = {
+        col: pricing_schedule[col].to_numpy(copy=True) if col.endswith(':details')
+        else pricing_schedule[col].to_numpy(dtype=np.float64, copy=True)
+        for col in pricing_schedule.columns if col.startswith('draw:')
+    }
+    draw_details_values = {
+        details_column: decode_draw_details(draw_values[details_column])
+        for details_column, _, _, is_capitalized_interest in draw_groups if is_capitalized_interest
+    }
+    capitalized_draw_unfunded_bucket: Dict[str, float] = {}
 
     cumulative_outstanding_principal = 0
     cumulative_pik_amount_due = 0
@@ -202,7 +349,22 @@ def calc_interest_and_principal(pricing_schedule: pd.DataFrame, a_b_amount_facto
     p_n_i_interest_accrued = 0
 
 
-    for row in records:
+    # amortization_term is missing on interest-only schedules; the loop compares accrual
+    # start dates against draw deadlines, so it gets them as datetime.date
+    missing = pd.Series(None, index=pricing_schedule.index, dtype=object)
+    loop_inputs = {
+        **new_cols,
+        "accrual_start_date": pd.to_datetime(pricing_schedule["accrual_start_date"]).dt.date,
+    }
+    rows = zip(*(
+        loop_inputs[col] if col in loop_inputs else pricing_schedule.get(col, missing)
+        for col in DUES_INPUT_COLUMNS
+    ))
+    payment_type_codes = get_payment_type_codes(new_cols["payment_type_next_month"])
+    # whether every value of a principal column came out as an int (see INT_PRINCIPAL_COLUMNS)
+    principal_paid_is_int = outstanding_is_int = principal_due_is_int = True
+    for i, (row, payment_type_code) in enumerate(zip(rows, payment_type_codes)):
+        principal_paid_is_int = principal_paid_is_int and isinstance(principal_due_at_start_of_period, int)
         (
             cumulative_outstanding_principal,
             principal_due_at_start_of_period,
@@ -210,16 +372,37 @@ def calc_interest_and_principal(pricing_schedule: pd.DataFrame, a_b_amount_facto
             cumulative_pik_amount_due,
             p_n_i_interest_accrued
         ) = calc_interest_and_principal_dues(
+            i,
             row,
+            payment_type_code,
+            out,
+            draw_groups,
+            draw_values,
+            draw_details_values,
+            amount_drawn,
+            capitalized_draw_unfunded_bucket,
             cumulative_outstanding_principal,
             principal_due_at_start_of_period,
             interest_due_at_start_of_period,
             cumulative_pik_amount_due,
             p_n_i_interest_accrued,
-            a_b_amount_factor
+            a_b_amount_factor,
+            amount_drawn_is_int,
         )
+        outstanding_is_int = outstanding_is_int and isinstance(cumulative_outstanding_principal, int)
+        principal_due_is_int = principal_due_is_int and isinstance(principal_due_at_start_of_period, int)
+
+    for col, is_int in zip(
+        INT_PRINCIPAL_COLUMNS, (principal_paid_is_int, outstanding_is_int, principal_due_is_int)
+    ):
+        if is_int:
+            out[col] = out[col].astype(np.int64)
+
+    new_cols["amount_drawn"] = amount_drawn
+    new_cols.update(draw_values)
+    new_cols.update(out)
 
-    return pd.DataFrame(records)
+    return pricing_schedule.assign(**new_cols)
 
 
 def calculate_interest_principal_pik_and_cap_draws(interest_and_pik_multiplier: pd.DataFrame, a_b_amount_factor: float = 1) -> pd.DataFrame:
@@ -233,4 +416,4 @@ def calculate_interest_principal_pik_and_cap_draws(interest_and_pik_multiplier:
     Returns:
         Pricing schedule DataFrame equivalent to the old Stage1.xlsx.
     """
-    return calc_interest_and_principal(interest_and_pik_multiplier.copy(), a_b_amount_factor)
+    return calc_interest_and_principal(interest_and_pik_multiplier, a_b_amount_factor)
@@ -4,10 +4,27 @@ from typing import Dict, List, Optional
 
 import json
 from datetime import date, datetime
+from types import SimpleNamespace
 
+import numpy as np
 import pandas as pd
 
 
+FEE_COLUMNS = [
+    "closing_fee_due",
+    "draw_fee_due",
+    "modification_fee_due",
+    "exit_fee_due_at_start_of_next_period",
+    "cummulative_unpaid_exit_fee_due_at_start_of_next_period",
+    "all_fees_due",
+]
+
+EXIT_FEE_COLUMNS = (
+    "exit_fee_due_at_start_of_next_period",
+    "cummulative_unpaid_exit_fee_due_at_start_of_next_period",
+)
+
+
 def parse_date(value: Optional[str]) -> date:
     if isinstance(value, date):
         return value
@@ -16,51 +33,39 @@ def parse_date(value: Optional[str]) -> date:
     return datetime.strptime(value, "%Y-%m-%d").date()
 
 
-def calculate_exit_fee(active_exit_fee, principal_paid, loan_amount):
-
-    our_share_of_fee = 1.0
-    if('CM_FEE_SHARE__C' in active_exit_fee.keys()):
-        our_share_of_fee = active_exit_fee['CM_FEE_SHARE__C']/100.0
-        
-    
-    if('CM_CONDITIONAL_EXIT_FEE_REDUCTION__C' in active_exit_fee.keys() and 'CM_EXIT_FEE_REDUCTION_CONDITION_MET__C' in active_exit_fee.keys() \
-      and active_exit_fee['CM_CONDITIONAL_EXIT_FEE_REDUCTION__C'] and active_exit_fee['CM_EXIT_FEE_REDUCTION_CONDITION_MET__C']):
+def canonicalize_exit_fee(active_exit_fee: Dict) -> SimpleNamespace:
+    """Resolve the optional fields of an exit fee record once, before any per-row math."""
+    reduction_met = bool(
+        active_exit_fee.get('CM_CONDITIONAL_EXIT_FEE_REDUCTION__C')
+        and active_exit_fee.get('CM_EXIT_FEE_REDUCTION_CONDITION_MET__C')
+    )
+    reduced_perc = active_exit_fee.get('CM_CONDITIONAL_EXIT_FEE_PERCENTAGE__C')
+    perc = active_exit_fee.get('LLC_BI__PERCENTAGE__C')
+    return SimpleNamespace(
+        share=active_exit_fee.get('CM_FEE_SHARE__C', 100.0) * 0.01,
+        reduction_met=reduction_met,
+        reduced_perc=reduced_perc/100 if reduced_perc is not None else None,
+        reduced_amt=active_exit_fee.get('CM_CONDITIONAL_EXIT_FEE_AMOUNT__C'),
+        is_percentage=active_exit_fee['LLC_BI__CALCULATION_TYPE__C'] == 'Percentage',
+        perc=perc/100.0 if perc is not None else None,
+        amt=active_exit_fee.get('LLC_BI__AMOUNT__C'),
+    )
+
+
+def calculate_exit_fee(fee, principal_paid, loan_amount):
+    """Exit fee on principal_paid (a scalar or an array) for a canonicalized exit fee."""
+
+    if(fee.reduction_met):
         #conditional reduction is configured and is now met
-        print('Exit Fee Reduction being executed')
-        reduced_perc_provided = 'CM_CONDITIONAL_EXIT_FEE_PERCENTAGE__C' in active_exit_fee.keys()
-        reduced_amt_provided = 'CM_CONDITIONAL_EXIT_FEE_AMOUNT__C' in active_exit_fee.keys()
-
-        reduced_perc = active_exit_fee['CM_CONDITIONAL_EXIT_FEE_PERCENTAGE__C']/100
-        reduced_amt = active_exit_fee['CM_CONDITIONAL_EXIT_FEE_AMOUNT__C']
-        
-        if(reduced_perc_provided and not reduced_amt_provided):
-            return principal_paid * reduced_perc * our_share_of_fee
-        elif(not reduced_perc_provided and reduced_amt_provided):
-            return reduced_amt * our_share_of_fee
-        elif(reduced_perc_provided and reduced_amt_provided):
-            if(reduced_perc_provided != 0.0):
-                return principal_paid * reduced_perc * our_share_of_fee
-            else:
-                return reduced_amt * our_share_of_fee
-            
-    else:
-
-        perc = None
-        amt = None
-        if('LLC_BI__PERCENTAGE__C' in active_exit_fee.keys()):
-            perc = active_exit_fee['LLC_BI__PERCENTAGE__C']/100.0
-
-        if('LLC_BI__AMOUNT__C' in active_exit_fee.keys()):
-            amt = active_exit_fee['LLC_BI__AMOUNT__C']
-            
-
-        print(f"++++++++ {principal_paid} ++++++++ {amt}++++++++ {our_share_of_fee}++++++++") 
-        if(active_exit_fee['LLC_BI__CALCULATION_TYPE__C'] == 'Percentage'):
-            return principal_paid * perc * our_share_of_fee
-        else: 
-            return (principal_paid/loan_amount) * amt * our_share_of_fee
-
+        if(fee.reduced_perc is not None):
+            return principal_paid * fee.reduced_perc * fee.share
+        if(fee.reduced_amt is not None):
+            return fee.reduced_amt * fee.share
+        raise ValueError("Conditional exit fee reduction has neither a percentage nor an amount")
 
+    if(fee.is_percentage):
+        return principal_paid * fee.perc * fee.share
+    return (principal_paid/loan_amount) * fee.amt * fee.share
 
 
 def process_exit_fees(stage1, exit_fee_schedule, as_of_date, loan_terms):
@@ -68,15 +73,6 @@ def process_exit_fees(stage1, exit_fee_schedule, as_of_date, loan_terms):
     if(not exit_fee_schedule or len(exit_fee_schedule) == 0):
         return
 
-    
-    if 'exit_fee_due_at_start_of_next_period' not in stage1.columns:
-        stage1['exit_fee_due_at_start_of_next_period'] = 0.0  # create empty column first
-    if 'cummulative_unpaid_exit_fee_due_at_start_of_next_period' not in stage1.columns:
-        stage1['cummulative_unpaid_exit_fee_due_at_start_of_next_period'] = 0.0  # create empty column first
-    if 'all_fees_due' not in stage1.columns:
-        stage1['all_fees_due'] = 0.0  # create empty column first
-        
-        
     closing_date = parse_date(loan_terms['LLC_BI__CLOSEDATE__C'])
     maturity_date = parse_date(loan_terms['LLC_BI__MATURITY_DATE__C'])
     loan_amount = loan_terms['LLC_BI__AMOUNT__C']
@@ -101,7 +97,9 @@ def process_exit_fees(stage1, exit_fee_schedule, as_of_date, loan_terms):
                 active_exit_fee = exit_fee
                 break
         
-        cal_type = active_exit_fee['LLC_BI__CALCULATION_TYPE__C']
+        fee = canonicalize_exit_fee(active_exit_fee)
+        if(fee.reduction_met):
+            print('Exit Fee Reduction being executed')
 
         # when_payable_whole_list = ['Prepayment in Full','Repayment in Full','Partial Prepayment (Including Amortization)','Partial Prepayment (Excluding Amortization)']
         # when_payable_unselected = active_exit_fee['CM_EXIT_FEE_PAYABLE_UPON__C']
@@ -112,7 +110,12 @@ def process_exit_fees(stage1, exit_fee_schedule, as_of_date, loan_terms):
         #depending on when borrowers decide to draw, which cannot be known in advance - the exit fees are paid 
         # when principle is paid (either each month) or at the end once. So for exit fees we will have to 
         #include the value in the invoice - so we are going to track exit fee as "due_at_start_of_next_period" format
-        index_when_principal_due_next_month = stage1[stage1['principal_due_at_start_of_next_period'] > 0].index
+        positions_when_principal_due_next_month = np.flatnonzero(stage1['principal_due_at_start_of_next_period'].to_numpy() > 0)
+        principal_due = stage1['principal_due_at_start_of_next_period'].to_numpy(dtype=float)
+        # fee columns are updated as arrays and written back once at the end
+        exit_fee_due = stage1['exit_fee_due_at_start_of_next_period'].to_numpy(dtype=float, copy=True)
+        unpaid_exit_fee_due = stage1['cummulative_unpaid_exit_fee_due_at_start_of_next_period'].to_numpy(dtype=float, copy=True)
+        all_fees_due = stage1['all_fees_due'].to_numpy(dtype=float, copy=True)
 
         #the if statements in the for loop below are arranged in a specific priotity sequence. If one of then is triggered it will 
         #automatically cover the calculation for other values written in if statements below it. We cannot have two conditions contribute
@@ -125,93 +128,111 @@ def process_exit_fees(stage1, exit_fee_schedule, as_of_date, loan_terms):
             if(payable_event == 'Partial Prepayment (Including Amortization)' and not at_least_one_payable_event_already_triggered):
                 print('Partial Prepayment (Including Amortization)')
                 at_least_one_payable_event_already_triggered = True
-                for i in index_when_principal_due_next_month:
-                    
-                    ef = calculate_exit_fee(active_exit_fee, stage1.loc[i, 'principal_due_at_start_of_next_period'], loan_amount)
-                    stage1.loc[i, 'exit_fee_due_at_start_of_next_period'] = ef + stage1.loc[i, 'exit_fee_due_at_start_of_next_period']
-                    stage1.loc[i, 'all_fees_due'] = stage1.loc[i, 'all_fees_due'] + ef
+                efs = np.broadcast_to(
+                    calculate_exit_fee(fee, principal_due[positions_when_principal_due_next_month], loan_amount),
+                    positions_when_principal_due_next_month.shape,
+                )
+                exit_fee_due[positions_when_principal_due_next_month] += efs
+                all_fees_due[positions_when_principal_due_next_month] += efs
                 
 
             elif(payable_event == 'Partial Prepayment (Excluding Amortization)' and not at_least_one_payable_event_already_triggered):
                 print('Partial Prepayment (Excluding Amortization)')
                 at_least_one_payable_event_already_triggered = True
-                for i in index_when_principal_due_next_month:
+                efs = np.broadcast_to(
+                    calculate_exit_fee(fee, principal_due[positions_when_principal_due_next_month], loan_amount),
+                    positions_when_principal_due_next_month.shape,
+                )
+                for pos, ef in zip(positions_when_principal_due_next_month, efs):
                     
-                    ef = calculate_exit_fee(active_exit_fee, stage1.loc[i, 'principal_due_at_start_of_next_period'], loan_amount)
-                    stage1.loc[i, 'cummulative_unpaid_exit_fee_due_at_start_of_next_period'] =  ef + \
-                                                                                                 stage1.loc[i-1, 'cummulative_unpaid_exit_fee_due_at_start_of_next_period']
+                    # nothing is carried into the first row
+                    previous_unpaid = unpaid_exit_fee_due[pos-1] if pos > 0 else 0.0
+                    unpaid_exit_fee_due[pos] = ef + previous_unpaid
                 
-                stage1.loc[last_row_index, 'all_fees_due'] = stage1.loc[last_row_index, 'all_fees_due'] + stage1.loc[last_row_index, 'cummulative_unpaid_exit_fee_due_at_start_of_next_period']
+                all_fees_due[last_row_index] = all_fees_due[last_row_index] + unpaid_exit_fee_due[last_row_index]
             
             elif((payable_event == 'Repayment in Full' or payable_event == 'Prepayment in Full') and not at_least_one_payable_event_already_triggered):
                 print('Full Payment triggered')
                 at_least_one_payable_event_already_triggered = True
                 
-                ef = calculate_exit_fee(active_exit_fee, stage1.loc[last_row_index, 'principal_due_at_start_of_next_period'], loan_amount)
-                stage1.loc[last_row_index, 'exit_fee_due_at_start_of_next_period'] = ef + stage1.loc[last_row_index, 'exit_fee_due_at_start_of_next_period']
-                stage1.loc[last_row_index, 'all_fees_due'] =  stage1.loc[last_row_index, 'all_fees_due'] + ef
+                ef = calculate_exit_fee(fee, principal_due[last_row_index], loan_amount)
+                exit_fee_due[last_row_index] = ef + exit_fee_due[last_row_index]
+                all_fees_due[last_row_index] =  all_fees_due[last_row_index] + ef
+
+        stage1['exit_fee_due_at_start_of_next_period'] = exit_fee_due
+        stage1['cummulative_unpaid_exit_fee_due_at_start_of_next_period'] = unpaid_exit_fee_due
+        stage1['all_fees_due'] = all_fees_due
 
 
 def process_closing_fees(stage1: pd.DataFrame, closing_fees: List[Dict]) -> None:
     if (not closing_fees):
-        stage1["closing_fee_due"] = 0.0
         return
     
     total_closing_fee = 0
     total_closing_fee = sum(fee.get("LLC_BI__AMOUNT__C", 0) for fee in closing_fees if 'LLC_BI__AMOUNT__C' in fee.keys())
 
-
-    if "closing_fee_due" not in stage1.columns:
-        stage1["closing_fee_due"] = 0.0
     stage1.at[stage1.index[0], "closing_fee_due"] += total_closing_fee
-
-    if "all_fees_due" not in stage1.columns:
-        stage1["all_fees_due"] = 0.0
     stage1.at[stage1.index[0], "all_fees_due"] += total_closing_fee
 
 
 def process_draw_fees(stage1: pd.DataFrame, draw_fees: List[Dict], total_loan_amount: float) -> None:
     if( not draw_fees ):
-        stage1["draw_fee_due"] = 0.0
         return
 
-    if "draw_fee_due" not in stage1.columns:
-        stage1["draw_fee_due"] = 0.0
-    if "all_fees_due" not in stage1.columns:
-        stage1["all_fees_due"] = 0.0
+    if "is_draw" not in stage1:
+        return
+    draw_positions = np.flatnonzero(stage1["is_draw"].to_numpy() == 1)
+    amount_drawn = stage1["amount_drawn"].to_numpy(dtype=float)[draw_positions]
+    draw_fee_due = stage1["draw_fee_due"].to_numpy(dtype=float, copy=True)
+    all_fees_due = stage1["all_fees_due"].to_numpy(dtype=float, copy=True)
 
-    draw_rows = stage1.index[stage1.get("is_draw", 0) == 1]
     for draw_fee in draw_fees:
         fee_amount = draw_fee.get("LLC_BI__AMOUNT__C", 0)
-        for idx in draw_rows:
-            amount_drawn = float(stage1.at[idx, "amount_drawn"])
-            proportionate_fee = (amount_drawn / total_loan_amount) * fee_amount
-            stage1.at[idx, "draw_fee_due"] += proportionate_fee
-            stage1.at[idx, "all_fees_due"] += proportionate_fee
+        proportionate_fee = (amount_drawn / total_loan_amount) * fee_amount
+        draw_fee_due[draw_positions] += proportionate_fee
+        all_fees_due[draw_positions] += proportionate_fee
+
+    stage1["draw_fee_due"] = draw_fee_due
+    stage1["all_fees_due"] = all_fees_due
 
 
 def process_modification_fees(stage1: pd.DataFrame, modification_fees: List[Dict]) -> None:
     if(not modification_fees ):
         return
 
-    if "modification_fee_due" not in stage1.columns:
-        stage1["modification_fee_due"] = 0.0
-    if "all_fees_due" not in stage1.columns:
-        stage1["all_fees_due"] = 0.0
-
+    accrual_start_dates = pd.to_datetime(stage1["accrual_start_date"]).dt.date.to_numpy()
+    positions, amounts = [], []
     for fee in modification_fees:
-        fee_date = parse_date(fee.get("CM_FEE_DATE__C", stage1.at[stage1.index[0], "accrual_start_date"]))
-        amount = fee.get("LLC_BI__AMOUNT__C", 0.0)
+        fee_date = parse_date(fee.get("CM_FEE_DATE__C", stage1["accrual_start_date"].iat[0]))
 
-        matching_rows = stage1.index[
-            pd.to_datetime(stage1["accrual_start_date"]).dt.date == fee_date
-        ]
-        if len(matching_rows) == 0:
+        matching_positions = np.flatnonzero(accrual_start_dates == fee_date)
+        if len(matching_positions) == 0:
             continue
 
-        idx = matching_rows[0]
-        stage1.at[idx, "modification_fee_due"] += amount
-        stage1.at[idx, "all_fees_due"] += amount
+        positions.append(matching_positions[0])
+        amounts.append(fee.get("LLC_BI__AMOUNT__C", 0.0))
+
+    if not positions:
+        return
+
+    # several fees can land on the same row, so accumulate with np.add.at
+    modification_fee_due = stage1["modification_fee_due"].to_numpy(dtype=float, copy=True)
+    all_fees_due = stage1["all_fees_due"].to_numpy(dtype=float, copy=True)
+    np.add.at(modification_fee_due, positions, amounts)
+    np.add.at(all_fees_due, positions, amounts)
+    stage1["modification_fee_due"] = modification_fee_due
+    stage1["all_fees_due"] = all_fees_due
+
+def _ensure_fee_columns(stage1: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of stage1 with every fee column present, created in a single assign."""
+    # The exit fee columns start as int 0 (process_exit_fees makes them float when
+    # there is an exit fee), matching the output of loans without one
+    missing_columns = {
+        col: 0 if col in EXIT_FEE_COLUMNS else 0.0
+        for col in FEE_COLUMNS if col not in stage1.columns
+    }
+    return stage1.assign(**missing_columns)
+
 
 def form_fee_and_draw_buckets(stage_with_fees, closing_fees, draw_fees, loan_terms):
     all_drawable_fees = []
@@ -234,17 +255,21 @@ def form_fee_and_draw_buckets(stage_with_fees, closing_fees, draw_fees, loan_ter
 
     draw_details_columns = [c for c in stage_with_fees.columns if c.startswith('draw:') and ':details' in c] 
 
+    capitalized_interest_columns = [
+        details_column_name.replace('details', kind)
+        for details_column_name in draw_details_columns if 'capitalized interest' in details_column_name.lower()
+        for kind in ('amount', 'unfunded')
+    ]
+    stage_with_fees[capitalized_interest_columns] = stage_with_fees[capitalized_interest_columns].fillna(0)
+
     for details_column_name in draw_details_columns:
 
         if('capitalized interest' in details_column_name.lower()):
             funded_col_name = details_column_name.replace('details', 'amount')
-            stage_with_fees[funded_col_name] = stage_with_fees[funded_col_name].fillna(0)
-
             
             total_fee = (stage_with_fees[funded_col_name] * fee_fraction).sum()
 
             unfunded_col_name = details_column_name.replace('details', 'unfunded')
-            stage_with_fees[unfunded_col_name] = stage_with_fees[unfunded_col_name].fillna(0)
 
             remaining_fee = total_fee
             stage_with_fees[funded_col_name+":adjusted"]= stage_with_fees[funded_col_name]
@@ -314,29 +339,23 @@ def add_fees(loan_terms: Dict, stage1: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with fee columns added (`stage1_with_fees` equivalent).
     """
-    stage_with_fees = stage1.copy()
+    stage_with_fees = _ensure_fee_columns(stage1)
     fees = loan_terms.get("FEE_DETAILS", [])
 
-    closing_fees = [
-        fee
-        for fee in fees
-        if fee.get("LLC_BI__FEE_TYPE__C") == "Closing Fee"
-        and fee.get("LLC_BI__PAID_AT_CLOSING__C") == "Funded at Closing"
-    ]
-    draw_fees = [
-        fee
-        for fee in fees
-        if fee.get("LLC_BI__FEE_TYPE__C") == "Closing Fee"
-        and fee.get("LLC_BI__PAID_AT_CLOSING__C") == "Funded at Draw"
-    ]
-    modification_fees = [
-        fee
-        for fee in fees
-        if fee.get("LLC_BI__FEE_TYPE__C") == "Closing Fee"
-        and fee.get("LLC_BI__PAID_AT_CLOSING__C") == "Funded at Modification"
-    ]
-    exit_fees = [fee for fee in fees if fee.get("LLC_BI__FEE_TYPE__C") == "Exit Fee"]
-    print(f":::::::::::: EXIT FEES :::::::::: {exit_fees} ")
+    closing_fees, draw_fees, modification_fees, exit_fees = [], [], [], []
+    closing_fee_buckets = {
+        "Funded at Closing": closing_fees,
+        "Funded at Draw": draw_fees,
+        "Funded at Modification": modification_fees,
+    }
+    for fee in fees:
+        fee_type = fee.get("LLC_BI__FEE_TYPE__C")
+        if fee_type == "Closing Fee":
+            bucket = closing_fee_buckets.get(fee.get("LLC_BI__PAID_AT_CLOSING__C"))
+            if bucket is not None:
+                bucket.append(fee)
+        elif fee_type == "Exit Fee":
+            exit_fees.append(fee)
 
     process_closing_fees(stage_with_fees, closing_fees)
     process_draw_fees(stage_with_fees, draw_fees, loan_terms.get("LLC_BI__AMOUNT__C", 1.0))
@@ -11,23 +11,31 @@ Logic:
 3. If not, calculate additional catch-up needed for min_moic
 """
 
+import logging
 import pandas as pd
 import numpy as np
+from functools import lru_cache
 from typing import Tuple, Optional
-from scipy.optimize import brentq
 
-try:
-    import numpy_financial as npf
-    HAS_NPF = True
-except ImportError:
-    HAS_NPF = False
+logger = logging.getLogger(__name__)
+
+# draw_*_amount (after prepare_for_client) or draw:*:amount (before prepare_for_client)
+DRAW_AMOUNT_COLUMN_PATTERN = r'^draw(?:(?:_.*)?_amount|(?::.*)?:amount)$'
+
+# Bracket for per-period IRR roots
+IRR_LOW = -0.99
+IRR_HIGH = 10.0
 
 
 def safe_get_column(df: pd.DataFrame, col: str, default=0) -> pd.Series:
     """Safely get a column from DataFrame, returning default Series if missing."""
     if col not in df.columns:
         return pd.Series(default, index=df.index)
-    return df[col].fillna(default)
+    series = df[col]
+    # only pay for a filled copy when there is something to fill
+    if series.isna().any():
+        return series.fillna(default)
+    return series
 
 
 def prepare_server_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -47,70 +55,93 @@ def prepare_server_columns(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with additional columns for pref equity
     """
-    df = df.copy()
+    new_cols = {}
 
     # Calculate total_period_draw from all draw amount columns
     # Handle both formats:
     # - Underscore format: draw_*_amount (after prepare_for_client)
     # - Colon format: draw:*:amount (before prepare_for_client)
-    draw_amount_cols = [col for col in df.columns if
-                       (col.startswith('draw_') and col.endswith('_amount')) or
-                       (col.startswith('draw:') and col.endswith(':amount'))]
-    if draw_amount_cols:
-        df['total_period_draw'] = df[draw_amount_cols].fillna(0).sum(axis=1)
+    draw_amount_cols = df.columns[df.columns.str.match(DRAW_AMOUNT_COLUMN_PATTERN, na=False)]
+    if len(draw_amount_cols):
+        # na_value fills the gaps while materializing, so no filled intermediate frame is built
+        total_period_draw = df[draw_amount_cols].to_numpy(dtype=np.float64, na_value=0.0).sum(axis=1)
     else:
-        df['total_period_draw'] = 0.0
+        total_period_draw = np.zeros(len(df))
+    new_cols['total_period_draw'] = total_period_draw
 
     # is_accrual_period_complete: Default to 1 (all periods complete)
     if 'is_accrual_period_complete' not in df.columns:
-        df['is_accrual_period_complete'] = 1
+        new_cols['is_accrual_period_complete'] = 1
 
     # period_fees_paid: Use all_fees_due from server
     if 'period_fees_paid' not in df.columns:
-        df['period_fees_paid'] = safe_get_column(df, 'all_fees_due', 0)
+        new_cols['period_fees_paid'] = safe_get_column(df, 'all_fees_due', 0)
 
     # cummulative_draw_amount: Cumulative sum of draws
     if 'cummulative_draw_amount' not in df.columns:
-        df['cummulative_draw_amount'] = df['total_period_draw'].cumsum()
+        new_cols['cummulative_draw_amount'] = np.cumsum(total_period_draw)
 
     # pre_payment_fee: Not present in server, default to 0
     if 'pre_payment_fee' not in df.columns:
-        df['pre_payment_fee'] = 0.0
+        new_cols['pre_payment_fee'] = 0.0
 
-    return df
+    # assign returns a new frame, so the caller's DataFrame is left untouched
+    return df.assign(**new_cols)
 
 
-def calculate_irr(cashflows: pd.Series) -> Optional[float]:
-    """
-    Calculate IRR (Internal Rate of Return) - per-period rate.
+@lru_cache(maxsize=64)
+def _periods(n: int) -> np.ndarray:
+    """Period numbers 0..n-1 as floats, shared by every NPV evaluation of that length."""
+    t = np.arange(n, dtype=np.float64)
+    t.setflags(write=False)
+    return t
 
-    Args:
-        cashflows: Series of cashflow amounts
 
-    Returns:
-        Per-period rate of return, or None if calculation fails
+def _npv(rate: float, cf: np.ndarray, t: np.ndarray) -> float:
     """
-    if not HAS_NPF:
-        return None
+    NPV of cf at a per-period rate, up to a positive factor.
+
+    For negative rates the sum is scaled by (1 + rate)^(n - 1), i.e. taken as a future
+    value, so the discount factors never overflow. The sign (all a root finder needs)
+    is unchanged and both forms agree at rate 0.
+    """
+    if rate >= 0:
+        return float(np.sum(cf / (1.0 + rate) ** t))
+    return float(np.sum(cf * (1.0 + rate) ** t[::-1]))
 
-    cf = cashflows.values
 
+def _irr_from_array(cf: np.ndarray) -> Optional[float]:
+    """Per-period IRR of a cashflow array, solved as the root of its NPV."""
     # Filter out zero cashflows at the end
-    while len(cf) > 0 and cf[-1] == 0:
-        cf = cf[:-1]
+    nonzero = np.flatnonzero(cf)
+    cf = cf[:nonzero[-1] + 1] if len(nonzero) else cf[:0]
 
     if len(cf) < 2:
         return None
 
+    # scipy.optimize is heavy to import and only this final IRR check needs it
+    from scipy.optimize import brentq
+
     try:
-        irr = npf.irr(cf)
-        if np.isnan(irr) or np.isinf(irr):
-            return None
-        return irr
+        return brentq(_npv, IRR_LOW, IRR_HIGH, args=(cf, _periods(len(cf))), xtol=1e-12, maxiter=100)
     except (ValueError, RuntimeError):
+        # no sign change inside the bracket, or no convergence
         return None
 
 
+def calculate_irr(cashflows: pd.Series) -> Optional[float]:
+    """
+    Calculate IRR (Internal Rate of Return) - per-period rate.
+
+    Args:
+        cashflows: Series of cashflow amounts
+
+    Returns:
+        Per-period rate of return, or None if calculation fails
+    """
+    return _irr_from_array(cashflows.to_numpy(dtype=np.float64))
+
+
 def calculate_moic(total_outflows: float, total_inflows: float) -> float:
     """
     Calculate MOIC (Multiple on Invested Capital).
@@ -144,43 +175,37 @@ def create_pref_draws_for_period(df: pd.DataFrame) -> pd.Series:
     Returns:
         Series with pref-adjusted draws (consolidated to period start)
     """
-    draws = safe_get_column(df, 'total_period_draw', 0).copy()
-    is_complete = safe_get_column(df, 'is_accrual_period_complete', 1)
+    draws = safe_get_column(df, 'total_period_draw', 0).to_numpy(dtype=np.float64)
+    is_complete = safe_get_column(df, 'is_accrual_period_complete', 1).to_numpy()
 
     n = len(df)
-    pref_draws = np.zeros(n)
+    if n == 0:
+        return pd.Series(draws, index=df.index)
 
-    i = 0
-    while i < n:
-        if is_complete.iloc[i] == 1:
-            # Complete period - draw stays here
-            pref_draws[i] = draws.iloc[i]
-            i += 1
-        else:
-            # Start of split period - consolidate all draws until next complete period
-            period_draw_sum = draws.iloc[i]
-            j = i + 1
-            while j < n and is_complete.iloc[j] == 0:
-                period_draw_sum += draws.iloc[j]
-                j += 1
-            # Put consolidated draw on first row of this period
-            pref_draws[i] = period_draw_sum
-            i = j
+    # A row starts a new group unless it continues a split period (is_complete == 0)
+    # that began on an earlier row; each group's draws land on its first row.
+    starts = np.empty(n, dtype=bool)
+    starts[0] = True
+    starts[1:] = (is_complete[1:] != 0) | (is_complete[:-1] == 1)
+    start_positions = np.flatnonzero(starts)
+
+    # segmented sum straight over the draws, without materializing group ids
+    pref_draws = np.zeros(n)
+    pref_draws[start_positions] = np.add.reduceat(draws, start_positions)
 
     return pd.Series(pref_draws, index=df.index)
 
 
-def calculate_catch_up_for_irr(df: pd.DataFrame, pref_draws: pd.Series,
-                                interest_paid: pd.Series, principal_paid: pd.Series,
-                                fees_paid: pd.Series, target_irr: float) -> float:
+def calculate_catch_up_for_irr(pref_draws: np.ndarray, interest_paid: np.ndarray,
+                                principal_paid: np.ndarray, fees_paid: np.ndarray,
+                                target_irr: float) -> float:
     """
     Calculate the catch-up amount needed to achieve EXACTLY the target IRR.
 
-    Uses goal-seek approach: find the catch-up amount that makes IRR = target_irr
-    on pref-specific cashflows.
+    Solves directly for the catch-up amount that makes the NPV of the pref-specific
+    cashflows zero at target_irr (i.e. IRR = target_irr), instead of goal-seeking on IRR.
 
     Args:
-        df: DataFrame
         pref_draws: Pref-specific draws (consolidated to period start)
         interest_paid: Interest payments
         principal_paid: Principal payments
@@ -192,61 +217,19 @@ def calculate_catch_up_for_irr(df: pd.DataFrame, pref_draws: pd.Series,
     """
     # Build base pref cashflow (without catch-up)
     # Same as period_cashflow but with draws shifted to first of month
-    base_pref_cashflow = -pref_draws + interest_paid + principal_paid + fees_paid
-
-    # Function to calculate IRR with a given catch-up added to last row
-    def irr_with_catchup(catch_up_amount):
-        cf = base_pref_cashflow.values.copy()
-        cf[-1] += catch_up_amount
-
-        # Filter out trailing zeros
-        while len(cf) > 0 and cf[-1] == 0:
-            cf = cf[:-1]
-
-        if len(cf) < 2:
-            return None
-
-        try:
-            irr = npf.irr(cf)
-            if np.isnan(irr) or np.isinf(irr):
-                return None
-            return irr
-        except (ValueError, RuntimeError):
-            return None
-
-    # Function for goal-seek: difference from target IRR
-    def irr_diff(catch_up_amount):
-        irr = irr_with_catchup(catch_up_amount)
-        if irr is None:
-            return float('inf')
-        return irr - target_irr
-
-    # Check current IRR without catch-up
-    current_irr = irr_with_catchup(0)
-
-    if current_irr is not None and current_irr >= target_irr:
-        # Already meeting target
+    base_pref_cashflow = np.asarray(-pref_draws + interest_paid + principal_paid + fees_paid, dtype=np.float64)
+
+    # The catch-up sits on the last row, so NPV at target_irr is linear in it:
+    #   NPV(base) + catch_up / (1 + target_irr)^(n - 1) = 0
+    # A base NPV >= 0 means the target is already met and the result clips to 0,
+    # so no IRR needs to be solved.
+    n = len(base_pref_cashflow)
+    if n < 2:
         return 0.0
-
-    # Goal-seek: find catch_up such that IRR = target_irr
-    # Start with reasonable bounds
-    total_outflows = abs(pref_draws.sum())
-    low = 0
-    high = total_outflows * 5  # Start with 5x the investment as upper bound
-
-    # Expand upper bound if needed
-    max_iterations = 20
-    iteration = 0
-    while irr_diff(high) < 0 and iteration < max_iterations:
-        high *= 2
-        iteration += 1
-
-    try:
-        catch_up = brentq(irr_diff, low, high, maxiter=1000)
-        return max(catch_up, 0)
-    except (ValueError, RuntimeError):
-        # Fallback: if brentq fails, return 0
+    catch_up = -np.sum(base_pref_cashflow * (1.0 + target_irr) ** _periods(n)[::-1])
+    if not np.isfinite(catch_up):
         return 0.0
+    return max(float(catch_up), 0)
 
 
 def calculate_pref_equity_catch_up(
@@ -281,57 +264,66 @@ def calculate_pref_equity_catch_up(
         - Modified DataFrame with pref columns added
         - Dictionary with metrics
     """
-    print(f"=== PREF EQUITY DEBUG: Starting calculation ===")
-    print(f"Input DataFrame shape: {df.shape}")
-    print(f"Target IRR: {target_irr}, Min MOIC: {min_moic}")
-    print(f"DataFrame columns: {list(df.columns)[:10]}...")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("=== PREF EQUITY DEBUG: Starting calculation ===")
+        logger.debug("Input DataFrame shape: %s", df.shape)
+        logger.debug("Target IRR: %s, Min MOIC: %s", target_irr, min_moic)
+        logger.debug("DataFrame columns: %s...", list(df.columns)[:10])
 
     # Prepare server columns for pref equity calculation
     df = prepare_server_columns(df)
-    print(f"After prepare_server_columns, shape: {df.shape}")
+    logger.debug("After prepare_server_columns, shape: %s", df.shape)
+
+    # New and updated columns are collected here and applied in one assign at the end
+    new_cols = {}
 
     # Ensure date column exists
     if 'accrual_start_date' not in df.columns:
         raise ValueError("DataFrame must have accrual_start_date column")
 
-    df['accrual_start_date'] = pd.to_datetime(df['accrual_start_date'])
+    # Step 5 output already carries datetime64; only parse when handed strings
+    if not pd.api.types.is_datetime64_any_dtype(df['accrual_start_date']):
+        new_cols['accrual_start_date'] = pd.to_datetime(df['accrual_start_date'], format='ISO8601')
 
     # Create pref-specific draws (consolidated to period start)
-    pref_draws = create_pref_draws_for_period(df)
-    df['pref_amount_drawn'] = pref_draws
+    pref_draws_series = create_pref_draws_for_period(df)
+    new_cols['pref_amount_drawn'] = pref_draws_series
+    pref_draws = pref_draws_series.to_numpy(dtype=np.float64)
 
-    # Get cashflow components
-    interest_paid = safe_get_column(df, 'interest_paid_at_start', 0).copy()
-    principal_paid = safe_get_column(df, 'principal_paid_at_start', 0).copy()
-    fees_paid = safe_get_column(df, 'period_fees_paid', 0)
+    # Get cashflow components as arrays; the scalar updates below are plain ndarray writes
+    interest_paid = safe_get_column(df, 'interest_paid_at_start', 0).to_numpy(dtype=np.float64, copy=True)
+    principal_paid = safe_get_column(df, 'principal_paid_at_start', 0).to_numpy(dtype=np.float64, copy=True)
+    fees_paid = safe_get_column(df, 'period_fees_paid', 0).to_numpy(dtype=np.float64)
 
     # Add balloon payment on last row (for interest-only loans)
     # principal_due_at_start_of_next_period represents the balloon principal payment
     # base_interest_amount_due_at_start_of_next_period represents the final interest payment
-    balloon_principal = safe_get_column(df, 'principal_due_at_start_of_next_period', 0)
-    balloon_interest = safe_get_column(df, 'base_interest_amount_due_at_start_of_next_period', 0)
+    balloon_principal = safe_get_column(df, 'principal_due_at_start_of_next_period', 0).to_numpy()
+    balloon_interest = safe_get_column(df, 'base_interest_amount_due_at_start_of_next_period', 0).to_numpy()
 
     # Add balloon to last row cashflows
-    principal_paid.iloc[-1] += balloon_principal.iloc[-1]
-    interest_paid.iloc[-1] += balloon_interest.iloc[-1]
+    principal_paid[-1] += balloon_principal[-1]
+    interest_paid[-1] += balloon_interest[-1]
 
-    print(f"Balloon payment added: Principal=${balloon_principal.iloc[-1]:,.2f}, Interest=${balloon_interest.iloc[-1]:,.2f}")
+    if debug:
+        logger.debug(f"Balloon payment added: Principal=${balloon_principal[-1]:,.2f}, Interest=${balloon_interest[-1]:,.2f}")
 
     # MOIC uses cummulative_draw_amount as the denominator (all capital funded)
-    cummulative_draw_amount = safe_get_column(df, 'cummulative_draw_amount', 0)
-    total_funded = cummulative_draw_amount.iloc[-1]  # Total capital ever funded
+    cummulative_draw_amount = safe_get_column(df, 'cummulative_draw_amount', 0).to_numpy()
+    total_funded = cummulative_draw_amount[-1]  # Total capital ever funded
 
     # MOIC inflows: interest + principal + fees (excluding pre_payment_fee)
-    pre_payment_fee = safe_get_column(df, 'pre_payment_fee', 0)
-    # Fees excluding prepayment penalty
-    fees_excl_prepay = fees_paid - pre_payment_fee
+    pre_payment_fee = safe_get_column(df, 'pre_payment_fee', 0).to_numpy(dtype=np.float64)
 
     total_interest = interest_paid.sum()
     total_principal = principal_paid.sum()
-    total_fees = fees_excl_prepay.sum()
-    base_inflows = total_interest + total_principal + total_fees
+    # Fees excluding prepayment penalty, as a difference of sums (no intermediate array)
+    total_fees = fees_paid.sum() - pre_payment_fee.sum()
+    base_inflows = float(total_interest + total_principal + total_fees)
 
-    print(f"Total inflows: Interest=${total_interest:,.2f}, Principal=${total_principal:,.2f}, Fees=${total_fees:,.2f}")
+    if debug:
+        logger.debug(f"Total inflows: Interest=${total_interest:,.2f}, Principal=${total_principal:,.2f}, Fees=${total_fees:,.2f}")
 
     # Normalize None/0 values
     has_target_irr = target_irr is not None and target_irr != 0
@@ -343,7 +335,8 @@ def calculate_pref_equity_catch_up(
     monthly_target_irr = None
     if has_target_irr:
         monthly_target_irr = target_irr / 12
-        print(f"Converting annual IRR {target_irr:.2%} to monthly IRR {monthly_target_irr:.4%}")
+        if debug:
+            logger.debug(f"Converting annual IRR {target_irr:.2%} to monthly IRR {monthly_target_irr:.4%}")
 
     irr_catch_up = 0.0
     moic_catch_up = 0.0
@@ -355,57 +348,49 @@ def calculate_pref_equity_catch_up(
     # Safeguard 2: Only target_irr present - calculate IRR catch-up only
     elif has_target_irr and not has_min_moic:
         irr_catch_up = calculate_catch_up_for_irr(
-            df, pref_draws, interest_paid, principal_paid, fees_paid, monthly_target_irr
+            pref_draws, interest_paid, principal_paid, fees_paid, monthly_target_irr
         )
 
     # Safeguard 3: Only min_moic present - calculate MOIC catch-up only
     elif not has_target_irr and has_min_moic:
-        current_moic = calculate_moic(total_funded, base_inflows)
-        if current_moic < min_moic:
-            required_inflows = min_moic * total_funded
-            moic_catch_up = required_inflows - base_inflows
-            moic_catch_up = max(moic_catch_up, 0)
+        moic_catch_up = max(min_moic * total_funded - base_inflows, 0)
 
     # Both present: IRR first, then check MOIC
     else:
         # Step 1: Calculate IRR-based catch-up
         irr_catch_up = calculate_catch_up_for_irr(
-            df, pref_draws, interest_paid, principal_paid, fees_paid, monthly_target_irr
+            pref_draws, interest_paid, principal_paid, fees_paid, monthly_target_irr
         )
 
-        # Step 2: Check MOIC with IRR catch-up
-        total_inflows_with_irr_catchup = base_inflows + irr_catch_up
-        moic_with_irr_catchup = calculate_moic(total_funded, total_inflows_with_irr_catchup)
-
-        # Step 3: Check if min_moic is met, calculate additional catch-up if needed
-        if moic_with_irr_catchup < min_moic:
-            required_inflows = min_moic * total_funded
-            moic_catch_up = required_inflows - total_inflows_with_irr_catchup
-            moic_catch_up = max(moic_catch_up, 0)
+        # Step 2: Top up whatever min_moic still needs on top of the IRR catch-up
+        moic_catch_up = max(min_moic * total_funded - (base_inflows + irr_catch_up), 0)
 
     # Total catch-up
     total_catch_up = irr_catch_up + moic_catch_up
 
-    # Initialize catch-up columns
-    df['pref_equity_catch_up'] = 0.0
-    df['min_moic_catch_up'] = 0.0
-
-    last_idx = df.index[-1]
-    df.loc[last_idx, 'pref_equity_catch_up'] = irr_catch_up
-    df.loc[last_idx, 'min_moic_catch_up'] = moic_catch_up
+    # Catch-up columns are zero except on the last row
+    n = len(df)
+    pref_equity_catch_up = np.zeros(n)
+    pref_equity_catch_up[-1] = irr_catch_up
+    min_moic_catch_up = np.zeros(n)
+    min_moic_catch_up[-1] = moic_catch_up
+    new_cols['pref_equity_catch_up'] = pref_equity_catch_up
+    new_cols['min_moic_catch_up'] = min_moic_catch_up
 
     # Build pref cashflow (with total catch-up on last row)
     # Same as period_cashflow but with draws shifted to first of month
     pref_cashflow = -pref_draws + interest_paid + principal_paid + fees_paid
-    pref_cashflow.iloc[-1] += total_catch_up
-    df['pref_cashflow'] = pref_cashflow
+    pref_cashflow[-1] += total_catch_up
+    new_cols['pref_cashflow'] = pref_cashflow
 
     # Update period_cashflow to include total catch-up if it exists
     if 'period_cashflow' in df.columns:
-        df.loc[last_idx, 'period_cashflow'] = df.loc[last_idx, 'period_cashflow'] + total_catch_up
+        period_cashflow = df['period_cashflow'].to_numpy(dtype=np.float64, copy=True)
+        period_cashflow[-1] += total_catch_up
+        new_cols['period_cashflow'] = period_cashflow
 
     # Calculate resulting metrics
-    resulting_irr = calculate_irr(pref_cashflow)
+    resulting_irr = _irr_from_array(pref_cashflow)
 
     # Annualize IRR (assuming monthly periods)
     resulting_irr_annual = None
@@ -431,11 +416,12 @@ def calculate_pref_equity_catch_up(
 
     # Update Comments on last row only if there's any catch-up
     if total_catch_up > 0:
-        current_comment = df.loc[last_idx, 'Comments'] if 'Comments' in df.columns else None
-        if pd.isna(current_comment):
-            current_comment = ""
+        if 'Comments' in df.columns:
+            comments = df['Comments'].to_numpy(dtype=object, copy=True)
         else:
-            current_comment = str(current_comment)
+            comments = np.full(len(df), "", dtype=object)
+        current_comment = comments[-1]
+        current_comment = "" if pd.isna(current_comment) else str(current_comment)
 
         # Build pref equity comment based on what parameters were provided
         pref_comment_parts = []
@@ -462,12 +448,7 @@ def calculate_pref_equity_catch_up(
 
         pref_comment = '\n'.join(pref_comment_parts)
 
-        if 'Comments' not in df.columns:
-            df['Comments'] = ""
-
-        if current_comment:
-            df.loc[last_idx, 'Comments'] = f"{current_comment}\n{pref_comment}"
-        else:
-            df.loc[last_idx, 'Comments'] = pref_comment
+        comments[-1] = f"{current_comment}\n{pref_comment}" if current_comment else pref_comment
+        new_cols['Comments'] = comments
 
-    return df, metrics
+    return df.assign(**new_cols), metrics
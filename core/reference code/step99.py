@@ -4,13 +4,18 @@ from typing import Dict, List, Optional
 from datetime import date, datetime
 import pandas as pd
 import re
-from numpy_financial import irr
 import numpy as np
 from math import isclose
+from types import MappingProxyType
+from functools import lru_cache
+import logging
 
+logger = logging.getLogger(__name__)
 
-def get_loan_terms_metadata() :
-    return [
+
+# Field metadata for the loan terms tables, built once at import. Entries are read-only;
+# use get_loan_terms_metadata(copy=True) for dicts that can be modified.
+_LOAN_TERMS_METADATA = tuple(MappingProxyType(entry) for entry in [
     {
         "FIELD": "ID",
         "DISPLAYNAME": "Loan ID",
@@ -1005,65 +1010,143 @@ def get_loan_terms_metadata() :
     },
 
 
-    ]
+    ])
 
-def get_draw_columns_Renames(X):
-    draw_columns = [c for c in X.columns if c.startswith('draw:') and ':details' not in c] 
-    draw_columns.sort()
-    draw_columns = list(draw_columns)
 
+# The same metadata in columnar form: one tuple per attribute, position i describes entry i
+_TABLES = tuple(entry["TABLE"] for entry in _LOAN_TERMS_METADATA)
+_FIELDS = tuple(entry["FIELD"] for entry in _LOAN_TERMS_METADATA)
+_DISPLAYS = tuple(entry["DISPLAYNAME"] for entry in _LOAN_TERMS_METADATA)
+_IN_SUMMARY = tuple(entry["IN_SUMMARY"] for entry in _LOAN_TERMS_METADATA)
+_DATA_TYPES = tuple(entry["DATA_TYPE"] for entry in _LOAN_TERMS_METADATA)
 
-    draw_amount = [draw_amt for draw_amt in draw_columns if draw_amt.endswith(":amount")]
-    draw_fee = [draw_amt for draw_amt in draw_columns if draw_amt.endswith(":fee")]
-    draw_unfunded = [draw_amt for draw_amt in draw_columns if draw_amt.endswith(":unfunded")]
-    draw_fee_unfunded = [draw_amt for draw_amt in draw_columns if draw_amt.endswith(":fee-unfunded")]
+# (TABLE, FIELD) -> position in the columns above
+_IDX_BY_TF = {table_field: idx for idx, table_field in enumerate(zip(_TABLES, _FIELDS))}
+# TABLE -> positions of its fields, in metadata order
+_FIELDS_BY_TABLE = {}
+for _idx, _table in enumerate(_TABLES):
+    _FIELDS_BY_TABLE.setdefault(_table, []).append(_idx)
+_FIELDS_BY_TABLE = {table: tuple(idxs) for table, idxs in _FIELDS_BY_TABLE.items()}
 
-    renamed_d = [amt_col.split(":")[1].split("[")[0].rstrip() for amt_col in draw_amount]
-    renamed_u = ["Unfunded:" + unfunded_col.split(":")[1].split("[")[0].rstrip()  for unfunded_col in draw_unfunded]
-    renamed_f = ["Fee:" + fee_col.split(":")[1].split("[")[0].rstrip()  for fee_col in draw_fee]
-    renamed_uf = ["Fee-Unfunded:" + fee_unfunded.split(":")[1].split("[")[0].rstrip()  for fee_unfunded in draw_fee_unfunded]
+# (TABLE, FIELD) -> DISPLAYNAME, for label lookups in the validators
+LOAN_TERMS_LABELS = {table_field: _DISPLAYS[idx] for table_field, idx in _IDX_BY_TF.items()}
 
-    print(">>>> " ,renamed_d)
-    
-    all_formatted_draw_names = []
 
-    ## VERY VERY VERY VERY IMP: the column names are sorted and so for each draw they are always 
-    # amount, fee, fee-unfunded and then unfunded - so the order in which the zip below is provided
-    ## need to stay the same
-    for x in zip(renamed_d, renamed_f,  renamed_uf, renamed_u):
-        all_formatted_draw_names.extend(list(x))
+def get_loan_terms_metadata(copy: bool = False):
+    """
+    Return the loan terms field metadata.
+
+    By default the shared read-only entries are returned. Pass copy=True to get a list of
+    plain dicts, e.g. when the entries are edited or serialized.
+    """
+    if copy:
+        return [dict(entry) for entry in _LOAN_TERMS_METADATA]
+    return _LOAN_TERMS_METADATA
 
 
+# draw column suffix -> prefix of its client facing name
+_DRAW_RENAME_PREFIXES = {
+    'amount': '',
+    'fee': 'Fee:',
+    'fee-unfunded': 'Fee-Unfunded:',
+    'unfunded': 'Unfunded:',
+}
+
+def get_draw_columns_Renames(X):
+    columns = X.columns
+    is_draw_column = columns.str.startswith('draw:', na=False) & ~columns.str.contains(':details', regex=False, na=False)
+    draw_columns = columns[is_draw_column].sort_values().tolist()
+
+    # draw:<account> [<policy>]:<suffix> -> <prefix><account>, e.g. draw:Construction [1]:fee -> Fee:Construction
     column_rename = {}
-    for idx, i in enumerate(draw_columns):
-        print(idx, i)
-        column_rename[draw_columns[idx]] = all_formatted_draw_names[idx]
+    for col in draw_columns:
+        parts = col.split(':')
+        prefix = _DRAW_RENAME_PREFIXES.get(parts[-1])
+        if prefix is not None:
+            column_rename[col] = prefix + parts[1].partition('[')[0].rstrip()
 
     return draw_columns, column_rename
 
-def prepare_for_client(X):
-    draw_columns_original, renames = get_draw_columns_Renames(X)
-    print(draw_columns_original)
+# output column names: ' ', ':' and '-' become '_', brackets are dropped, then any _<number> is removed
+_COLUMN_NAME_TRANSLATION = str.maketrans({' ': '_', ':': '_', '-': '_', '[': None, ']': None})
+_NUMBER_SUFFIX_RX = re.compile(r'_[0-9]+')
 
-    # this will set the order in which the columns should appear
-    all_output_columns = ['accrual_period','accrual_start_date', 'accrual_end_date']
-    all_output_columns.extend(draw_columns_original)
-    all_output_columns.extend(['interest_paid_at_start','principal_paid_at_start','cummulative_outstanding_principal','interest_accrual_method','actual_accrual_days','adjusted_30_360_accrual_days','interest_rate_type','base_interest_rate','period_multiplier','period_base_interest_multiplier'])
-    all_output_columns.extend(['base_interest_amount_due_for_this_period','base_interest_amount_unpaid_from_previous_period','base_interest_amount_due_at_start_of_next_period','cummulative_pik_amount_due'])
-    all_output_columns.extend(['payment_type','is_principal_due_at_start','principal_paid_at_start','principal_due_at_start_of_next_period'])
-    all_output_columns.extend(['closing_fee_due','draw_fee_due','exit_fee_due_at_start_of_next_period','cummulative_unpaid_exit_fee_due_at_start_of_next_period','all_fees_due'])
+# Column name -> (data_type, in_summary) for the client schema. The alternatives are tried
+# in order at the start of the name, so the first matching rule wins (date beats currency, etc.)
+_COLUMN_KIND_RX = re.compile(
+    r'^(?:'
+    r'(?P<date>(?=.*date))'
+    r'|(?P<bool>is_)'
+    r'|(?P<num>(?=.*_days)|(?!.*_type)(?=.*_multiplier))'
+    r'|(?P<pct>(?!.*_type)(?=.*_rate))'
+    r'|(?P<cur>(?=.*(?:amount|fee|_paid|principal)))'
+    r')'
+)
+_COLUMN_KINDS = {
+    'date': ('date', True),
+    'bool': ('bool', False),
+    'num': ('num', False),
+    'pct': ('percentage', False),
+    'cur': ('currency', True),
+}
+
+# check _fee_unfunded before _unfunded and _fee
+_DRAW_DISPLAY_SUFFIXES = (
+    ('_amount', ' Amount', '(Funded)'),
+    ('_fee_unfunded', ' Fee Unfunded', '(Unfunded Fee)'),
+    ('_unfunded', ' Unfunded', '(Unfunded)'),
+    ('_fee', ' Fee', '(Fee)'),
+)
+
+# client output columns, in display order; the draw columns of each deal go in between
+_OUTPUT_COLUMNS_BEFORE_DRAWS = ('accrual_period','accrual_start_date', 'accrual_end_date')
+_OUTPUT_COLUMNS_AFTER_DRAWS = (
+    'interest_paid_at_start','principal_paid_at_start','cummulative_outstanding_principal','interest_accrual_method','actual_accrual_days','adjusted_30_360_accrual_days','interest_rate_type','base_interest_rate','period_multiplier','period_base_interest_multiplier',
+    'base_interest_amount_due_for_this_period','base_interest_amount_unpaid_from_previous_period','base_interest_amount_due_at_start_of_next_period','cummulative_pik_amount_due',
+    'payment_type','is_principal_due_at_start','principal_paid_at_start','principal_due_at_start_of_next_period',
+    'closing_fee_due','draw_fee_due','exit_fee_due_at_start_of_next_period','cummulative_unpaid_exit_fee_due_at_start_of_next_period','all_fees_due',
     # Pref equity columns from step7_pref_equity.py
-    all_output_columns.extend(['pref_amount_drawn','pref_equity_catch_up','min_moic_catch_up','pref_cashflow'])
+    'pref_amount_drawn','pref_equity_catch_up','min_moic_catch_up','pref_cashflow',
+)
+
+@lru_cache(maxsize=1024)
+def get_amort_column_type(name):
+    """
+    Return (data_type, in_summary) for a lower-cased amort column name.
+
+    The loan terms metadata has no AMORT entries, so the type comes from the column name. The
+    same names come back on every deal, hence the cache.
+    """
+    match = _COLUMN_KIND_RX.match(name)
+    data_type, in_summary = _COLUMN_KINDS[match.lastgroup] if match else ('string', False)
 
+    # Special handling for pref equity columns:
+    # - pref_equity_catch_up and min_moic_catch_up should be IN_SUMMARY (users want to see these)
+    # - pref_amount_drawn should NOT be in summary (less important)
+    if name == 'pref_equity_catch_up' or name == 'min_moic_catch_up':
+        return 'currency', True
+    elif name == 'pref_amount_drawn':
+        return data_type, False
+    return data_type, in_summary
+
+# every amort column's schema entry starts from this; the key order is the order sent to the client
+_SCHEMA_TEMPLATE = {'field': None, 'table': "AMORT", 'displayName': None, 'in_summary': False, 'data_type': None, 'order': 0}
+
+def prepare_for_client(X):
+    draw_columns_original, renames = get_draw_columns_Renames(X)
+    logger.debug("draw columns: %s", draw_columns_original)
 
+    # this will set the order in which the columns should appear
+    all_output_columns = [*_OUTPUT_COLUMNS_BEFORE_DRAWS, *draw_columns_original, *_OUTPUT_COLUMNS_AFTER_DRAWS]
 
     # this can happen if say exit fee did not exits then its related columns never got added to the df
-    missing_columns = [col for col in all_output_columns if col not in X.columns] 
-    for col in missing_columns:
-        X[col] = 0
+    # add them all as 0 in one reindex instead of one insert per column
+    missing_columns = pd.Index(all_output_columns).difference(X.columns, sort=False)
+    if len(missing_columns):
+        X = X.reindex(columns=X.columns.append(missing_columns), fill_value=0)
 
     
-    new_col_names = [re.sub(r'_[0-9]+', '', c.replace(' ', '_') .replace(':', '_') .replace('[', '') .replace(']', '').replace('-','_')) for c in all_output_columns]
+    new_col_names = [_NUMBER_SUFFIX_RX.sub('', c.translate(_COLUMN_NAME_TRANSLATION)) for c in all_output_columns]
     name_mapping = dict(zip(all_output_columns, new_col_names))
     X = X.rename(columns=name_mapping)
     X = X[new_col_names] # do this to enforce column order
@@ -1073,78 +1156,46 @@ def prepare_for_client(X):
     for idx, col in enumerate(X.columns):
 
         
-        template = { "field": "accrual_period", "displayName": "accrual_period", "dataType": "int",  "view": "summary", "aggregation": None ,}
-        template = {}
+        template = _SCHEMA_TEMPLATE.copy()
         template['field']  = col.upper()
-        template['table'] = "AMORT"
-
-        col = col.lower()
-        template['displayName'] = col.replace('_',' ').title()
-        template['in_summary'] = False
 
-        
-        if('date' in col):
-            template['data_type'] = 'date'
-            template['in_summary'] = True
-        elif(col.startswith('is_')):
-            template['data_type'] = 'bool'
-        elif('_days' in col or '_multiplier' in col and '_type' not in col):
-            template['data_type'] = 'num'
-        elif('_rate' in col and '_type' not in col):
-           template['data_type'] = 'percentage' 
-        elif('amount' in col or 'fee' in col or 'amount' in col or '_paid' in col or 'principal' in col):
-            template['data_type'] = 'currency'
-            template['in_summary'] = True
-        else:
-            template['data_type'] = 'string'
+        name = col.lower()
+        template['displayName'] = name.replace('_',' ').title()
 
-        # Special handling for pref equity columns:
-        # - pref_equity_catch_up and min_moic_catch_up should be IN_SUMMARY (users want to see these)
-        # - pref_amount_drawn should NOT be in summary (less important)
-        if col == 'pref_equity_catch_up' or col == 'min_moic_catch_up':
-            template['in_summary'] = True
-            template['data_type'] = 'currency'
-        elif col == 'pref_amount_drawn':
-            template['in_summary'] = False
+        template['data_type'], template['in_summary'] = get_amort_column_type(name)
 
         template['order'] = idx+1
 
-
-        # special adjustment for Draw Columns:
-
-        'draw_Funded_At_Closing_amount', 'draw_Funded_At_Closing_fee', 'draw_Funded_At_Closing_fee_unfunded', 'draw_Funded_At_Closing_unfunded'
-        if(col.startswith('draw_')):
-            if(col.endswith('_amount')):
-               template['displayName'] = template['displayName'].replace('Draw ','').replace(' Amount','(Funded)')
-            if(col.endswith('_fee')):
-               template['displayName'] = template['displayName'].replace('Draw ','').replace(' Fee','(Fee)')
-
-            # check for _unfunded before checking _fee_unfunded
-            if(col.endswith('_fee_unfunded')):
-               template['displayName'] = template['displayName'].replace('Draw ','').replace(' Fee Unfunded','(Unfunded Fee)')
-            if(col.endswith('_unfunded') and not col.endswith("_fee_unfunded")):
-               template['displayName'] = template['displayName'].replace('Draw ','').replace(' Unfunded','(Unfunded)')
-
-            
+        # special adjustment for Draw Columns, e.g. draw_Funded_At_Closing_amount -> Funded At Closing(Funded)
+        if(name.startswith('draw_')):
+            for suffix, old_label, new_label in _DRAW_DISPLAY_SUFFIXES:
+                if(name.endswith(suffix)):
+                    template['displayName'] = template['displayName'].replace('Draw ','').replace(old_label, new_label)
+                    break
 
         schema.append(template)
-        print(template['displayName'])
 
 
-    print("\n\n\n****** ****** ****** ****** ****** ****** ****** \n")
-    print(schema.extend(get_loan_terms_metadata()))
-    print("\n\n\n****** ****** ****** ****** ****** ****** ****** \n")
+    # the loan terms fields follow the amort columns, numbered on from them
+    for order, entry in enumerate(get_loan_terms_metadata(), start=len(schema)+1):
+        entry = dict(entry)
+        entry['order'] = order
+        schema.append(entry)
 
-    for idx, elem in enumerate(schema):
-        elem['order'] = idx+1
-    
-    print(X.shape)
+    logger.debug("client output shape: %s", X.shape)
     return X, schema 
 
 
 
+# low-cardinality label columns of the schedule, kept as categoricals rather than object strings
+_CATEGORICAL_COLUMNS = ('interest_accrual_method', 'interest_rate_type', 'payment_type')
+
 def compute_cashflows(df):
     #df = df.copy()
+    for col in _CATEGORICAL_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+
     df['returns_related_date'] = pd.to_datetime(df['accrual_start_date'])
     
     df['interest_paid_at_start'] = df['interest_paid_at_start'].fillna(0)
@@ -1155,13 +1206,15 @@ def compute_cashflows(df):
     df['min_moic_catch_up'] = df['min_moic_catch_up'].fillna(0) if 'min_moic_catch_up' in df.columns else 0
     df['cashflow'] = 0
 
-    draw_amount_columns = [draw_amt_cols for draw_amt_cols in df.columns if draw_amt_cols.startswith('draw') and draw_amt_cols.endswith('_amount')]
-    df['all_draw_totals'] = -df[draw_amount_columns].fillna(0).sum(axis=1)
+    # classify the draw columns once, then sum straight from the values (NaN counts as 0)
+    is_draw_column = df.columns.str.startswith('draw')
+    draw_amount_columns = df.columns[is_draw_column & df.columns.str.endswith('_amount')]
+    draw_fee_amount_columns = df.columns[is_draw_column & df.columns.str.endswith('_fee')]
+    df['all_draw_totals'] = -np.nansum(df[draw_amount_columns].to_numpy(dtype=np.float64), axis=1)
     # We technically also gave them the fees that they then paid back to us. So fees need to be added as amount that left out pocket
     # now you might say why add "all_draw_fee_totals" and then negate with "add_fees_due" - just drop but NO - because all_fees_due will
     # also have Exit fees which are not negated out by all_draw_fee_total
-    draw_fee_amount_columns = [draw_amt_cols for draw_amt_cols in df.columns if draw_amt_cols.startswith('draw') and draw_amt_cols.endswith('_fee')]
-    df['all_draw_fee_totals'] = -df[draw_fee_amount_columns].fillna(0).sum(axis=1)
+    df['all_draw_fee_totals'] = -np.nansum(df[draw_fee_amount_columns].to_numpy(dtype=np.float64), axis=1)
     
     cashflow_components = [
         'all_draw_totals',
@@ -1173,33 +1226,56 @@ def compute_cashflows(df):
         'min_moic_catch_up'
     ]
 
-    df['cashflow'] = df[cashflow_components].fillna(0).sum(axis=1)
+    df['cashflow'] = np.nansum(df[cashflow_components].to_numpy(dtype=np.float64), axis=1)
     #baloon payment and last interest
-    df.loc[df.index[df.shape[0]-1], 'cashflow'] += df.loc[df.index[df.shape[0]-1], 'base_interest_amount_due_at_start_of_next_period'] + df.loc[df.index[df.shape[0]-1], 'principal_due_at_start_of_next_period'] 
+    cashflow_col = df.columns.get_loc('cashflow')
+    df.iat[-1, cashflow_col] = (df.iat[-1, cashflow_col]
+                                + df.iat[-1, df.columns.get_loc('base_interest_amount_due_at_start_of_next_period')]
+                                + df.iat[-1, df.columns.get_loc('principal_due_at_start_of_next_period')]) 
 
 
 
 
 
-def calculate_IRR(df):
-    print(irr(df['cashflow']))
-    return irr(df['cashflow'])
+def _newton_rate(cashflow, periods, rate=0.1, max_iter=100):
+    """
+    Newton solve for the rate r with sum(cashflow / (1 + r) ** periods) == 0.
 
-def calculate_XIRR(df):
-    df = df.sort_values('returns_related_date')
-    years = (df['returns_related_date'] - df['returns_related_date'].iloc[0]).dt.days / 365.0
-    func = lambda r: np.sum(df['cashflow'] / (1 + r) ** years)
-    rate = 0.1
-    for _ in range(100):
-        f = func(rate)
-        f_prime = np.sum(-years * df['cashflow'] / (1 + rate) ** (years + 1))
+    periods are in whatever unit the rate is per (months for IRR, years for XIRR).
+    Returns (rate, converged).
+    """
+    weighted_cashflow = -periods * cashflow
+    for _ in range(max_iter):
+        discount = (1 + rate) ** periods
+        f = np.sum(cashflow / discount)
+        f_prime = np.sum(weighted_cashflow / (discount * (1 + rate)))
         if f_prime == 0: break
         new_rate = rate - f / f_prime
         if isclose(new_rate, rate, rel_tol=1e-9): 
-            print("1. XIRR :::::::::::: ",rate, " ::::::::::::")
-            return rate
+            return rate, True
         rate = new_rate
-    print("2. XIRR :::::::::::: ",rate, " ::::::::::::")
+    return rate, False
+
+def calculate_IRR(df):
+    # evenly spaced periods, so this is the XIRR solve with period numbers for times
+    cashflow = df['cashflow'].to_numpy(dtype=np.float64)
+    with np.errstate(over='ignore', invalid='ignore'):
+        rate, converged = _newton_rate(cashflow, np.arange(len(cashflow), dtype=np.float64))
+    if not converged or not np.isfinite(rate) or rate <= -1:
+        # fall back to numpy_financial's polynomial roots when Newton does not settle
+        from numpy_financial import irr
+        rate = irr(cashflow)
+    logger.debug("IRR: %s", rate)
+    return rate
+
+def calculate_XIRR(df):
+    df = df.sort_values('returns_related_date')
+    # pull the raw arrays once so every Newton step is plain ndarray math
+    cashflow = df['cashflow'].to_numpy(dtype=np.float64)
+    dates = df['returns_related_date']
+    years = (dates - dates.iloc[0]).dt.days.to_numpy(dtype=np.float64) / 365.0
+    rate, converged = _newton_rate(cashflow, years)
+    logger.debug("XIRR (%s): %s", "converged" if converged else "not converged", rate)
     return rate
 
 def calculate_MOIC(df):
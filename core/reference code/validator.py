@@ -1,247 +1,255 @@
 import json
-from step99 import get_loan_terms_metadata
+import operator
+from step99 import LOAN_TERMS_LABELS
 from datetime import datetime
+from functools import lru_cache
+
+# default for dict.get when a present None must be told apart from an absent key
+MISSING = object()
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    # Dates are checked by several rules (format, relationships), so each distinct string is parsed once.
+    # Returns (date, None) when valid, else (None, strptime's error text)
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date(), None
+    except ValueError as e:
+        return None, str(e)
 
 def quick_message_maker(parent_dict_name, text_message, buffer):
-        t = {}
-        t['TABLE'] = parent_dict_name.upper()
-        t['ID'] = None
-        t['FIELD'] = None
-        t['MESSAGE'] = text_message
-        buffer.append(t)
-
-def log_required_fields_error(parent_dict, parent_table_name, required_high_level_keys, buff, metadata):
+        buffer.append({'TABLE': parent_dict_name.upper(), 'ID': None, 'FIELD': None, 'MESSAGE': text_message})
+
+def log_required_fields_error(parent_dict, parent_table_name, required_high_level_keys, buff, labels):
+    table = parent_table_name.upper()
+    append = buff.append
     for key in required_high_level_keys:
-        if(key not in parent_dict.keys()):
-            t = {}
-            t['TABLE'] = parent_table_name.upper()
-            t['ID'] = parent_dict['ID']
-            t['FIELD'] = key.upper()
-            label = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-            t['MESSAGE'] = f"\"{label}\" is required."
-    
-            buff.append(t)
+        if(key not in parent_dict):
+            field = key.upper()
+            append({'TABLE': table, 'ID': parent_dict['ID'], 'FIELD': field,
+                    'MESSAGE': f"\"{labels[(table, field)]}\" is required."})
+
+# relationship code -> (check that is True when the relationship does NOT hold, error message)
+DATE_RELATIONSHIPS = {
+    "EQ": (operator.ne, "{label1} ({dt1}) and {label2} ({dt2}) are required to be the same date. But they are not"),
+    "GT": (operator.le, "{label1} ({dt1}) is supposed to be after {label2} ({dt2}). But it is not"),
+    "GT_E": (operator.lt, "{label1} ({dt1}) is supposed to be after or same as {label2} ({dt2}). But it is not"),
+    "LT": (operator.ge, "{label1} ({dt1}) is supposed to be before {label2} ({dt2}). But it is not"),
+    "LT_E": (operator.gt, "{label1} ({dt1}) is supposed to be before or same as {label2} ({dt2}). But it is not"),
+}
 
 def log_date_relationship_error(parent_dict1, parent_table_name1, date1_key,
                                 parent_dict2, parent_table_name2, date2_key, 
-                                date1_rel_with_date2, buff, metadata) -> bool:
+                                date1_rel_with_date2, buff, labels) -> bool:
 
     try: 
-        dt1 = datetime.strptime(parent_dict1[date1_key], "%Y-%m-%d").date()
-        dt2 = datetime.strptime(parent_dict2[date2_key], "%Y-%m-%d").date()
-    except ValueError as e:
-        return # do nothing - this method is not responsible to check format of dates
+        dt1, error1 = parse_date(parent_dict1[date1_key])
+        dt2, error2 = parse_date(parent_dict2[date2_key])
     except KeyError as e:
         return # do nothing - this method is not responsible to check format of dates
+    if(error1 or error2):
+        return # do nothing - this method is not responsible to check format of dates
     
-    t = {}
-    t['TABLE'] = parent_table_name1.upper()
-    t['ID'] = parent_dict1['ID']
-    
-    if(date1_rel_with_date2 == "EQ"):
-        if(dt1 != dt2):            
-            t['FIELD'] = date1_key.upper()
-            label1 = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-            label2 = [lab for lab in metadata if (lab['FIELD'] == date2_key.upper() and lab['TABLE'] == parent_table_name2.upper())][0]['DISPLAYNAME']
-            t['MESSAGE'] = f"{label1} ({dt1}) and {label2} ({dt2}) are required to be the same date. But they are not"
-        
-    elif(date1_rel_with_date2 == "GT"):
-        if(dt1 <= dt2):  
-            t['FIELD'] = date1_key.upper()
-            label1 = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-            label2 = [lab for lab in metadata if (lab['FIELD'] == date2_key.upper() and lab['TABLE'] == parent_table_name2.upper())][0]['DISPLAYNAME']
-            t['MESSAGE'] = f"{label1} ({dt1}) is supposed to be after {label2} ({dt2}). But it is not"
-    
-    elif(date1_rel_with_date2 == "GT_E"):
-        if(dt1 < dt2):  
-            t['FIELD'] = date1_key.upper()
-            label1 = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-            label2 = [lab for lab in metadata if (lab['FIELD'] == date2_key.upper() and lab['TABLE'] == parent_table_name2.upper())][0]['DISPLAYNAME']
-            t['MESSAGE'] = f"{label1} ({dt1}) is supposed to be after or same as {label2} ({dt2}). But it is not"
-
-    if(date1_rel_with_date2 == "LT"):
-        if(dt1 >= dt2):  
-            t['FIELD'] = date1_key.upper()
-            label1 = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-            label2 = [lab for lab in metadata if (lab['FIELD'] == date2_key.upper() and lab['TABLE'] == parent_table_name2.upper())][0]['DISPLAYNAME']
-            t['MESSAGE'] = f"{label1} ({dt1}) is supposed to be before {label2} ({dt2}). But it is not"
-        
-    if(date1_rel_with_date2 == "LT_E"):
-        if(dt1 > dt2):  
-            t['FIELD'] = date1_key.upper()
-            label1 = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-            label2 = [lab for lab in metadata if (lab['FIELD'] == date2_key.upper() and lab['TABLE'] == parent_table_name2.upper())][0]['DISPLAYNAME']
-            t['MESSAGE'] = f"{label1} ({dt1}) is supposed to be before or same as {label2} ({dt2}). But it is not"
-    
-    if('MESSAGE' in t.keys()):
-        buff.append(t)
-
-
-
-def log_date_error(parent_dict, parent_table_name, dt_key, buff, metadata):
-    try: 
-        if(dt_key in parent_dict.keys()):
-            # print(':::: >>>  ',parent_dict[dt_key])
-            datetime.strptime(parent_dict[dt_key], "%Y-%m-%d").date()
-    except ValueError as e:
-        user_friendly_message = str(e).replace('%Y-%m-%d','YYYY-MM-DD')
-        t = {}
-        t['TABLE'] = parent_table_name.upper()
-        t['ID'] = parent_dict['ID']
-        t['FIELD'] = dt_key.upper()
-        label = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-        t['MESSAGE'] = f"\"{label}\" has a problem: {user_friendly_message }."
-        buff.append(t)
-
-
-def log_amount_error(parent_dict, parent_table_name, amt_key, buff, metadata):
+    relationship = DATE_RELATIONSHIPS.get(date1_rel_with_date2)
+    if(relationship is None):
+        return
+    is_violated, message = relationship
+    if(is_violated(dt1, dt2)):
+        table, field = parent_table_name1.upper(), date1_key.upper()
+        buff.append({'TABLE': table, 'ID': parent_dict1['ID'], 'FIELD': field,
+                     'MESSAGE': message.format(label1=labels[(table, field)], dt1=dt1,
+                                               label2=labels[(parent_table_name2.upper(), date2_key.upper())], dt2=dt2)})
+
+
+
+def log_date_error(parent_dict, parent_table_name, dt_key, buff, labels):
+    value = parent_dict.get(dt_key, MISSING)
+    if(value is not MISSING):
+        _, error = parse_date(value)
+        if(error is None):
+            return
+        user_friendly_message = error.replace('%Y-%m-%d','YYYY-MM-DD')
+        table, field = parent_table_name.upper(), dt_key.upper()
+        buff.append({'TABLE': table, 'ID': parent_dict['ID'], 'FIELD': field,
+                     'MESSAGE': f"\"{labels[(table, field)]}\" has a problem: {user_friendly_message}."})
+
+
+def log_amount_error(parent_dict, parent_table_name, amt_key, buff, labels):
     try:
-        if(amt_key in parent_dict.keys()):
+        if(amt_key in parent_dict):
             parent_dict[amt_key] = float(parent_dict[amt_key]) # we do this in case front end send us string but the value is valid
     except ValueError as e:
         user_friendly_message = str(e).replace('string to float',f"this to valid a numeric value: ") 
-        t = {}
-        t['TABLE'] = parent_table_name.upper()
-        t['ID'] = parent_dict['ID']
-        t['FIELD'] = amt_key.upper()
-        label = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-        t['MESSAGE'] = f"\"{label}\" has a problem: {user_friendly_message}."
-        buff.append(t)
-
-
-
-def run_loan_info_level_checks(loan_terms, warning_buffer, errors_buffer, metadata):
-    
+        table, field = parent_table_name.upper(), amt_key.upper()
+        buff.append({'TABLE': table, 'ID': parent_dict['ID'], 'FIELD': field,
+                     'MESSAGE': f"\"{labels[(table, field)]}\" has a problem: {user_friendly_message}."})
+
+
+
+# Row level checks as (check, *args) instructions, run in order by run_checks. Each check takes
+# (row, table, warning_buffer, errors_buffer, labels, *args)
+def check_required(row, table, warning_buffer, errors_buffer, labels, fields):
+    log_required_fields_error(row, table, fields, errors_buffer, labels)
+
+def check_dates_in_row_order(row, table, warning_buffer, errors_buffer, labels, fields):
+    for dt_key in [key for key in row if key in fields]:
+        log_date_error(row, table, dt_key, errors_buffer, labels)
+
+def check_date(row, table, warning_buffer, errors_buffer, labels, field):
+    log_date_error(row, table, field, errors_buffer, labels)
+
+def check_amount(row, table, warning_buffer, errors_buffer, labels, field, message_table=None):
+    log_amount_error(row, message_table or table, field, errors_buffer, labels)
+
+def check_date_relationship(row, table, warning_buffer, errors_buffer, labels, field1, field2, relationship):
+    log_date_relationship_error(row, table, field1, row, table, field2, relationship, errors_buffer, labels)
+
+def check_arrays_not_empty(row, table, warning_buffer, errors_buffer, labels, arrays):
+    for array_key, message, is_error in arrays:
+        if(not row.get(array_key)):
+            quick_message_maker(table, message, errors_buffer if is_error else warning_buffer)
+
+def check_floating_rate_warnings(row, table, warning_buffer, errors_buffer, labels):
+    #Minor Warning
+    for field, message in FLOATING_RATE_WARNINGS:
+        if(field not in row):
+            warning_buffer.append({'TABLE': table, 'ID': row['ID'], 'FIELD': field, 'MESSAGE': message})
+
+def run_checks(checks, row, table, warning_buffer, errors_buffer, labels):
+    for check, *args in checks:
+        check(row, table, warning_buffer, errors_buffer, labels, *args)
+
+
+LOAN_INFO_REQUIRED_FIELDS = ('ID','NAME','LLC_BI__AMOUNT__C','LLC_BI__MATURITY_DATE__C','LLC_BI__CLOSEDATE__C',
+                             'LLC_BI__FIRST_PAYMENT_DATE__C','LLC_BI__FUNDING_AT_CLOSE__C')
+LOAN_INFO_REQUIRED_DATE_FIELDS = frozenset(key for key in LOAN_INFO_REQUIRED_FIELDS if 'DATE' in key)
+
+# (array, message when it is missing or empty, whether that is an error rather than a warning)
+LOAN_INFO_REQUIRED_ARRAYS = (
+    ('PRICING_DETAILS', "Pricing Details are required.", True),
+    ('PAYMENT_DETAILS', "Payment Details are required.", True),
+    ('FEE_DETAILS', "Fee Details are missing.", False),
+    ('DRAW_DETAILS', "Draw Details are missing. If \"Funded At Closing\" amount is provided, that will be the only draw on this deal", False),
+)
+
+PRICING_REQUIRED_FIELDS = ('CM_PARTIAL_PERIOD_INTERST_ACCRUAL_METHOD__C','CM_INTEREST_ACCRUAL_METHOD__C','LLC_BI__EFFECTIVE_DATE__C_Y',
+                           'LLC_BI__TERM_LENGTH__C_Y','LLC_BI__TERM_UNIT__C_Y','LLC_BI__INTEREST_RATE_TYPE__C')
+PRICING_REQUIRED_DATE_FIELDS = tuple(key for key in PRICING_REQUIRED_FIELDS if 'DATE' in key)
+
+# optional floating rate fields -> warning when they are missing, formatted once with the field labels
+FLOATING_RATE_WARNINGS = tuple((field, message.format(label=LOAN_TERMS_LABELS[('PRICING', field)])) for field, message in (
+    ("LLC_BI__RATE_FLOOR__C", "{label} is required for when dealing with Floating Rate pricing. 0% floor will be assumed"),
+    ("LLC_BI__RATE_CEILING__C", "{label} is required for when dealing with Floating Rate pricing. There will be no ceiling"),
+    ("LLC_BI__SPREAD__C", "{label} is required for when dealing with Floating Rate pricing. 0% Spread will be assumed"),
+))
+
+# Are all required fields present, are all dates in proper format (the rate dependent fields are not dates)
+PRICING_CHECKS = (
+    (check_required, PRICING_REQUIRED_FIELDS),
+    *((check_date, dt_key) for dt_key in PRICING_REQUIRED_DATE_FIELDS),
+)
+PRICING_FIXED_RATE_CHECKS = (
+    (check_required, PRICING_REQUIRED_FIELDS + ("LLC_BI__ALL_IN_RATE__C",)),
+    *PRICING_CHECKS[1:],
+)
+PRICING_FLOATING_RATE_CHECKS = (
+    (check_required, PRICING_REQUIRED_FIELDS + ("LLC_BI__INDEX__C",)),
+    *PRICING_CHECKS[1:],
+    (check_floating_rate_warnings,),
+)
+
+# every PAYMENT field the metadata knows as a date; any of them present in a zone gets format checked
+PAYMENT_DATE_FIELDS = frozenset(field for (table, field) in LOAN_TERMS_LABELS if table == 'PAYMENT' and 'DATE' in field)
+
+PAYMENT_REQUIRED_FIELDS = ('LLC_BI__PAYMENT_TYPE__C','LLC_BI__EFFECTIVE_DATE__C_Y','LLC_BI__TERM_LENGTH__C_Y',
+                           'LLC_BI__TERM_UNIT__C_Y','LLC_BI__FREQUENCY__C')
+
+LOAN_INFO_CHECKS = (
     # Are all required fields present
-    required_fields = ['ID','NAME','LLC_BI__AMOUNT__C','LLC_BI__MATURITY_DATE__C','LLC_BI__CLOSEDATE__C',
-                                'LLC_BI__FIRST_PAYMENT_DATE__C','LLC_BI__FUNDING_AT_CLOSE__C']
-    log_required_fields_error(loan_terms, 'LOAN_INFO',required_fields, errors_buffer, metadata)
-
-    
-    #Are all dates in proper format
-    date_fields = [key for key in loan_terms.keys() if 'DATE' in key and key in required_fields]
-    for dt_key in date_fields:
-        log_date_error(loan_terms, 'LOAN_INFO', dt_key, errors_buffer, metadata)
-
-    #Are numeric fields in proper format
-    amount_fields = ['LLC_BI__AMOUNT__C','LLC_BI__FUNDING_AT_CLOSE__C']
-    for amt_key in amount_fields:
-        log_amount_error(loan_terms, 'LOAN_INFO', amt_key, errors_buffer, metadata)
-
-
-    #ensure that required Array's have data
-    if('PRICING_DETAILS' not in loan_terms.keys() or  len(loan_terms['PRICING_DETAILS']) == 0):
-        quick_message_maker('LOAN_INFO',"Pricing Details are required.", errors_buffer)
-
-    if('PRICING_DETAILS' not in loan_terms.keys() or  len(loan_terms['PRICING_DETAILS']) == 0):
-        quick_message_maker('LOAN_INFO',"Payment Details are required.", errors_buffer)
-        
-    if('FEE_DETAILS' not in loan_terms.keys() or  len(loan_terms['FEE_DETAILS']) == 0):
-        quick_message_maker('LOAN_INFO', "Fee Details are missing.", warning_buffer)
-
-    if('DRAW_DETAILS' not in loan_terms.keys() or  len(loan_terms['DRAW_DETAILS']) == 0):
-        quick_message_maker('LOAN_INFO', "Draw Details are missing. If \"Funded At Closing\" amount is provided, that will be the only draw on this deal", warning_buffer)
-
-
-    log_date_relationship_error(loan_terms, 'LOAN_INFO' ,'LLC_BI__CLOSEDATE__C',
-                                loan_terms, 'LOAN_INFO' ,'LLC_BI__MATURITY_DATE__C',"LT", errors_buffer, metadata)
+    (check_required, LOAN_INFO_REQUIRED_FIELDS),
+    # Are all dates in proper format (in the order they appear in loan_terms)
+    (check_dates_in_row_order, LOAN_INFO_REQUIRED_DATE_FIELDS),
+    # Are numeric fields in proper format
+    (check_amount, 'LLC_BI__AMOUNT__C'),
+    (check_amount, 'LLC_BI__FUNDING_AT_CLOSE__C'),
+    # ensure that required Array's have data
+    (check_arrays_not_empty, LOAN_INFO_REQUIRED_ARRAYS),
+    (check_date_relationship, 'LLC_BI__CLOSEDATE__C', 'LLC_BI__MATURITY_DATE__C', "LT"),
+)
+
+DRAW_CHECKS = (
+    # Rule 2: Required fields validation for other draws
+    (check_required, ('LLC_BI__AMOUNT__C', 'CM_FEE_DATE__C', 'CM_END_DATE__C', 'LLC_BI__FEE_TYPE__C')),
+    # Validate date formats
+    (check_date, 'CM_FEE_DATE__C'),
+    (check_date, 'CM_END_DATE__C'),
+    # Validate amount format (reported under DRAW_DETAILS)
+    (check_amount, 'LLC_BI__AMOUNT__C', 'DRAW_DETAILS'),
+    # Rule 4: Date relationship - CM_END_DATE__C >= CM_FEE_DATE__C
+    (check_date_relationship, 'CM_END_DATE__C', 'CM_FEE_DATE__C', 'GT_E'),
+)
+
+
+def run_loan_info_level_checks(loan_terms, warning_buffer, errors_buffer, labels):
+    run_checks(LOAN_INFO_CHECKS, loan_terms, 'LOAN_INFO', warning_buffer, errors_buffer, labels)
         
         
 
 
-def run_pricing_details_related_checks(loan_terms, warning_buffer, errors_buffer, metadata):
-    
-    for pricing_zone in loan_terms['PRICING_DETAILS']:
-        
-        # Are all required fields present
-        required_fields = ['CM_PARTIAL_PERIOD_INTERST_ACCRUAL_METHOD__C','CM_INTEREST_ACCRUAL_METHOD__C','LLC_BI__EFFECTIVE_DATE__C_Y',
-                           'LLC_BI__TERM_LENGTH__C_Y','LLC_BI__TERM_UNIT__C_Y','LLC_BI__INTEREST_RATE_TYPE__C']
-        
-        if('LLC_BI__INTEREST_RATE_TYPE__C' in pricing_zone):
-            interest_rate_type = pricing_zone["LLC_BI__INTEREST_RATE_TYPE__C"]
-            if interest_rate_type == "Fixed":
-                required_fields.append("LLC_BI__ALL_IN_RATE__C")
-            else: 
-                required_fields.append("LLC_BI__INDEX__C")
-                
-        
-        log_required_fields_error(pricing_zone, 'PRICING', required_fields, errors_buffer, metadata)
-    
-        #Are all dates in proper format
-        date_fields = [key for key in pricing_zone.keys() if 'DATE' in key and key in required_fields]
-        for dt_key in date_fields:
-            log_date_error(pricing_zone, 'PRICING', dt_key, errors_buffer, metadata)
+def run_pricing_details_related_checks(loan_terms, warning_buffer, errors_buffer, labels):
+    pricing_zones = loan_terms.get('PRICING_DETAILS')
+    if not pricing_zones:
+        return  # already reported by the loan info checks
     
-        #Minor Warning
-        if interest_rate_type != "Fixed":
-            if("LLC_BI__RATE_FLOOR__C" not in pricing_zone.keys()):
-                t = {}
-                t['TABLE'] = 'PRICING'
-                t['ID'] = pricing_zone['ID']
-                t['FIELD'] = 'LLC_BI__RATE_FLOOR__C'
-                label = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-                t['MESSAGE'] = f"{label} is required for when dealing with Floating Rate pricing. 0% floor will be assumed"                
-                warning_buffer.append(t)
-
-            if("LLC_BI__RATE_CEILING__C" not in pricing_zone.keys()):
-                t = {}
-                t['TABLE'] = 'PRICING'
-                t['ID'] = pricing_zone['ID']
-                t['FIELD'] = 'LLC_BI__RATE_CEILING__C'
-                label = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-                t['MESSAGE'] = f"{label} is required for when dealing with Floating Rate pricing. There will be no ceiling"                
-                warning_buffer.append(t)
-
-            if("LLC_BI__SPREAD__C" not in pricing_zone.keys()):
-                t = {}
-                t['TABLE'] = 'PRICING'
-                t['ID'] = pricing_zone['ID']
-                t['FIELD'] = 'LLC_BI__SPREAD__C'
-                label = [lab for lab in metadata if (lab['FIELD'] == t['FIELD'] and lab['TABLE'] == t['TABLE'])][0]['DISPLAYNAME']
-                t['MESSAGE'] = f"{label} is required for when dealing with Floating Rate pricing. 0% Spread will be assumed"                
-                warning_buffer.append(t)
+    for pricing_zone in pricing_zones:
+        interest_rate_type = pricing_zone.get("LLC_BI__INTEREST_RATE_TYPE__C", MISSING)
+        if(interest_rate_type is MISSING):
+            checks = PRICING_CHECKS  # the missing rate type itself is reported as a required field
+        elif(interest_rate_type == "Fixed"):
+            checks = PRICING_FIXED_RATE_CHECKS
+        else:
+            checks = PRICING_FLOATING_RATE_CHECKS
+        run_checks(checks, pricing_zone, 'PRICING', warning_buffer, errors_buffer, labels)
             
 
-def run_payment_details_related_checks(loan_terms, warning_buffer, errors_buffer, metadata):
+def run_payment_details_related_checks(loan_terms, warning_buffer, errors_buffer, labels):
     
-    for payment_zone in loan_terms['PAYMENT_DETAILS']:
+    payment_zones = loan_terms.get('PAYMENT_DETAILS')
+    if not payment_zones:
+        return  # already reported by the loan info checks
+
+    for payment_zone in payment_zones:
         # Are all required fields present
-        required_fields = ['LLC_BI__PAYMENT_TYPE__C','LLC_BI__EFFECTIVE_DATE__C_Y','LLC_BI__TERM_LENGTH__C_Y',
-                           'LLC_BI__TERM_UNIT__C_Y','LLC_BI__FREQUENCY__C'
-                          ]
+        required_fields = PAYMENT_REQUIRED_FIELDS
         # Check that Amortization info is provided
         if('principal' in payment_zone['LLC_BI__TYPE__C'].lower()):
-            required_fields.append('CM_AMORTIZED_TERM_MONTHS__C')
-        log_required_fields_error(payment_zone, 'PAYMENT', required_fields, errors_buffer, metadata)
+            required_fields += ('CM_AMORTIZED_TERM_MONTHS__C',)
+        log_required_fields_error(payment_zone, 'PAYMENT', required_fields, errors_buffer, labels)
             
 
         #Are all dates in proper format - we are only going to check values of fields that are required
-        date_fields = [key for key in payment_zone.keys() if 'DATE' in key]
+        date_fields = [key for key in payment_zone if key in PAYMENT_DATE_FIELDS]
         for dt_key in date_fields:
-            log_date_error(payment_zone, 'PAYMENT', dt_key, errors_buffer, metadata)
+            log_date_error(payment_zone, 'PAYMENT', dt_key, errors_buffer, labels)
 
 
             
 
 
-def run_draw_details_related_checks(loan_terms, warning_buffer, errors_buffer, metadata):
+def run_draw_details_related_checks(loan_terms, warning_buffer, errors_buffer, labels):
 
-    if 'DRAW_DETAILS' not in loan_terms.keys() or len(loan_terms['DRAW_DETAILS']) == 0:
+    draws = loan_terms.get('DRAW_DETAILS')
+    if not draws:
         return  # No draws to validate
 
     # Separate draws into two categories
     funded_at_closing_draws = []
     other_draws = []
 
-    for draw in loan_terms['DRAW_DETAILS']:
-        # Check if this is "Funded at Closing" (case-insensitive) and NOT a MADE_UP_ ID
-        paid_at_closing = draw.get('LLC_BI__PAID_AT_CLOSING__C', '').lower()
-        draw_id = draw.get('ID', '')
-
-        if paid_at_closing == 'funded at closing' and not draw_id.startswith('MADE_UP_'):
-            funded_at_closing_draws.append(draw)
-        else:
-            other_draws.append(draw)
+    for draw in draws:
+        # "Funded at Closing" (case-insensitive) and NOT a MADE_UP_ ID
+        is_funded_at_closing = (draw.get('LLC_BI__PAID_AT_CLOSING__C', '').lower() == 'funded at closing'
+                                and not draw.get('ID', '').startswith('MADE_UP_'))
+        (funded_at_closing_draws if is_funded_at_closing else other_draws).append(draw)
 
     # Rule 1: Warning for "Funded at Closing" draws that will be combined
     if len(funded_at_closing_draws) > 0:
@@ -254,34 +262,20 @@ def run_draw_details_related_checks(loan_terms, warning_buffer, errors_buffer, m
         message = f"The following draws will be combined into a single Funded At Close Reserve bucket: {draw_list}"
         quick_message_maker('DRAW', message, warning_buffer)
 
-    # Rule 2: Required fields validation for other draws
-    required_fields = ['LLC_BI__AMOUNT__C', 'CM_FEE_DATE__C', 'CM_END_DATE__C', 'LLC_BI__FEE_TYPE__C']
+    # Rules 2 and 4: per draw field checks
+    total_draws = 0.0  # for Rule 3, summed in the same pass
     for draw in other_draws:
-        log_required_fields_error(draw, 'DRAW', required_fields, errors_buffer, metadata)
-
-        # Validate date formats
-        log_date_error(draw, 'DRAW', 'CM_FEE_DATE__C', errors_buffer, metadata)
-        log_date_error(draw, 'DRAW', 'CM_END_DATE__C', errors_buffer, metadata)
-
-        # Validate amount format
-        log_amount_error(draw, 'DRAW_DETAILS', 'LLC_BI__AMOUNT__C', errors_buffer, metadata)
-
-        # Rule 4: Date relationship - CM_END_DATE__C >= CM_FEE_DATE__C
-        log_date_relationship_error(draw, 'DRAW', 'CM_END_DATE__C',
-                                    draw, 'DRAW', 'CM_FEE_DATE__C', 'GT_E', errors_buffer, metadata)
+        run_checks(DRAW_CHECKS, draw, 'DRAW', warning_buffer, errors_buffer, labels)
+        # the amount check stores valid amounts back as floats; invalid ones are skipped (already reported)
+        amount = draw.get('LLC_BI__AMOUNT__C')
+        if isinstance(amount, float):
+            total_draws += amount
 
     # Rule 3: Sum validation - other draws should sum to loan amount
-    if 'LLC_BI__AMOUNT__C' in loan_terms.keys():
+    loan_amount = loan_terms.get('LLC_BI__AMOUNT__C', MISSING)
+    if loan_amount is not MISSING:
         try:
-            total_loan_amount = float(loan_terms['LLC_BI__AMOUNT__C'])
-            total_draws = 0.0
-
-            for draw in other_draws:
-                if 'LLC_BI__AMOUNT__C' in draw.keys():
-                    try:
-                        total_draws += float(draw['LLC_BI__AMOUNT__C'])
-                    except (ValueError, TypeError):
-                        pass  # Skip invalid amounts, they'll be caught by log_amount_error
+            total_loan_amount = float(loan_amount)
 
             # Compare with a small tolerance for floating-point precision
             if abs(total_draws - total_loan_amount) > 0.01:
@@ -291,48 +285,30 @@ def run_draw_details_related_checks(loan_terms, warning_buffer, errors_buffer, m
             pass  # Skip if loan amount is invalid
 
 
+def has_zone_starting_on(loan_terms, loan_date_key, zones):
+    # True if any zone's effective date is the loan's date (e.g. closing date); stops at the first hit
+    loan_date = loan_terms.get(loan_date_key, MISSING)
+    if(loan_date is MISSING):
+        return False
+    return any(zone.get('LLC_BI__EFFECTIVE_DATE__C_Y', MISSING) == loan_date for zone in zones)
+
+
 def validate_loan_terms(loan_terms):
-    metadata = get_loan_terms_metadata()
+    labels = LOAN_TERMS_LABELS
     warning_buffer = []
     errors_buffer = []
 
-    run_loan_info_level_checks(loan_terms, warning_buffer, errors_buffer, metadata)
-    run_pricing_details_related_checks(loan_terms, warning_buffer, errors_buffer, metadata)
-    run_payment_details_related_checks(loan_terms, warning_buffer, errors_buffer, metadata)
-    run_draw_details_related_checks(loan_terms, warning_buffer, errors_buffer, metadata)
+    run_loan_info_level_checks(loan_terms, warning_buffer, errors_buffer, labels)
+    run_pricing_details_related_checks(loan_terms, warning_buffer, errors_buffer, labels)
+    run_payment_details_related_checks(loan_terms, warning_buffer, errors_buffer, labels)
+    run_draw_details_related_checks(loan_terms, warning_buffer, errors_buffer, labels)
 
 
     #some additional cross-table checks
-    does_any_date_match = False
-    for pricing_zone in loan_terms['PRICING_DETAILS']:
-        does_any_date_match = False
-
-        if('LLC_BI__CLOSEDATE__C' in loan_terms.keys()):
-            closing_date = loan_terms['LLC_BI__CLOSEDATE__C']
-            if('LLC_BI__EFFECTIVE_DATE__C_Y' in pricing_zone.keys()):
-                effective_date = pricing_zone['LLC_BI__EFFECTIVE_DATE__C_Y']
-                # print(":::::::*********::::::::",closing_date, effective_date)
-                if(closing_date == effective_date):
-                    does_any_date_match = True
-                    break
-
-    if(not does_any_date_match):
+    if(not has_zone_starting_on(loan_terms, 'LLC_BI__CLOSEDATE__C', loan_terms.get('PRICING_DETAILS') or ())):
         quick_message_maker('PRICING',"At least one of the Pricing streams should start on the Closing Date, but none do", errors_buffer)
 
-    does_any_date_match = False
-    for payment_zone in loan_terms['PAYMENT_DETAILS']:
-        does_any_date_match = False
-
-        if('LLC_BI__FIRST_PAYMENT_DATE__C' in loan_terms.keys()):
-            first_payment = loan_terms['LLC_BI__FIRST_PAYMENT_DATE__C']
-            if('LLC_BI__EFFECTIVE_DATE__C_Y' in payment_zone.keys()):
-                effective_date = payment_zone['LLC_BI__EFFECTIVE_DATE__C_Y']
-                # print(":::::::*********::::::::",first_payment, effective_date) 
-                if(first_payment == effective_date):
-                    does_any_date_match = True
-                    break
-
-    if(not does_any_date_match):
+    if(not has_zone_starting_on(loan_terms, 'LLC_BI__FIRST_PAYMENT_DATE__C', loan_terms.get('PAYMENT_DETAILS') or ())):
         quick_message_maker('PAYMENT',"At least one of the Payment streams should start on the First Payment Date, but none do", errors_buffer)
 
     return warning_buffer, errors_buffer
@@ -24,18 +24,73 @@ Usage:
     loans = fetcher.search_loans(name_prefix="Vitalia")
 """
 
-import math
+import base64
+import copy
+import os
+import random
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote_plus
 
 from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceError, SalesforceGeneralError
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Caps concurrent SOQL queries per process (Salesforce limits concurrent API
+# requests); SF_MAX_CONCURRENCY tunes it to the org's tier
+_SF_MAX_CONCURRENCY = int(os.environ.get("SF_MAX_CONCURRENCY", 4))
+if _SF_MAX_CONCURRENCY < 1:
+    raise ValueError(f"SF_MAX_CONCURRENCY must be at least 1, got {_SF_MAX_CONCURRENCY}")
+_SF_QUERY_SLOTS = threading.BoundedSemaphore(_SF_MAX_CONCURRENCY)
+
+# (connect, read) timeout in seconds for every Salesforce REST call, so a hung
+# request cannot hold a query slot indefinitely
+_SF_REQUEST_TIMEOUT = (5, 60)
+
+# The OAuth token request (and its retries) runs under the class-wide
+# connection lock, so it gets a shorter timeout
+_SF_AUTH_TIMEOUT = (5, 15)
+
+# Retry policy for transient Salesforce failures (rate limits, 5xx, dropped connections)
+_RETRY_ATTEMPTS = 3
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 8.0
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRYABLE_ERROR_CODES = ("REQUEST_LIMIT_EXCEEDED", "UNABLE_TO_LOCK_ROW", "SERVER_UNAVAILABLE")
+
+# Authenticated clients are shared by every fetcher with the same credentials
+# and re-authenticated after this many seconds
+_CONNECTION_TTL = 30 * 60
+
+# Fetched loan terms (and name -> ID lookups) are reused for this many seconds,
+# so repeat fetches skip Salesforce while edits there still show up promptly
+_LOAN_CACHE_SIZE = 128
+_LOAN_CACHE_TTL = 5 * 60
+
+# Salesforce record IDs (15 or 18 alphanumeric characters); anything else would
+# make a whole IN-clause query fail
+_SF_ID_RE = re.compile(r'[a-zA-Z0-9]{15}(?:[a-zA-Z0-9]{3})?')
+
+# Most IDs placed in one SOQL IN clause (keeps query URLs well under the length limits)
+_IN_CLAUSE_CHUNK_SIZE = 200
+
+# Loan names of A/B tranches (e.g. "Main St - A Tranche")
+_TRANCHE_RE = re.compile(r'[AB][\s-]*[Tt]ranche')
 
 
 class SalesforceFetcher:
     """Salesforce client for fetching loan terms and related data."""
 
+    # (client_id, client_secret, client_url) -> (Salesforce client, time connected)
+    _connection_cache: Dict[Tuple[str, str, str], Tuple[Salesforce, float]] = {}
+    _connection_lock = threading.Lock()
+
     def __init__(self, client_id: str, client_secret: str, client_url: str):
         """
         Initialize Salesforce fetcher with OAuth credentials.
@@ -50,19 +105,79 @@ class SalesforceFetcher:
             "client_secret": client_secret,
             "client_url": client_url,
         }
-        self._sf_connection = None
+        # One pooled session for OAuth and every REST query (keeps the TLS connection alive).
+        # The adapter only retries dropped connections at the transport level; error
+        # statuses (rate limits, 5xx) are retried by _call_with_retry and
+        # _create_connection alone, so they are not retried twice over.
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(),
+                raise_on_status=False,
+            ),
+        ))
+        # loan_id -> (loan terms, time fetched); (loan_name, exact_match) -> (loan_id, time)
+        self._loan_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._loan_id_cache: "OrderedDict[Tuple[str, bool], Tuple[str, float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the pooled HTTP session."""
+        self._session.close()
+
+    def invalidate(self, loan_id: Optional[str] = None) -> None:
+        """Drop cached loan terms for loan_id (or everything when loan_id is None)."""
+        with self._cache_lock:
+            if loan_id is None:
+                self._loan_cache.clear()
+                self._loan_id_cache.clear()
+            else:
+                self._loan_cache.pop(loan_id, None)
+
+    def _cache_get(self, cache: OrderedDict, key):
+        """Return a fresh cached value (or None), marking it most recently used."""
+        with self._cache_lock:
+            cached = cache.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[1] > _LOAN_CACHE_TTL:
+                del cache[key]
+                return None
+            cache.move_to_end(key)
+            return cached[0]
+
+    def _cache_put(self, cache: OrderedDict, key, value) -> None:
+        """Store a value, evicting the least recently used entries past _LOAN_CACHE_SIZE."""
+        with self._cache_lock:
+            cache[key] = (value, time.monotonic())
+            cache.move_to_end(key)
+            while len(cache) > _LOAN_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    def ensure_authenticated(self) -> None:
+        """Authenticate now (idempotent), so the first query skips the OAuth round-trip."""
+        self._connect()
 
     def _connect(self) -> Salesforce:
-        """Establish or return existing Salesforce connection."""
-        if self._sf_connection is None:
-            self._sf_connection = self._create_connection()
-        return self._sf_connection
+        """Return the shared Salesforce connection for these credentials, reconnecting once it is stale."""
+        key = (
+            self.credentials["client_id"],
+            self.credentials["client_secret"],
+            self.credentials["client_url"],
+        )
+        with self._connection_lock:
+            cached = self._connection_cache.get(key)
+            if cached is None or time.monotonic() - cached[1] > _CONNECTION_TTL:
+                cached = (self._create_connection(), time.monotonic())
+                self._connection_cache[key] = cached
+        return cached[0]
 
     def _create_connection(self) -> Salesforce:
         """Create a new Salesforce connection using OAuth client credentials."""
-        import requests
-        import base64
-
         client_id = self.credentials['client_id']
         client_secret = self.credentials['client_secret']
         client_url = self.credentials['client_url']
@@ -77,7 +192,19 @@ class SalesforceFetcher:
         }
         body = {"grant_type": "client_credentials"}
 
-        response = requests.post(client_url, data=body, headers=headers)
+        for attempt in range(_RETRY_ATTEMPTS):
+            try:
+                response = self._session.post(
+                    client_url, data=body, headers=headers, timeout=_SF_AUTH_TIMEOUT
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == _RETRY_ATTEMPTS - 1:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                continue
+            if response.status_code not in _RETRYABLE_STATUSES or attempt == _RETRY_ATTEMPTS - 1:
+                break
+            time.sleep(self._retry_delay(attempt, response.headers.get("Retry-After")))
         response_data = response.json()
 
         if "access_token" not in response_data:
@@ -85,79 +212,202 @@ class SalesforceFetcher:
 
         return Salesforce(
             instance_url=response_data["instance_url"],
-            session_id=response_data["access_token"]
+            session_id=response_data["access_token"],
+            session=self._session,
         )
 
-    def _get_sf_data(self, object_name: str, field_names: List[str]) -> pd.DataFrame:
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the next attempt (Retry-After header wins when present)."""
+        if retry_after:
+            try:
+                return min(_RETRY_MAX_DELAY, float(retry_after))
+            except ValueError:
+                pass
+        # Jittered so callers throttled together do not retry in lockstep
+        delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def _call_with_retry(self, func, *args, **kwargs):
+        """Call a Salesforce API method, retrying rate-limit and transient server/connection errors."""
+        for attempt in range(_RETRY_ATTEMPTS):
+            try:
+                with _SF_QUERY_SLOTS:
+                    return func(*args, **kwargs)
+            except SalesforceError as e:
+                content = str(e.content)
+                retryable = e.status in _RETRYABLE_STATUSES or any(
+                    code in content for code in _RETRYABLE_ERROR_CODES
+                )
+                if not retryable or attempt == _RETRY_ATTEMPTS - 1:
+                    raise
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == _RETRY_ATTEMPTS - 1:
+                    raise
+            time.sleep(self._retry_delay(attempt))
+
+    @staticmethod
+    def _soql_quote(value: str) -> str:
+        """Quote a value as a SOQL string literal."""
+        value = str(value).replace("\\", "\\\\").replace("'", "\\'")
+        return f"'{value}'"
+
+    @classmethod
+    def _soql_like(cls, value: str, contains: bool = False) -> str:
+        """Quote a value as a SOQL LIKE pattern matching names starting with (or containing) it."""
+        escaped = cls._soql_quote(value)[1:-1].replace("%", "\\%").replace("_", "\\_")
+        return f"'{'%' if contains else ''}{escaped}%'"
+
+    @staticmethod
+    def _build_query(
+        object_name: str,
+        field_names: List[str],
+        where: Optional[str] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> str:
+        """Build a SOQL SELECT statement."""
+        query = f"SELECT {', '.join(field_names)} FROM {object_name}"
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return query
+
+    @staticmethod
+    def _records_to_dataframe(records: Iterable[Dict[str, Any]], field_names: List[str]) -> pd.DataFrame:
+        """Convert raw Salesforce query records to a DataFrame with uppercased column names."""
+        # Build column-major against the requested fields (one pass that also
+        # drops the metadata attributes and flattens relationship fields, e.g.
+        # Parent__r.Amount__c, into "PARENT__R.AMOUNT__C")
+        columns = [field.upper() for field in field_names]
+        data = {column: [] for column in columns}
+        row_count = 0
+        for record in records:
+            row_count += 1
+            row = {}
+            for key, value in record.items():
+                if key == 'attributes':
+                    continue
+                if isinstance(value, dict):
+                    for sub_key, sub_value in value.items():
+                        if sub_key != 'attributes':
+                            row[f"{key}.{sub_key}".upper()] = sub_value
+                else:
+                    row[key.upper()] = value
+            for column in columns:
+                data[column].append(row.get(column))
+
+        if not row_count:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(data, columns=columns)
+
+    def _get_sf_data(
+        self,
+        object_name: str,
+        field_names: List[str],
+        where: Optional[str] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
         """
         Query Salesforce object and return as DataFrame.
 
         Args:
             object_name: Salesforce object API name (e.g., "LLC_BI__Loan__c")
             field_names: List of field API names to retrieve
+            where: Optional SOQL condition, so the filtering happens in Salesforce
+            order_by: Optional SOQL ORDER BY clause (e.g., "Name ASC")
+            limit: Optional maximum number of rows
 
         Returns:
             DataFrame with uppercased column names
         """
         sf = self._connect()
+        query = self._build_query(object_name, field_names, where, order_by, limit)
+        # Stream the pages into the column lists rather than holding the full
+        # query_all result alongside the DataFrame (a retry re-runs the query)
+        return self._call_with_retry(
+            lambda: self._records_to_dataframe(
+                sf.query_all_iter(query, timeout=_SF_REQUEST_TIMEOUT), field_names
+            )
+        )
 
-        fields_str = ', '.join(field_names)
-        query = f"SELECT {fields_str} FROM {object_name}"
-
-        data = sf.query_all(query)
-        records = data['records']
-
-        # Remove Salesforce metadata attributes
-        normalized_records = []
-        for record in records:
-            if 'attributes' in record:
-                del record['attributes']
-            normalized_records.append(record)
+    def _composite_query(
+        self, queries: Dict[str, Tuple[str, List[str], Optional[str]]]
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Run several queries in one Composite Batch request (up to 25).
 
-        # Convert to DataFrame
-        if normalized_records:
-            df = pd.DataFrame(normalized_records)
-        else:
-            df = pd.DataFrame(columns=field_names)
+        Args:
+            queries: Maps a result key to (object_name, field_names, where)
 
-        # Uppercase all column names for consistency
-        df.columns = df.columns.str.upper()
+        Returns:
+            Dictionary of result key -> DataFrame (as _get_sf_data returns)
 
-        return df
+        Raises:
+            SalesforceGeneralError: If any subrequest fails
+        """
+        sf = self._connect()
+        keys = list(queries)
+        batch_requests = [
+            {
+                "method": "GET",
+                "url": f"v{sf.sf_version}/query?q={quote_plus(self._build_query(*queries[key]))}",
+            }
+            for key in keys
+        ]
+        response = self._call_with_retry(
+            sf.restful,
+            "composite/batch",
+            method="POST",
+            json={"batchRequests": batch_requests},
+            timeout=_SF_REQUEST_TIMEOUT,
+        )
 
-    def _filter_dataframe(self, df: pd.DataFrame, column: str, value: str) -> pd.DataFrame:
-        """Filter DataFrame by column/value if non-empty."""
-        if df.empty:
-            return df
-        return df[df[column] == value].copy()
+        frames = {}
+        for key, item in zip(keys, response["results"]):
+            object_name, field_names, _ = queries[key]
+            if item["statusCode"] >= 400:
+                raise SalesforceGeneralError(
+                    "composite/batch", item["statusCode"], object_name, item["result"]
+                )
+            data = item["result"]
+            records = data["records"]
+            # Subrequests return the first page only; page the rest like query_all does
+            while not data.get("done", True):
+                data = self._call_with_retry(
+                    sf.query_more,
+                    data["nextRecordsUrl"],
+                    identifier_is_url=True,
+                    timeout=_SF_REQUEST_TIMEOUT,
+                )
+                records.extend(data["records"])
+            frames[key] = self._records_to_dataframe(records, field_names)
+
+        return frames
 
     def _records(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Convert DataFrame to list of dictionaries, removing None values."""
         if df.empty:
             return []
 
+        # Optional fields are mostly unset per loan; all-null columns would be
+        # dropped from every record anyway
+        df = df.dropna(axis=1, how="all")
+
+        # to_dict keeps values as native Python types (JSON-serializable); the
+        # None/NaN mask is computed once for the whole frame
         records = df.to_dict("records")
+        present = df.notna().to_numpy()
 
         # Remove None/NaN values from each record
-        cleaned_records = []
-        for record in records:
-            cleaned_record = {
-                key: value
-                for key, value in record.items()
-                if value is not None and not (isinstance(value, float) and math.isnan(value))
-            }
-            cleaned_records.append(cleaned_record)
-
-        return cleaned_records
-
-    def _dict_keys_upper(self, d):
-        """Recursively convert all dictionary keys to uppercase."""
-        if isinstance(d, dict):
-            return {k.upper(): self._dict_keys_upper(v) for k, v in d.items()}
-        elif isinstance(d, list):
-            return [self._dict_keys_upper(i) for i in d]
-        else:
-            return d
+        return [
+            {key: value for (key, value), keep in zip(record.items(), row_present) if keep}
+            for record, row_present in zip(records, present)
+        ]
 
     def get_loan_terms_by_id(self, loan_id: str) -> Dict[str, Any]:
         """
@@ -180,311 +430,392 @@ class SalesforceFetcher:
         """
         if not loan_id:
             raise ValueError("loan_id must be provided.")
-
-        sf = self._connect()
-
-        # ===================================================================
-        # 1. Fetch core loan information
-        # ===================================================================
-        loans_df = self._get_sf_data(
-            "LLC_BI__Loan__c",
-            [
-                "ID",
-                "NAME",
-                "LLC_BI__Amount__c",
-                "LLC_BI__Maturity_Date__c",
-                "LLC_BI__CloseDate__c",
-                "LLC_BI__First_Payment_Date__c",
-                "LLC_BI__Term_Months__c",
-                "LLC_BI__Amortized_Term_Months__c",
-                "LLC_BI__Prepayment_Penalty__c",
-                "cm_Prepayment_Minimal_Interest_Months__c",
-                "LLC_BI__Prepayment_Penalty_Description__c",
-                "LLC_BI__Funding_at_Close__c",
-                "LLC_BI__ParentLoan__c",
-            ],
-        )
-
-        loan_row = self._records(self._filter_dataframe(loans_df, "ID", loan_id))
-        if not loan_row:
+        # Anything not shaped like a Salesforce ID would fail the IN query with a 400
+        if not isinstance(loan_id, str) or not _SF_ID_RE.fullmatch(loan_id):
             raise ValueError(f"Loan {loan_id} not found in Salesforce.")
 
-        loan_terms = loan_row[0]
-        loan_name = loan_terms.get("NAME", "")
-
-        # ===================================================================
-        # 2. Handle A/B-Tranche logic
-        # ===================================================================
-        tranche_pattern = r'[AB][\s-]*[Tt]ranche'
-        is_tranche_loan = re.search(tranche_pattern, loan_name)
-
-        if is_tranche_loan and loan_terms.get("LLC_BI__PARENTLOAN__C"):
-            parent_loan_id = loan_terms["LLC_BI__PARENTLOAN__C"]
-
-            parent_loan_df = self._get_sf_data(
-                "LLC_BI__Loan__c",
-                ["ID", "LLC_BI__Amount__c"],
-            )
-            parent_loan_row = self._records(
-                self._filter_dataframe(parent_loan_df, "ID", parent_loan_id)
-            )
+        # Callers get their own copy, so mutating the result can't touch the cache
+        loan_terms = self._cache_get(self._loan_cache, loan_id)
+        if loan_terms is None:
+            loan_terms = self._fetch_loan_terms(loan_id)
+            self._cache_put(self._loan_cache, loan_id, copy.deepcopy(loan_terms))
+            return loan_terms
+        return copy.deepcopy(loan_terms)
+
+    def _fetch_loan_terms(self, loan_id: str) -> Dict[str, Any]:
+        """Query Salesforce for the loan terms returned by get_loan_terms_by_id."""
+        loan_terms = self._fetch_loan_terms_many([loan_id]).get(loan_id)
+        if loan_terms is None:
+            raise ValueError(f"Loan {loan_id} not found in Salesforce.")
+        return loan_terms
 
-            if parent_loan_row and parent_loan_row[0].get("LLC_BI__AMOUNT__C"):
-                parent_amount = parent_loan_row[0]["LLC_BI__AMOUNT__C"]
-                this_loan_amount = loan_terms.get("LLC_BI__AMOUNT__C", 0)
+    def _fetch_loan_terms_many(self, loan_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Query Salesforce for the loan terms of up to _IN_CLAUSE_CHUNK_SIZE loans at once.
 
-                if this_loan_amount and this_loan_amount != 0:
-                    loan_terms["A_B_AMOUNT_FACTOR"] = parent_amount / this_loan_amount
-                else:
-                    loan_terms["A_B_AMOUNT_FACTOR"] = 1
-            else:
-                loan_terms["A_B_AMOUNT_FACTOR"] = 1
-        else:
-            loan_terms["A_B_AMOUNT_FACTOR"] = 1
+        Returns:
+            Dictionary of requested loan ID -> loan terms (loans not found are left out)
+        """
+        ids = ", ".join(self._soql_quote(loan_id) for loan_id in loan_ids)
 
         # ===================================================================
-        # 3. Fetch pricing rate components
+        # 1. Fetch the loans and their child records in one round-trip
         # ===================================================================
-        pricing_rate_df = self._get_sf_data(
-            "LLC_BI__Pricing_Rate_Component__c",
-            [
-                "cm_Partial_Period_Interst_Accrual_Method__c",
-                "cm_Interest_Accrual_Method__c",
-                "cm_Accrued_Rate__c",
-                "LLC_BI__All_In_Rate__c",
-                "LLC_BI__Applied_Loan_Percentage__c",
-                "LLC_BI__Applied_Rate__c",
-                "LLC_BI__Auto_Pay_Rate_Discount__c",
-                "LLC_BI__Calculated_Monthly_Interest_Rate__c",
-                "LLC_BI__Comments__c",
-                "LLC_BI__Effective_Date__c",
-                "LLC_BI__Employee_Rate_Discount__c",
-                "LLC_BI__End_Date__c",
-                "LLC_BI__Index__c",
-                "LLC_BI__Index_Spread_Type__c",
-                "LLC_BI__Initial_Adjustment_Rate_Cap__c",
-                "LLC_BI__Interest_Rate_Adjustment_Frequency__c",
-                "LLC_BI__Interest_Rate_Adjustment_Unit__c",
-                "LLC_BI__Interest_Rate_Type__c",
-                "LLC_BI__Is_Fixed__c",
-                "LLC_BI__Is_Swap__c",
-                "LLC_BI__Lifetime_Rate_Cap__c",
-                "cm_Loan__c",
-                "LLC_BI__lookupKey__c",
-                "LLC_BI__Next_Interest_Rate_Change_Date__c",
-                "LLC_BI__Periodic_Rate_Cap__c",
-                "LLC_BI__Pricing_Stream__c",
-                "LLC_BI__Rate__c",
-                "LLC_BI__Rate_Adjustment__c",
-                "LLC_BI__Rate_Ceiling__c",
-                "LLC_BI__Rate_Floor__c",
-                "LLC_BI__Sequence__c",
-                "LLC_BI__Spread__c",
-                "LLC_BI__Term_Length__c",
-                "LLC_BI__Term_Unit__c",
-                "cm_Minimum_Exit_Multiple__c",
-                "cm_Maximum_Exit_IRR__c",
-            ],
-        )
-        pricing_rate_filtered = self._filter_dataframe(pricing_rate_df, "CM_LOAN__C", loan_id)
+        # Only the stream lookup depends on another query (the rates/payments),
+        # so everything else goes out as a single composite batch.
+        frames = self._composite_query({
+            # Core loan information
+            "loans": (
+                "LLC_BI__Loan__c",
+                [
+                    "ID",
+                    "NAME",
+                    "LLC_BI__Amount__c",
+                    "LLC_BI__Maturity_Date__c",
+                    "LLC_BI__CloseDate__c",
+                    "LLC_BI__First_Payment_Date__c",
+                    "LLC_BI__Term_Months__c",
+                    "LLC_BI__Amortized_Term_Months__c",
+                    "LLC_BI__Prepayment_Penalty__c",
+                    "cm_Prepayment_Minimal_Interest_Months__c",
+                    "LLC_BI__Prepayment_Penalty_Description__c",
+                    "LLC_BI__Funding_at_Close__c",
+                    "LLC_BI__ParentLoan__c",
+                    "LLC_BI__ParentLoan__r.LLC_BI__Amount__c",
+                ],
+                f"Id IN ({ids})",
+            ),
+
+            # Pricing rate components
+            "pricing_rate": (
+                "LLC_BI__Pricing_Rate_Component__c",
+                [
+                    "cm_Partial_Period_Interst_Accrual_Method__c",
+                    "cm_Interest_Accrual_Method__c",
+                    "cm_Accrued_Rate__c",
+                    "LLC_BI__All_In_Rate__c",
+                    "LLC_BI__Applied_Loan_Percentage__c",
+                    "LLC_BI__Applied_Rate__c",
+                    "LLC_BI__Auto_Pay_Rate_Discount__c",
+                    "LLC_BI__Calculated_Monthly_Interest_Rate__c",
+                    "LLC_BI__Comments__c",
+                    "LLC_BI__Effective_Date__c",
+                    "LLC_BI__Employee_Rate_Discount__c",
+                    "LLC_BI__End_Date__c",
+                    "LLC_BI__Index__c",
+                    "LLC_BI__Index_Spread_Type__c",
+                    "LLC_BI__Initial_Adjustment_Rate_Cap__c",
+                    "LLC_BI__Interest_Rate_Adjustment_Frequency__c",
+                    "LLC_BI__Interest_Rate_Adjustment_Unit__c",
+                    "LLC_BI__Interest_Rate_Type__c",
+                    "LLC_BI__Is_Fixed__c",
+                    "LLC_BI__Is_Swap__c",
+                    "LLC_BI__Lifetime_Rate_Cap__c",
+                    "cm_Loan__c",
+                    "LLC_BI__lookupKey__c",
+                    "LLC_BI__Next_Interest_Rate_Change_Date__c",
+                    "LLC_BI__Periodic_Rate_Cap__c",
+                    "LLC_BI__Pricing_Stream__c",
+                    "LLC_BI__Rate__c",
+                    "LLC_BI__Rate_Adjustment__c",
+                    "LLC_BI__Rate_Ceiling__c",
+                    "LLC_BI__Rate_Floor__c",
+                    "LLC_BI__Sequence__c",
+                    "LLC_BI__Spread__c",
+                    "LLC_BI__Term_Length__c",
+                    "LLC_BI__Term_Unit__c",
+                    "cm_Minimum_Exit_Multiple__c",
+                    "cm_Maximum_Exit_IRR__c",
+                ],
+                f"cm_Loan__c IN ({ids})",
+            ),
+
+            # Payment components
+            "payments": (
+                "LLC_BI__Pricing_Payment_Component__c",
+                [
+                    "LLC_BI__Count__c",
+                    "cm_Amortized_Term_Months__c",
+                    "LLC_BI__Includes_Interest__c",
+                    "LLC_BI__Includes_Principal__c",
+                    "LLC_BI__Interest_Frequency__c",
+                    "LLC_BI__Interest_Unit__c",
+                    "LLC_BI__Interest_Value__c",
+                    "LLC_BI__Rate_Stream__c",
+                    "LLC_BI__Amount__c",
+                    "LLC_BI__Principal_As_Percent__c",
+                    "LLC_BI__Base_Principal_Payment_On__c",
+                    "LLC_BI__Capitalized_Interest_Day_Of_Month__c",
+                    "LLC_BI__Capitalized_Interest_Effective_Date__c",
+                    "LLC_BI__Capitalized_Interest_Frequency__c",
+                    "LLC_BI__Comments__c",
+                    "LLC_BI__Effective_Date__c",
+                    "LLC_BI__End_Date__c",
+                    "LLC_BI__Has_Capitalized_Interest__c",
+                    "LLC_BI__Interest_Payment_Frequency__c",
+                    "LLC_BI__Is_Fixed__c",
+                    "cm_Loan__c",
+                    "LLC_BI__lookupKey__c",
+                    "LLC_BI__Maximum_Payment__c",
+                    "LLC_BI__Minimum_Payment__c",
+                    "Name",
+                    "LLC_BI__Number_Of_Payments__c",
+                    "LLC_BI__Frequency__c",
+                    "LLC_BI__Payment_Type__c",
+                    "LLC_BI__Percent_Of_Total_Loan_Amount__c",
+                    "LLC_BI__Pricing_Stream__c",
+                    "LLC_BI__Principal_Amount__c",
+                    "LLC_BI__Principal_Payment_Frequency__c",
+                    "LLC_BI__Sequence__c",
+                    "LLC_BI__Skip_Months__c",
+                    "LLC_BI__Skip_Stream_Target_Index__c",
+                    "LLC_BI__Term_Length__c",
+                    "LLC_BI__Term_Unit__c",
+                    "LLC_BI__Type__c",
+                ],
+                f"cm_Loan__c IN ({ids})",
+            ),
+
+            # Fees and draws
+            "fees_and_draws": (
+                "LLC_BI__Fee__c",
+                [
+                    "ID",
+                    "NAME",
+                    "LLC_BI__Loan__c",
+                    "LLC_BI__Status__c",
+                    "LLC_BI__Fee_Type__c",
+                    "LLC_BI__Amount__c",
+                    "cm_Fee_Date__c",
+                    "cm_End_Date__c",
+                    "cm_Draw_Date_Deadline__c",
+                    "cm_Draw_Frequency__c",
+                    "cm_Draw_Reset_Type__c",
+                    "LLC_BI__Paid_at_Closing__c",
+                    "LLC_BI__Percentage__c",
+                    "LLC_BI__Calculation_Type__c",
+                    "cm_Exit_Fee_Payable_Upon__c",
+                    "LLC_BI__Basis_Source__c",
+                    "cm_Conditional_Exit_Fee_Reduction__c",
+                    "cm_Exit_Fee_Reduction_Condition_Met__c",
+                    "cm_Conditional_Exit_Fee_Percentage__c",
+                    "cm_Conditional_Exit_Fee_Amount__c",
+                    "cm_Fee_Share__c",
+                ],
+                f"LLC_BI__Loan__c IN ({ids})",
+            ),
+        })
+        loans_df = frames["loans"]
+        pricing_rate_df = frames["pricing_rate"]
+        payments_df = frames["payments"]
+        fees_and_draws_df = frames["fees_and_draws"]
 
         # ===================================================================
-        # 4. Fetch pricing streams
+        # 2. Fetch the pricing streams referenced by the rates and payments
         # ===================================================================
-        pricing_stream_df = self._get_sf_data(
-            "LLC_BI__Pricing_Stream__c",
-            [
-                "ID",
-                "LLC_BI__LOAN__C",
-                "LLC_BI__Effective_Date__c",
-                "LLC_BI__Term_Length__c",
-                "LLC_BI__Term_Unit__c",
-                "LLC_BI__Is_Payment_Stream__c",
-                "LLC_BI__Is_Rate_Stream__c",
-                "LLC_BI__Is_Template__c",
-                "LLC_BI__Period_Type__c",
-                "LLC_BI__Pricing_Option__c",
-            ],
-        )
-        pricing_stream_filtered = self._filter_dataframe(
-            pricing_stream_df, "LLC_BI__LOAN__C", loan_id
+        stream_fields = [
+            "ID",
+            "LLC_BI__LOAN__C",
+            "LLC_BI__Effective_Date__c",
+            "LLC_BI__Term_Length__c",
+            "LLC_BI__Term_Unit__c",
+            "LLC_BI__Is_Payment_Stream__c",
+            "LLC_BI__Is_Rate_Stream__c",
+            "LLC_BI__Is_Template__c",
+            "LLC_BI__Period_Type__c",
+            "LLC_BI__Pricing_Option__c",
+        ]
+        stream_ids = sorted(
+            set(pricing_rate_df["LLC_BI__PRICING_STREAM__C"].dropna())
+            | set(payments_df["LLC_BI__PRICING_STREAM__C"].dropna())
         )
+        if stream_ids:
+            pricing_stream_df = pd.concat(
+                [
+                    self._get_sf_data(
+                        "LLC_BI__Pricing_Stream__c",
+                        stream_fields,
+                        where=f"Id IN ({', '.join(self._soql_quote(i) for i in chunk)})",
+                    )
+                    for chunk in self._chunks(stream_ids)
+                ],
+                ignore_index=True,
+            )
+        else:
+            pricing_stream_df = pd.DataFrame(columns=[f.upper() for f in stream_fields])
 
-        # Merge pricing rates with streams
-        overall_pricing_df = pricing_rate_filtered.merge(
+        # Merge pricing rates and payments with streams
+        overall_pricing_df = pricing_rate_df.merge(
             pricing_stream_df,
             left_on="LLC_BI__PRICING_STREAM__C",
             right_on="ID",
             how="left",
+            suffixes=("_X", "_Y"),
         )
-        overall_pricing_filtered = self._filter_dataframe(
-            overall_pricing_df, "CM_LOAN__C", loan_id
-        )
-
-        # ===================================================================
-        # 5. Fetch payment components
-        # ===================================================================
-        payments_df = self._get_sf_data(
-            "LLC_BI__Pricing_Payment_Component__c",
-            [
-                "LLC_BI__Count__c",
-                "cm_Amortized_Term_Months__c",
-                "LLC_BI__Includes_Interest__c",
-                "LLC_BI__Includes_Principal__c",
-                "LLC_BI__Interest_Frequency__c",
-                "LLC_BI__Interest_Unit__c",
-                "LLC_BI__Interest_Value__c",
-                "LLC_BI__Rate_Stream__c",
-                "LLC_BI__Amount__c",
-                "LLC_BI__Principal_As_Percent__c",
-                "LLC_BI__Base_Principal_Payment_On__c",
-                "LLC_BI__Capitalized_Interest_Day_Of_Month__c",
-                "LLC_BI__Capitalized_Interest_Effective_Date__c",
-                "LLC_BI__Capitalized_Interest_Frequency__c",
-                "LLC_BI__Comments__c",
-                "LLC_BI__Effective_Date__c",
-                "LLC_BI__End_Date__c",
-                "LLC_BI__Has_Capitalized_Interest__c",
-                "LLC_BI__Interest_Payment_Frequency__c",
-                "LLC_BI__Is_Fixed__c",
-                "cm_Loan__c",
-                "LLC_BI__lookupKey__c",
-                "LLC_BI__Maximum_Payment__c",
-                "LLC_BI__Minimum_Payment__c",
-                "Name",
-                "LLC_BI__Number_Of_Payments__c",
-                "LLC_BI__Frequency__c",
-                "LLC_BI__Payment_Type__c",
-                "LLC_BI__Percent_Of_Total_Loan_Amount__c",
-                "LLC_BI__Pricing_Stream__c",
-                "LLC_BI__Principal_Amount__c",
-                "LLC_BI__Principal_Payment_Frequency__c",
-                "LLC_BI__Sequence__c",
-                "LLC_BI__Skip_Months__c",
-                "LLC_BI__Skip_Stream_Target_Index__c",
-                "LLC_BI__Term_Length__c",
-                "LLC_BI__Term_Unit__c",
-                "LLC_BI__Type__c",
-            ],
-        )
-        payments_filtered = self._filter_dataframe(payments_df, "CM_LOAN__C", loan_id)
-
-        # Merge payments with pricing streams
-        overall_payments_df = payments_filtered.merge(
+        overall_payments_df = payments_df.merge(
             pricing_stream_df,
             left_on="LLC_BI__PRICING_STREAM__C",
             right_on="ID",
             how="left",
-        )
-        overall_payments_filtered = self._filter_dataframe(
-            overall_payments_df, "CM_LOAN__C", loan_id
+            suffixes=("_X", "_Y"),
         )
 
         # ===================================================================
-        # 6. Fetch fees and draws
+        # 3. Separate fees from draws
         # ===================================================================
-        fees_and_draws_df = self._get_sf_data(
-            "LLC_BI__Fee__c",
-            [
-                "ID",
-                "NAME",
-                "LLC_BI__Loan__c",
-                "LLC_BI__Status__c",
-                "LLC_BI__Fee_Type__c",
-                "LLC_BI__Amount__c",
-                "cm_Fee_Date__c",
-                "cm_End_Date__c",
-                "cm_Draw_Date_Deadline__c",
-                "cm_Draw_Frequency__c",
-                "cm_Draw_Reset_Type__c",
-                "LLC_BI__Paid_at_Closing__c",
-                "LLC_BI__Percentage__c",
-                "LLC_BI__Calculation_Type__c",
-                "cm_Exit_Fee_Payable_Upon__c",
-                "LLC_BI__Basis_Source__c",
-                "cm_Conditional_Exit_Fee_Reduction__c",
-                "cm_Exit_Fee_Reduction_Condition_Met__c",
-                "cm_Conditional_Exit_Fee_Percentage__c",
-                "cm_Conditional_Exit_Fee_Amount__c",
-                "cm_Fee_Share__c",
-            ],
-        )
-        fees_and_draws_filtered = self._filter_dataframe(
-            fees_and_draws_df, "LLC_BI__LOAN__C", loan_id
-        )
-
         # Exclude Equity Waterfall fee types
         equity_waterfall_mask = (
-            fees_and_draws_filtered["LLC_BI__FEE_TYPE__C"]
-            .fillna("")
-            .str.contains("Equity Waterfall")
+            fees_and_draws_df["LLC_BI__FEE_TYPE__C"]
+            .str.contains("Equity Waterfall", regex=False, na=False)
         )
-        fees_and_draws_filtered = fees_and_draws_filtered[~equity_waterfall_mask].copy()
+        fees_and_draws_df = fees_and_draws_df[~equity_waterfall_mask].copy()
 
         # Separate fees from draws
         fees_mask = (
-            fees_and_draws_filtered["LLC_BI__FEE_TYPE__C"]
-            .fillna("")
-            .str.contains("Fee")
+            fees_and_draws_df["LLC_BI__FEE_TYPE__C"]
+            .str.contains("Fee", regex=False, na=False)
+        )
+        fees_df = fees_and_draws_df[fees_mask].copy()
+        draws_df = fees_and_draws_df[~fees_mask].copy()
+
+        # Remove "Funded at Closing" draws (they get recreated as synthetic draw)
+        draws_df = draws_df[draws_df["LLC_BI__PAID_AT_CLOSING__C"] != "Funded at Closing"].copy()
+
+        # Handle "Funded at Modification" draws
+        modification_mask = (
+            (draws_df["LLC_BI__PAID_AT_CLOSING__C"] == "Funded at Modification")
+            & draws_df["CM_FEE_DATE__C"].notna()
         )
-        fees_df = fees_and_draws_filtered[fees_mask].copy()
-        draws_df = fees_and_draws_filtered[~fees_mask].copy()
+        draws_df.loc[modification_mask, "CM_END_DATE__C"] = draws_df.loc[modification_mask, "CM_FEE_DATE__C"]
 
         # ===================================================================
-        # 7. Assemble loan terms structure
+        # 4. Assemble the loan terms of each loan
         # ===================================================================
-        loan_terms["PRICING_DETAILS"] = self._records(overall_pricing_filtered)
+        pricing_by_loan = self._group_by_loan(overall_pricing_df, "CM_LOAN__C")
+        payments_by_loan = self._group_by_loan(overall_payments_df, "CM_LOAN__C")
+        fees_by_loan = self._group_by_loan(fees_df, "LLC_BI__LOAN__C")
+        draws_by_loan = self._group_by_loan(draws_df, "LLC_BI__LOAN__C")
+
+        loans = {}
+        for loan_terms in self._records(loans_df):
+            loan_id = loan_terms["ID"]
+            loan_name = loan_terms.get("NAME", "")
+
+            # Handle A/B-Tranche logic
+            is_tranche_loan = _TRANCHE_RE.search(loan_name)
+            # The parent's amount comes back with the loan row (relationship field)
+            parent_amount = loan_terms.pop("LLC_BI__PARENTLOAN__R.LLC_BI__AMOUNT__C", None)
+
+            if is_tranche_loan and loan_terms.get("LLC_BI__PARENTLOAN__C"):
+                if parent_amount:
+                    this_loan_amount = loan_terms.get("LLC_BI__AMOUNT__C", 0)
+
+                    if this_loan_amount and this_loan_amount != 0:
+                        loan_terms["A_B_AMOUNT_FACTOR"] = parent_amount / this_loan_amount
+                    else:
+                        loan_terms["A_B_AMOUNT_FACTOR"] = 1
+                else:
+                    loan_terms["A_B_AMOUNT_FACTOR"] = 1
+            else:
+                loan_terms["A_B_AMOUNT_FACTOR"] = 1
 
-        # Convert CM_MAXIMUM_EXIT_IRR__C from percentage to decimal
-        for pricing in loan_terms["PRICING_DETAILS"]:
-            if "CM_MAXIMUM_EXIT_IRR__C" in pricing and pricing["CM_MAXIMUM_EXIT_IRR__C"] is not None:
-                pricing["CM_MAXIMUM_EXIT_IRR__C"] = pricing["CM_MAXIMUM_EXIT_IRR__C"] / 100
+            loan_terms["PRICING_DETAILS"] = self._records(pricing_by_loan.get(loan_id, overall_pricing_df.iloc[0:0]))
+
+            # Convert CM_MAXIMUM_EXIT_IRR__C from percentage to decimal
+            for pricing in loan_terms["PRICING_DETAILS"]:
+                if "CM_MAXIMUM_EXIT_IRR__C" in pricing and pricing["CM_MAXIMUM_EXIT_IRR__C"] is not None:
+                    pricing["CM_MAXIMUM_EXIT_IRR__C"] = pricing["CM_MAXIMUM_EXIT_IRR__C"] / 100
+
+            loan_terms["PAYMENT_DETAILS"] = self._records(payments_by_loan.get(loan_id, overall_payments_df.iloc[0:0]))
+            loan_terms["FEE_DETAILS"] = self._records(fees_by_loan.get(loan_id, fees_df.iloc[0:0]))
+            loan_terms["DRAW_DETAILS"] = self._records(draws_by_loan.get(loan_id, draws_df.iloc[0:0]))
+
+            # Create synthetic "Funded At Closing" draw
+            now = int(time.time())
+            funded_at_close_draw = {
+                'ID': f'MADE_UP_ID_{now}',
+                'NAME': f'MADE_UP_NAME_{now}',
+                'LLC_BI__LOAN__C': loan_terms['ID'],
+                'LLC_BI__STATUS__C': 'Active',
+                'LLC_BI__FEE_TYPE__C': 'Funded At Closing',
+                'CM_DRAW_FREQUENCY__C': 'Monthly',
+                'CM_DRAW_RESET_TYPE__C': 'Skip',
+                'LLC_BI__CALCULATION_TYPE__C': 'Flat Amount',
+                'CM_CONDITIONAL_EXIT_FEE_REDUCTION__C': False,
+                'CM_EXIT_FEE_REDUCTION_CONDITION_MET__C': False
+            }
 
-        loan_terms["PAYMENT_DETAILS"] = self._records(overall_payments_filtered)
-        loan_terms["FEE_DETAILS"] = self._records(fees_df)
-        loan_terms["DRAW_DETAILS"] = self._records(draws_df)
+            if 'LLC_BI__FUNDING_AT_CLOSE__C' in loan_terms:
+                funded_at_close_draw['LLC_BI__AMOUNT__C'] = loan_terms['LLC_BI__FUNDING_AT_CLOSE__C']
 
-        # ===================================================================
-        # 8. Handle draw details special processing
-        # ===================================================================
-        # Remove "Funded at Closing" draws (they get recreated as synthetic draw)
-        loan_terms['DRAW_DETAILS'] = [
-            draw for draw in loan_terms['DRAW_DETAILS']
-            if draw.get('LLC_BI__PAID_AT_CLOSING__C', '') not in ['Funded at Closing']
-        ]
+            if 'LLC_BI__CLOSEDATE__C' in loan_terms:
+                funded_at_close_draw['CM_FEE_DATE__C'] = loan_terms['LLC_BI__CLOSEDATE__C']
+                funded_at_close_draw['CM_END_DATE__C'] = loan_terms['LLC_BI__CLOSEDATE__C']
 
-        # Handle "Funded at Modification" draws
-        for draw in loan_terms['DRAW_DETAILS']:
-            if (draw.get('LLC_BI__PAID_AT_CLOSING__C', '') == 'Funded at Modification'
-                and 'CM_FEE_DATE__C' in draw):
-                draw['CM_END_DATE__C'] = draw['CM_FEE_DATE__C']
-
-        # Create synthetic "Funded At Closing" draw
-        now = int(time.time())
-        funded_at_close_draw = {
-            'ID': f'MADE_UP_ID_{now}',
-            'NAME': f'MADE_UP_NAME_{now}',
-            'LLC_BI__LOAN__C': loan_terms['ID'],
-            'LLC_BI__STATUS__C': 'Active',
-            'LLC_BI__FEE_TYPE__C': 'Funded At Closing',
-            'CM_DRAW_FREQUENCY__C': 'Monthly',
-            'CM_DRAW_RESET_TYPE__C': 'Skip',
-            'LLC_BI__CALCULATION_TYPE__C': 'Flat Amount',
-            'CM_CONDITIONAL_EXIT_FEE_REDUCTION__C': False,
-            'CM_EXIT_FEE_REDUCTION_CONDITION_MET__C': False
-        }
+            loan_terms['DRAW_DETAILS'].append(funded_at_close_draw)
 
-        if 'LLC_BI__FUNDING_AT_CLOSE__C' in loan_terms:
-            funded_at_close_draw['LLC_BI__AMOUNT__C'] = loan_terms['LLC_BI__FUNDING_AT_CLOSE__C']
+            loans[loan_id] = loan_terms
 
-        if 'LLC_BI__CLOSEDATE__C' in loan_terms:
-            funded_at_close_draw['CM_FEE_DATE__C'] = loan_terms['LLC_BI__CLOSEDATE__C']
-            funded_at_close_draw['CM_END_DATE__C'] = loan_terms['LLC_BI__CLOSEDATE__C']
+        # Key the results by the IDs as requested (15-character IDs match the
+        # first 15 characters of the 18-character ID Salesforce returns).
+        # Every key is already uppercase: query columns are uppercased, the
+        # merge suffixes are _X/_Y and the added keys are written that way.
+        results = {}
+        handed_out = set()
+        for requested_id in loan_ids:
+            loan_id = requested_id if requested_id in loans else next(
+                (lid for lid in loans if len(requested_id) == 15 and lid[:15] == requested_id),
+                None,
+            )
+            if loan_id is None:
+                continue
+            loan_terms = loans[loan_id]
+            results[requested_id] = copy.deepcopy(loan_terms) if loan_id in handed_out else loan_terms
+            handed_out.add(loan_id)
+        return results
+
+    @staticmethod
+    def _chunks(values: List[str], size: Optional[int] = None) -> List[List[str]]:
+        """Split values into chunks small enough for one SOQL IN clause."""
+        size = size or _IN_CLAUSE_CHUNK_SIZE
+        return [values[start:start + size] for start in range(0, len(values), size)]
+
+    @staticmethod
+    def _group_by_loan(df: pd.DataFrame, column: str) -> Dict[str, pd.DataFrame]:
+        """Split a child-record frame into one frame per loan ID."""
+        if df.empty:
+            return {}
+        return {loan_id: group for loan_id, group in df.groupby(column, sort=False)}
 
-        loan_terms['DRAW_DETAILS'].append(funded_at_close_draw)
+    def get_loan_terms_by_ids(self, loan_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch loan terms for several loans with batched queries.
 
-        # Return with all keys uppercased
-        return self._dict_keys_upper(loan_terms)
+        Args:
+            loan_ids: Salesforce loan identifiers
+
+        Returns:
+            Dictionary of loan ID -> loan terms (same structure as
+            get_loan_terms_by_id); IDs not found in Salesforce (or not shaped
+            like a Salesforce ID) are left out
+        """
+        results = {}
+        to_fetch = []
+        for loan_id in dict.fromkeys(loan_ids):
+            if not isinstance(loan_id, str) or not _SF_ID_RE.fullmatch(loan_id):
+                continue
+            loan_terms = self._cache_get(self._loan_cache, loan_id)
+            if loan_terms is None:
+                to_fetch.append(loan_id)
+            else:
+                results[loan_id] = copy.deepcopy(loan_terms)
+
+        for chunk in self._chunks(to_fetch):
+            for loan_id, loan_terms in self._fetch_loan_terms_many(chunk).items():
+                self._cache_put(self._loan_cache, loan_id, copy.deepcopy(loan_terms))
+                results[loan_id] = loan_terms
+
+        return results
 
     def get_loan_terms_by_name(self, loan_name: str, exact_match: bool = True) -> Dict[str, Any]:
         """
@@ -503,19 +834,22 @@ class SalesforceFetcher:
         if not loan_name:
             raise ValueError("loan_name must be provided.")
 
-        # Get list of all loans
-        loans_df = self._get_sf_data(
-            "LLC_BI__Loan__c",
-            ["ID", "NAME"],
-        )
+        loan_id = self._cache_get(self._loan_id_cache, (loan_name, exact_match))
+        if loan_id is not None:
+            return self.get_loan_terms_by_id(loan_id)
 
-        # Search for matching loan
+        # Search for matching loans (SOQL comparisons are case-insensitive,
+        # so the exact match is re-checked on the result; a contains search
+        # only needs the first match)
         if exact_match:
-            matching_loans = loans_df[loans_df['NAME'] == loan_name]
+            where, limit = f"Name = {self._soql_quote(loan_name)}", None
         else:
-            matching_loans = loans_df[
-                loans_df['NAME'].str.contains(loan_name, case=False, na=False)
-            ]
+            where, limit = f"Name LIKE {self._soql_like(loan_name, contains=True)}", 1
+        matching_loans = self._get_sf_data(
+            "LLC_BI__Loan__c", ["ID", "NAME"], where=where, limit=limit
+        )
+        if exact_match:
+            matching_loans = matching_loans[matching_loans['NAME'] == loan_name]
 
         if matching_loans.empty:
             match_type = "exact match" if exact_match else "containing"
@@ -529,6 +863,7 @@ class SalesforceFetcher:
 
         # Get first matching loan ID
         loan_id = matching_loans.iloc[0]['ID']
+        self._cache_put(self._loan_id_cache, (loan_name, exact_match), loan_id)
 
         # Fetch full loan terms using ID
         return self.get_loan_terms_by_id(loan_id)
@@ -559,6 +894,24 @@ class SalesforceFetcher:
         if exclude_products is None:
             exclude_products = ['Main']
 
+        # Build filters (SOQL != and NOT IN keep null values, like the pandas filters did)
+        conditions = []
+        if exclude_statuses:
+            statuses = ", ".join(self._soql_quote(status) for status in exclude_statuses)
+            conditions.append(f"LLC_BI__Status__c NOT IN ({statuses})")
+
+        if exclude_stages:
+            stages = ", ".join(self._soql_quote(stage) for stage in exclude_stages)
+            conditions.append(f"LLC_BI__Stage__c NOT IN ({stages})")
+
+        if exclude_products:
+            products = ", ".join(self._soql_quote(product) for product in exclude_products)
+            conditions.append(f"LLC_BI__Product__c NOT IN ({products})")
+
+        # Filter by name prefix if provided (LIKE is case-insensitive)
+        if name_prefix:
+            conditions.append(f"Name LIKE {self._soql_like(name_prefix)}")
+
         # Fetch loan list
         df = self._get_sf_data(
             "LLC_BI__Loan__c",
@@ -569,26 +922,11 @@ class SalesforceFetcher:
                 "LLC_BI__STATUS__C",
                 "LLC_BI__STAGE__C",
                 "LLC_BI__Product__c"
-            ]
+            ],
+            where=" AND ".join(conditions),
+            order_by="Name ASC",
         )
 
-        # Apply filters
-        if exclude_statuses:
-            df = df[~df['LLC_BI__STATUS__C'].isin(exclude_statuses)]
-
-        if exclude_stages:
-            df = df[df['LLC_BI__STAGE__C'] != exclude_stages[0]]  # Simplified for single stage
-
-        if exclude_products:
-            df = df[df['LLC_BI__PRODUCT__C'] != exclude_products[0]]  # Simplified for single product
-
-        # Filter by name prefix if provided
-        if name_prefix:
-            df = df[df['NAME'].str.lower().str.startswith(name_prefix.lower())]
-
-        # Sort by name
-        df = df.sort_values(by='NAME', ascending=True)
-
         return df.to_dict('records')
 
     def get_all_loans(self) -> List[Dict[str, str]]:
@@ -5,8 +5,13 @@ Wrapper for core validation functionality.
 Exposes HTTP endpoints for validation, search, and health checks.
 """
 
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 import azure.functions as func
 from core.json_driven_validator import JSONValidator
 from core.salesforce_fetcher import SalesforceFetcher
@@ -16,30 +21,238 @@ from core.config import SALESFORCE_CREDENTIALS
 app = func.FunctionApp()
 
 # Initialize services (reuse across function invocations)
-fetcher = SalesforceFetcher(**SALESFORCE_CREDENTIALS)
 validator = JSONValidator()
+validator.warm()
+_fetcher = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Validation responses are reused for a short while so repeat lookups of the
+# same loan skip Salesforce and the validator
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 60
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+# Search is served from an in-process list of active loan names, refreshed
+# from Salesforce after this many seconds
+LOAN_INDEX_TTL = 300
+_loan_index = None
+_loan_index_time = 0.0
+_loan_index_lock = threading.Lock()
+
+# Optional Redis layer shared by every instance of the app (enabled by
+# setting REDIS_URL; needs the redis package). Entries expire with the
+# in-process ones, and a slow or unreachable Redis counts as a cache miss.
+REDIS_CACHE_TTL = int(os.environ.get("REDIS_CACHE_TTL", RESPONSE_CACHE_TTL))
+REDIS_SOCKET_TIMEOUT = 0.25
+_redis_client = None
+
+# Bodies of the static 400 responses, serialized once
+_ERR_LOAN_ID_REQUIRED = json.dumps({"error": "loan_id is required"})
+_ERR_LOAN_NAME_REQUIRED = json.dumps({"error": "loan_name is required in request body"})
+_ERR_PREFIX_REQUIRED = json.dumps({"error": "prefix query parameter is required"})
+_ERR_LOAN_IDS_REQUIRED = json.dumps({"error": "loan_ids array is required in request body"})
+_ERR_BAD_JSON = json.dumps({"error": "Request body must be a JSON object"})
+
+
+def _get_fetcher() -> SalesforceFetcher:
+    """Return the worker's shared fetcher, creating it on first use."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = SalesforceFetcher(**SALESFORCE_CREDENTIALS)
+    return _fetcher
+
+
+def _get_loan_index() -> list:
+    """Return (NAME, ID) pairs for every active loan, in Salesforce name order."""
+    global _loan_index, _loan_index_time
+    with _loan_index_lock:
+        if _loan_index is None or time.monotonic() - _loan_index_time > LOAN_INDEX_TTL:
+            _loan_index = [(loan['NAME'], loan['ID']) for loan in _get_fetcher().get_all_loans()]
+            _loan_index_time = time.monotonic()
+        return _loan_index
+
+
+def _dumps(data, pretty: bool = False) -> str:
+    """Serialize a response body: compact by default (stdlib's C encoder), indented for ?pretty=1."""
+    if pretty:
+        return json.dumps(data, indent=2, default=str)
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def _json_body(req: func.HttpRequest):
+    """Parse the raw request body as a JSON object, or return None when it is not one."""
+    try:
+        body = json.loads(req.get_body())
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def _wants_pretty(req: func.HttpRequest) -> bool:
+    """Whether the caller asked for an indented response body."""
+    return req.params.get('pretty') == '1'
+
+
+def _get_redis():
+    """Return the shared Redis client, or None when the Redis cache is not configured."""
+    global _redis_client
+    if _redis_client is None:
+        redis_url = os.environ.get("REDIS_URL")
+        if not redis_url:
+            _redis_client = False
+        else:
+            try:
+                import redis
+                _redis_client = redis.Redis(
+                    connection_pool=redis.ConnectionPool.from_url(
+                        redis_url,
+                        max_connections=20,
+                        socket_timeout=REDIS_SOCKET_TIMEOUT,
+                        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                    )
+                )
+            except ImportError:
+                logger.warning('REDIS_URL is set but the redis package is not installed')
+                _redis_client = False
+            except Exception as e:
+                # A malformed REDIS_URL must not fail requests or be retried on every call
+                logger.warning('Redis cache disabled, could not create client: %s', e)
+                _redis_client = False
+    return _redis_client or None
+
+
+def _redis_key(key) -> str:
+    """Redis key for a response cache key."""
+    return "dv:" + hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _response_cache_get(key):
+    """Return a cached response body that is still fresh, or None."""
+    with _response_cache_lock:
+        cached = _response_cache.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[1] <= RESPONSE_CACHE_TTL:
+                _response_cache.move_to_end(key)
+                return cached[0]
+            del _response_cache[key]
+
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        body = client.get(_redis_key(key))
+    except Exception as e:
+        logger.warning('Redis cache read failed: %s', e)
+        return None
+    # Not copied into the local cache: that would restart its TTL on an entry
+    # that may already be nearly REDIS_CACHE_TTL old
+    return body.decode() if body is not None else None
+
+
+def _response_cache_put(key, body: str) -> None:
+    """Cache a response body, evicting the least recently used past RESPONSE_CACHE_SIZE."""
+    with _response_cache_lock:
+        _response_cache[key] = (body, time.monotonic())
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+    client = _get_redis()
+    if client is not None:
+        try:
+            client.set(_redis_key(key), body, ex=REDIS_CACHE_TTL)
+        except Exception as e:
+            logger.warning('Redis cache write failed: %s', e)
+
+
+def _validation_result(loan_terms: dict, warnings: list, errors: list) -> dict:
+    """Response body for a single-loan validation."""
+    return {
+        "LOAN_NAME": loan_terms['NAME'],
+        "LOAN_ID": loan_terms['ID'],
+        "LOAN_AMOUNT": loan_terms.get('LLC_BI__AMOUNT__C'),
+        "CLOSE_DATE": loan_terms.get('LLC_BI__CLOSEDATE__C'),
+        "WARNINGS": warnings,
+        "ERRORS": errors,
+        "validation_passed": len(errors) == 0
+    }
+
+
+# Health responses never change, so the body is serialized once
+_HEALTH_BODY = json.dumps({
+    "status": "healthy",
+    "service": "Deal Validator",
+    "version": "1.0"
+})
+
 
 @app.route(route="health", methods=["GET"], auth_level=func.AuthLevel.ANONYMOUS)
 def health_check(req: func.HttpRequest) -> func.HttpResponse:
     """Health check endpoint."""
-    logger.info('Health check endpoint called')
+    logger.debug('Health check endpoint called')
 
     return func.HttpResponse(
-        json.dumps({
-            "status": "healthy",
-            "service": "Deal Validator",
-            "version": "1.0"
-        }),
+        _HEALTH_BODY,
         mimetype="application/json",
         status_code=200
     )
 
 
+# Minimal loan used to run the validator once while warming up
+_WARMUP_LOAN_TERMS = {
+    "ID": "WARMUP",
+    "NAME": "WARMUP",
+    "PRICING_DETAILS": [],
+    "PAYMENT_DETAILS": [],
+    "FEE_DETAILS": [],
+    "DRAW_DETAILS": [],
+}
+
+
+def _warm_up() -> None:
+    """Authenticate with Salesforce and run the validator once, off the user-facing path."""
+    _get_fetcher().ensure_authenticated()
+    validator.validate(_WARMUP_LOAN_TERMS)
+
+
+@app.warm_up_trigger('warmup')
+def warmup(warmup) -> None:
+    """Warmup trigger: runs when a new instance is added to the app."""
+    logger.info('Warmup trigger called')
+    _warm_up()
+
+
+@app.route(route="_warm", methods=["GET"], auth_level=func.AuthLevel.FUNCTION)
+def warm(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Warm the instance (for availability-test pings).
+
+    URL: /api/_warm
+    Method: GET
+    """
+    logger.info('Warm endpoint called')
+
+    try:
+        _warm_up()
+        return func.HttpResponse(
+            json.dumps({"status": "warm"}),
+            mimetype="application/json",
+            status_code=200
+        )
+
+    except Exception as e:
+        logger.error('Unexpected error: %s', e, exc_info=True)
+        return func.HttpResponse(
+            json.dumps({"error": f"Internal server error: {str(e)}"}),
+            mimetype="application/json",
+            status_code=500
+        )
+
+
 @app.route(route="validate/id/{loan_id}", methods=["GET"], auth_level=func.AuthLevel.FUNCTION)
 def validate_by_id(req: func.HttpRequest) -> func.HttpResponse:
     """
@@ -56,47 +269,55 @@ def validate_by_id(req: func.HttpRequest) -> func.HttpResponse:
 
         if not loan_id:
             return func.HttpResponse(
-                json.dumps({"error": "loan_id is required"}),
+                _ERR_LOAN_ID_REQUIRED,
                 mimetype="application/json",
                 status_code=400
             )
 
+        pretty = _wants_pretty(req)
+        cache_key = ("id", loan_id, pretty)
+        body = _response_cache_get(cache_key)
+        if body is not None:
+            logger.info('Serving cached validation for loan ID: %s', loan_id)
+            return func.HttpResponse(
+                body,
+                mimetype="application/json",
+                status_code=200,
+                headers={"X-Cache": "HIT"}
+            )
+
         # Fetch loan
-        logger.info(f'Fetching loan ID: {loan_id}')
-        loan_terms = fetcher.get_loan_terms_by_id(loan_id)
+        logger.info('Fetching loan ID: %s', loan_id)
+        loan_terms = _get_fetcher().get_loan_terms_by_id(loan_id)
 
         # Validate
-        logger.info(f'Validating loan: {loan_terms["NAME"]}')
+        logger.info('Validating loan: %s', loan_terms['NAME'])
         warnings, errors = validator.validate(loan_terms)
 
         # Build response
-        result = {
-            "LOAN_NAME": loan_terms['NAME'],
-            "LOAN_ID": loan_terms['ID'],
-            "LOAN_AMOUNT": loan_terms.get('LLC_BI__AMOUNT__C'),
-            "CLOSE_DATE": loan_terms.get('LLC_BI__CLOSEDATE__C'),
-            "WARNINGS": warnings,
-            "ERRORS": errors,
-            "validation_passed": len(errors) == 0
-        }
+        result = _validation_result(loan_terms, warnings, errors)
+
+        logger.info('Validation complete: %d errors, %d warnings', len(errors), len(warnings))
 
-        logger.info(f'Validation complete: {len(errors)} errors, {len(warnings)} warnings')
+        body = _dumps(result, pretty)
+        _response_cache_put(cache_key, body)
 
         return func.HttpResponse(
-            json.dumps(result, indent=2, default=str),
+            body,
             mimetype="application/json",
-            status_code=200
+            status_code=200,
+            headers={"X-Cache": "MISS"}
         )
 
     except ValueError as e:
-        logger.error(f'ValueError: {str(e)}')
+        logger.error('ValueError: %s', e)
         return func.HttpResponse(
             json.dumps({"error": str(e)}),
             mimetype="application/json",
             status_code=404
         )
     except Exception as e:
-        logger.error(f'Unexpected error: {str(e)}', exc_info=True)
+        logger.error('Unexpected error: %s', e, exc_info=True)
         return func.HttpResponse(
             json.dumps({"error": f"Internal server error: {str(e)}"}),
             mimetype="application/json",
@@ -117,53 +338,68 @@ def validate_by_name(req: func.HttpRequest) -> func.HttpResponse:
 
     try:
         # Parse request body
-        req_body = req.get_json()
+        req_body = _json_body(req)
+        if req_body is None:
+            return func.HttpResponse(
+                _ERR_BAD_JSON,
+                mimetype="application/json",
+                status_code=400
+            )
         loan_name = req_body.get('loan_name')
-        exact_match = req_body.get('exact_match', True)
+        exact_match = bool(req_body.get('exact_match', True))
 
-        if not loan_name:
+        if not loan_name or not isinstance(loan_name, str):
             return func.HttpResponse(
-                json.dumps({"error": "loan_name is required in request body"}),
+                _ERR_LOAN_NAME_REQUIRED,
                 mimetype="application/json",
                 status_code=400
             )
 
+        # Contains-matching is case-insensitive, exact matching is not
+        pretty = _wants_pretty(req)
+        cache_key = ("name", loan_name if exact_match else loan_name.lower(), exact_match, pretty)
+        body = _response_cache_get(cache_key)
+        if body is not None:
+            logger.info('Serving cached validation for loan name: %s', loan_name)
+            return func.HttpResponse(
+                body,
+                mimetype="application/json",
+                status_code=200,
+                headers={"X-Cache": "HIT"}
+            )
+
         # Fetch loan
-        logger.info(f'Fetching loan by name: {loan_name} (exact_match={exact_match})')
-        loan_terms = fetcher.get_loan_terms_by_name(loan_name, exact_match=exact_match)
+        logger.info('Fetching loan by name: %s (exact_match=%s)', loan_name, exact_match)
+        loan_terms = _get_fetcher().get_loan_terms_by_name(loan_name, exact_match=exact_match)
 
         # Validate
-        logger.info(f'Validating loan: {loan_terms["NAME"]}')
+        logger.info('Validating loan: %s', loan_terms['NAME'])
         warnings, errors = validator.validate(loan_terms)
 
         # Build response
-        result = {
-            "LOAN_NAME": loan_terms['NAME'],
-            "LOAN_ID": loan_terms['ID'],
-            "LOAN_AMOUNT": loan_terms.get('LLC_BI__AMOUNT__C'),
-            "CLOSE_DATE": loan_terms.get('LLC_BI__CLOSEDATE__C'),
-            "WARNINGS": warnings,
-            "ERRORS": errors,
-            "validation_passed": len(errors) == 0
-        }
+        result = _validation_result(loan_terms, warnings, errors)
 
-        logger.info(f'Validation complete: {len(errors)} errors, {len(warnings)} warnings')
+        logger.info('Validation complete: %d errors, %d warnings', len(errors), len(warnings))
+
+        body = _dumps(result, pretty)
+        _response_cache_put(cache_key, body)
 
         return func.HttpResponse(
-            json.dumps(result, indent=2, default=str),
+            body,
             mimetype="application/json",
-            status_code=200
+            status_code=200,
+            headers={"X-Cache": "MISS"}
         )
 
     except ValueError as e:
-        logger.error(f'ValueError: {str(e)}')
+        logger.error('ValueError: %s', e)
         return func.HttpResponse(
             json.dumps({"error": str(e)}),
             mimetype="application/json",
             status_code=404
         )
     except Exception as e:
-        logger.error(f'Unexpected error: {str(e)}', exc_info=True)
+        logger.error('Unexpected error: %s', e, exc_info=True)
         return func.HttpResponse(
             json.dumps({"error": f"Internal server error: {str(e)}"}),
             mimetype="application/json",
@@ -188,37 +424,36 @@ def search_loans(req: func.HttpRequest) -> func.HttpResponse:
 
         if not prefix:
             return func.HttpResponse(
-                json.dumps({"error": "prefix query parameter is required"}),
+                _ERR_PREFIX_REQUIRED,
                 mimetype="application/json",
                 status_code=400
             )
 
         # Search loans
-        logger.info(f'Searching for loans with prefix: {prefix}')
-        loans = fetcher.search_loans(name_prefix=prefix)
+        logger.info('Searching for loans with prefix: %s', prefix)
+        prefix_lower = prefix.lower()
+        loans = [
+            {"NAME": name, "ID": loan_id}
+            for name, loan_id in _get_loan_index()
+            if name and name.lower().startswith(prefix_lower)
+        ]
 
         result = {
             "search_prefix": prefix,
             "count": len(loans),
-            "loans": [
-                {
-                    "NAME": loan['NAME'],
-                    "ID": loan['ID']
-                }
-                for loan in loans
-            ]
+            "loans": loans
         }
 
-        logger.info(f'Found {len(loans)} loans')
+        logger.info('Found %d loans', len(loans))
 
         return func.HttpResponse(
-            json.dumps(result, indent=2),
+            _dumps(result, _wants_pretty(req)),
             mimetype="application/json",
             status_code=200
         )
 
     except Exception as e:
-        logger.error(f'Unexpected error: {str(e)}', exc_info=True)
+        logger.error('Unexpected error: %s', e, exc_info=True)
         return func.HttpResponse(
             json.dumps({"error": f"Internal server error: {str(e)}"}),
             mimetype="application/json",
@@ -226,6 +461,34 @@ def search_loans(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 
+def _validate_batch_loan(loan_id: str, loan_terms, fetch_error=None) -> dict:
+    """Validate one loan of a batch request (errors are reported per loan)."""
+    try:
+        if fetch_error is not None:
+            raise RuntimeError(fetch_error)
+        if loan_terms is None:
+            raise ValueError(f"Loan {loan_id} not found in Salesforce.")
+
+        logger.info('Validating loan ID: %s', loan_id)
+        warnings, errors = validator.validate(loan_terms)
+
+        return {
+            "LOAN_NAME": loan_terms['NAME'],
+            "LOAN_ID": loan_terms['ID'],
+            "WARNINGS": warnings,
+            "ERRORS": errors,
+            "validation_passed": len(errors) == 0
+        }
+
+    except Exception as e:
+        logger.error('Error validating loan %s: %s', loan_id, e)
+        return {
+            "LOAN_ID": loan_id,
+            "error": str(e),
+            "validation_passed": False
+        }
+
+
 @app.route(route="validate/batch", methods=["POST"], auth_level=func.AuthLevel.FUNCTION)
 def validate_batch(req: func.HttpRequest) -> func.HttpResponse:
     """
@@ -239,57 +502,59 @@ def validate_batch(req: func.HttpRequest) -> func.HttpResponse:
 
     try:
         # Parse request body
-        req_body = req.get_json()
+        req_body = _json_body(req)
+        if req_body is None:
+            return func.HttpResponse(
+                _ERR_BAD_JSON,
+                mimetype="application/json",
+                status_code=400
+            )
         loan_ids = req_body.get('loan_ids', [])
 
         if not loan_ids or not isinstance(loan_ids, list):
             return func.HttpResponse(
-                json.dumps({"error": "loan_ids array is required in request body"}),
+                _ERR_LOAN_IDS_REQUIRED,
                 mimetype="application/json",
                 status_code=400
             )
 
-        results = []
-
-        for loan_id in loan_ids:
-            try:
-                logger.info(f'Validating loan ID: {loan_id}')
-
-                # Fetch and validate
-                loan_terms = fetcher.get_loan_terms_by_id(loan_id)
-                warnings, errors = validator.validate(loan_terms)
-
-                results.append({
-                    "LOAN_NAME": loan_terms['NAME'],
-                    "LOAN_ID": loan_terms['ID'],
-                    "WARNINGS": warnings,
-                    "ERRORS": errors,
-                    "validation_passed": len(errors) == 0
-                })
-
-            except Exception as e:
-                logger.error(f'Error validating loan {loan_id}: {str(e)}')
-                results.append({
-                    "LOAN_ID": loan_id,
-                    "error": str(e),
-                    "validation_passed": False
-                })
+        # Fetch every distinct loan with batched Salesforce queries, then
+        # validate in memory; repeated IDs reuse the first result
+        unique_ids = list(dict.fromkeys(loan_id for loan_id in loan_ids if isinstance(loan_id, str)))
+        fetch_error = None
+        try:
+            loan_terms_by_id = _get_fetcher().get_loan_terms_by_ids(unique_ids)
+        except Exception as e:
+            logger.error('Error fetching batch loans: %s', e)
+            loan_terms_by_id, fetch_error = {}, str(e)
+
+        results = [
+            _validate_batch_loan(loan_id, loan_terms_by_id.get(loan_id), fetch_error)
+            for loan_id in unique_ids
+        ]
+
+        results_by_id = dict(zip(unique_ids, results))
+        results = [
+            results_by_id[loan_id] if isinstance(loan_id, str)
+            else _validate_batch_loan(loan_id, None, fetch_error)
+            for loan_id in loan_ids
+        ]
 
         response = {
             "total_loans": len(loan_ids),
             "results": results
         }
 
-        logger.info(f'Batch validation complete: {len(results)} loans processed')
+        logger.info('Batch validation complete: %d loans processed', len(results))
 
         return func.HttpResponse(
-            json.dumps(response, indent=2, default=str),
+            _dumps(response, _wants_pretty(req)),
             mimetype="application/json",
             status_code=200
         )
 
     except Exception as e:
-        logger.error(f'Unexpected error: {str(e)}', exc_info=True)
+        logger.error('Unexpected error: %s', e, exc_info=True)
         return func.HttpResponse(
             json.dumps({"error": f"Internal server error: {str(e)}"}),
             mimetype="application/json",
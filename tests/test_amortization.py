@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Golden-output tests for main_logic.run_amortization_logic in core/reference code.
+
+The pipeline runs on loan_terms.json and on variants of it (exit fees, P&I
+payments, capitalized interest draws, IRR and MOIC targets). Its amortization
+tables, metrics, warnings and errors must match tests/data/amortization_golden.json,
+which was generated from the pipeline before the performance work. Values are
+compared type-strictly, so an int64 column that turns into floats fails, and
+floats to a relative tolerance of 1e-9.
+
+Run from the repository root:
+    python -m unittest discover tests
+
+Regenerate the golden file (only when an output change is intended):
+    python tests/test_amortization.py --update
+"""
+
+import contextlib
+import copy
+import io
+import json
+import math
+import os
+import sys
+import unittest
+import warnings
+
+import pandas as pd
+
+REFERENCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'reference code')
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'amortization_golden.json')
+
+sys.path.insert(0, REFERENCE_DIR)
+import main_logic  # noqa: E402
+
+
+def _base_loan_terms():
+    with open(os.path.join(REFERENCE_DIR, 'loan_terms.json')) as f:
+        return json.load(f)
+
+
+def _percentage_exit_fee(loan_terms):
+    loan_terms['FEE_DETAILS'].append({
+        'LLC_BI__FEE_TYPE__C': 'Exit Fee',
+        'LLC_BI__CALCULATION_TYPE__C': 'Percentage',
+        'LLC_BI__PERCENTAGE__C': 1.0,
+        'CM_EXIT_FEE_PAYABLE_UPON__C': 'Partial Prepayment (Including Amortization);Repayment in Full',
+        'CM_FEE_SHARE__C': 50.0,
+    })
+    return loan_terms
+
+
+def _flat_exit_fee(loan_terms):
+    loan_terms = _percentage_exit_fee(loan_terms)
+    loan_terms['FEE_DETAILS'][-1].update({
+        'LLC_BI__CALCULATION_TYPE__C': 'Flat Amount',
+        'LLC_BI__AMOUNT__C': 10000.0,
+        'CM_EXIT_FEE_PAYABLE_UPON__C': 'Partial Prepayment (Excluding Amortization)',
+    })
+    return loan_terms
+
+
+def _target_irr_only(loan_terms):
+    for pricing in loan_terms['PRICING_DETAILS']:
+        pricing['CM_MAXIMUM_EXIT_IRR__C'] = 0.20
+        pricing.pop('CM_MINIMUM_EXIT_MULTIPLE__C')
+    return loan_terms
+
+
+def _min_moic_only(loan_terms):
+    for pricing in loan_terms['PRICING_DETAILS']:
+        pricing['CM_MINIMUM_EXIT_MULTIPLE__C'] = 1.9
+        pricing.pop('CM_MAXIMUM_EXIT_IRR__C')
+    return loan_terms
+
+
+def _principal_and_interest(loan_terms):
+    loan_terms = _percentage_exit_fee(loan_terms)
+    loan_terms['LLC_BI__AMORTIZED_TERM_MONTHS__C'] = 360.0
+    for payment in loan_terms['PAYMENT_DETAILS']:
+        payment.update({
+            'LLC_BI__PAYMENT_TYPE__C': 'Principal & Interest',
+            'LLC_BI__TYPE__C': 'Principal & Interest',
+            'LLC_BI__FREQUENCY__C': 'Frequency_Monthly',
+            'CM_AMORTIZED_TERM_MONTHS__C': 360.0,
+        })
+    for pricing in loan_terms['PRICING_DETAILS']:
+        pricing.update({
+            'LLC_BI__INTEREST_RATE_TYPE__C': 'Floating with Index',
+            'LLC_BI__INDEX__C': 'SOFR',
+            'LLC_BI__SPREAD__C': 5.0,
+            'LLC_BI__RATE_FLOOR__C': 4.0,
+        })
+        pricing.pop('CM_MAXIMUM_EXIT_IRR__C')
+        pricing.pop('CM_MINIMUM_EXIT_MULTIPLE__C')
+    return loan_terms
+
+
+def _capitalized_interest_draws(loan_terms):
+    loan_terms = _percentage_exit_fee(loan_terms)
+    loan_terms['DRAW_DETAILS'] += [
+        {
+            'ID': 'D1',
+            'NAME': 'CIR',
+            'LLC_BI__FEE_TYPE__C': 'Capitalized Interest Reserve',
+            'LLC_BI__PAID_AT_CLOSING__C': 'Funded at Draw',
+            'LLC_BI__AMOUNT__C': 500000.0,
+            'CM_FEE_DATE__C': '2024-07-01',
+            'CM_END_DATE__C': '2024-07-01',
+            'CM_DRAW_DATE_DEADLINE__C': '2025-06-01',
+            'CM_DRAW_RESET_TYPE__C': 'Push to Deadline',
+            'CM_DRAW_FREQUENCY__C': 'Monthly',
+        },
+        {
+            'ID': 'D2',
+            'NAME': 'CONS',
+            'LLC_BI__FEE_TYPE__C': 'Construction',
+            'LLC_BI__PAID_AT_CLOSING__C': 'Funded at Draw',
+            'LLC_BI__AMOUNT__C': 1000000.0,
+            'CM_FEE_DATE__C': '2024-08-01',
+            'CM_END_DATE__C': '2024-12-01',
+            'CM_DRAW_RESET_TYPE__C': 'Skip',
+            'CM_DRAW_FREQUENCY__C': 'Monthly',
+        },
+    ]
+    loan_terms['FEE_DETAILS'] += [
+        {
+            'ID': 'F2',
+            'NAME': 'DF',
+            'LLC_BI__FEE_TYPE__C': 'Closing Fee',
+            'LLC_BI__PAID_AT_CLOSING__C': 'Funded at Draw',
+            'LLC_BI__AMOUNT__C': 20000.0,
+        },
+        {
+            'ID': 'F3',
+            'NAME': 'MF',
+            'LLC_BI__FEE_TYPE__C': 'Closing Fee',
+            'LLC_BI__PAID_AT_CLOSING__C': 'Funded at Modification',
+            'LLC_BI__AMOUNT__C': 5000.0,
+            'CM_FEE_DATE__C': '2025-01-01',
+        },
+    ]
+    return loan_terms
+
+
+# Variant name -> builder applied to a fresh copy of loan_terms.json (which has
+# both a target IRR and a minimum MOIC)
+VARIANTS = {
+    'base_irr_and_moic': lambda loan_terms: loan_terms,
+    'percentage_exit_fee': _percentage_exit_fee,
+    'flat_exit_fee': _flat_exit_fee,
+    'target_irr_only': _target_irr_only,
+    'min_moic_only': _min_moic_only,
+    'principal_and_interest': _principal_and_interest,
+    'capitalized_interest_draws': _capitalized_interest_draws,
+}
+
+
+def _plain(value):
+    """JSON-safe form of an output value; Timestamps are tagged so they stay distinct from strings."""
+    if isinstance(value, pd.Timestamp):
+        return {'$timestamp': value.isoformat()}
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _run(variant):
+    """Run one variant and return its comparable output (amortization rows stored column-major)."""
+    loan_terms = VARIANTS[variant](copy.deepcopy(_base_loan_terms()))
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        result = main_logic.run_amortization_logic(loan_terms=loan_terms)
+
+    tables = []
+    for table in result['AMORT_TABLES']:
+        rows = table['DATA']
+        columns = list(rows[0]) if rows else []
+        tables.append({
+            'METRICS': table['METRICS'],
+            'ROW_KEYS': [list(row) for row in rows if list(row) != columns],
+            'DATA': {column: [row.get(column) for row in rows] for column in columns},
+        })
+    return _plain({'WARNINGS': result['WARNINGS'], 'ERRORS': result['ERRORS'], 'AMORT_TABLES': tables})
+
+
+def _dump_golden(golden):
+    """Write the golden file with one amortization column per line."""
+    lines = ['{']
+    for i, (variant, output) in enumerate(golden.items()):
+        lines.append(f'  {json.dumps(variant)}: {{')
+        lines.append(f'    "WARNINGS": {json.dumps(output["WARNINGS"])},')
+        lines.append(f'    "ERRORS": {json.dumps(output["ERRORS"])},')
+        lines.append('    "AMORT_TABLES": [')
+        for j, table in enumerate(output['AMORT_TABLES']):
+            lines.append('      {')
+            lines.append(f'        "METRICS": {json.dumps(table["METRICS"])},')
+            lines.append(f'        "ROW_KEYS": {json.dumps(table["ROW_KEYS"])},')
+            lines.append('        "DATA": {')
+            columns = list(table['DATA'].items())
+            for k, (column, values) in enumerate(columns):
+                comma = ',' if k < len(columns) - 1 else ''
+                lines.append(f'          {json.dumps(column)}: {json.dumps(values, separators=(",", ":"))}{comma}')
+            lines.append('        }')
+            lines.append('      }' + (',' if j < len(output['AMORT_TABLES']) - 1 else ''))
+        lines.append('    ]')
+        lines.append('  }' + (',' if i < len(golden) - 1 else ''))
+    lines.append('}')
+    with open(GOLDEN_PATH, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+class AmortizationGoldenTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_PATH) as f:
+            cls.golden = json.load(f)
+
+    def assertMatchesGolden(self, actual, expected, path):
+        self.assertIs(type(actual), type(expected), f'{path}: {actual!r} != {expected!r}')
+        if isinstance(expected, dict):
+            self.assertEqual(list(actual), list(expected), path)
+            for key in expected:
+                self.assertMatchesGolden(actual[key], expected[key], f'{path}/{key}')
+        elif isinstance(expected, list):
+            self.assertEqual(len(actual), len(expected), path)
+            for i, (actual_item, expected_item) in enumerate(zip(actual, expected)):
+                self.assertMatchesGolden(actual_item, expected_item, f'{path}[{i}]')
+        elif isinstance(expected, float):
+            if math.isnan(expected):
+                self.assertTrue(math.isnan(actual), f'{path}: {actual!r} != nan')
+            else:
+                self.assertTrue(
+                    math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9),
+                    f'{path}: {actual!r} != {expected!r}',
+                )
+        else:
+            self.assertEqual(actual, expected, path)
+
+    def test_variants_match_golden_output(self):
+        self.assertEqual(list(self.golden), list(VARIANTS))
+        for variant in VARIANTS:
+            with self.subTest(variant=variant):
+                self.assertMatchesGolden(_run(variant), self.golden[variant], variant)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--update']:
+        _dump_golden({variant: _run(variant) for variant in VARIANTS})
+    else:
+        unittest.main()
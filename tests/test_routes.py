@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Route tests for functionapp.py, with the shared fetcher backed by the fake
+Salesforce client from test_salesforce_fetcher. Skipped when the
+azure-functions package is not installed.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+try:
+    import azure.functions as func
+except ImportError:
+    func = None
+
+from test_salesforce_fetcher import LOAN_A, LOAN_B, FakeSalesforce, _fetcher, _loan_record
+
+if func is not None:
+    try:
+        import core.config  # noqa: F401
+    except ImportError:
+        # core/config.py holds deployment credentials and is not checked in;
+        # the fake client below never uses them
+        sys.modules["core.config"] = types.SimpleNamespace(SALESFORCE_CREDENTIALS={})
+    import functionapp
+
+
+def _call(route, method="GET", params=None, route_params=None, body=b""):
+    request = func.HttpRequest(
+        method=method,
+        url="/api/test",
+        params=params or {},
+        route_params=route_params or {},
+        body=body,
+    )
+    return route.build().get_user_function()(request)
+
+
+@unittest.skipIf(func is None, "azure-functions is not installed")
+class RoutesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A"), _loan_record(LOAN_B, "Loan B")])
+        functionapp._fetcher = _fetcher(self.sf)
+        functionapp._redis_client = False
+        functionapp._response_cache.clear()
+
+    def test_validate_by_id(self):
+        response = _call(functionapp.validate_by_id, route_params={"loan_id": LOAN_A})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        body = response.get_body().decode()
+        self.assertNotIn("\n", body)
+        self.assertEqual(json.loads(body)["LOAN_NAME"], "Loan A")
+
+        response = _call(functionapp.validate_by_id, route_params={"loan_id": LOAN_A})
+
+        self.assertEqual(response.headers["X-Cache"], "HIT")
+        self.assertEqual(response.get_body().decode(), body)
+        self.assertEqual(len(self.sf.loan_queries), 1)
+
+    def test_validate_by_id_pretty(self):
+        response = _call(
+            functionapp.validate_by_id, params={"pretty": "1"}, route_params={"loan_id": LOAN_A}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('\n  "LOAN_NAME"', response.get_body().decode())
+
+    def test_validate_by_id_malformed_id_is_404(self):
+        response = _call(functionapp.validate_by_id, route_params={"loan_id": "garbage"})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("not found", json.loads(response.get_body())["error"])
+        self.assertEqual(self.sf.loan_queries, [])
+
+    def test_validate_by_id_unknown_id_is_404(self):
+        functionapp._fetcher = _fetcher(FakeSalesforce([]))
+
+        response = _call(functionapp.validate_by_id, route_params={"loan_id": LOAN_A})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_redis_url_disables_redis(self):
+        def from_url(url, **kwargs):
+            raise ValueError("Redis URL must specify one of the following schemes")
+
+        fake_redis = types.SimpleNamespace(
+            Redis=lambda **kwargs: None,
+            ConnectionPool=types.SimpleNamespace(from_url=from_url),
+        )
+        functionapp._redis_client = None
+        with mock.patch.dict(sys.modules, {"redis": fake_redis}), \
+                mock.patch.dict(os.environ, {"REDIS_URL": "localhost:6379"}):
+            response = _call(functionapp.validate_by_id, route_params={"loan_id": LOAN_A})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(functionapp._redis_client, False)
+
+    def test_validate_by_name_rejects_bad_bodies(self):
+        for body in (
+            b"{not json",
+            b"[1, 2]",
+            b"{}",
+            json.dumps({"loan_name": 42, "exact_match": False}).encode(),
+        ):
+            with self.subTest(body=body):
+                response = _call(functionapp.validate_by_name, method="POST", body=body)
+                self.assertEqual(response.status_code, 400)
+
+    def test_search_requires_prefix(self):
+        response = _call(functionapp.search_loans)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_validate_batch_rejects_bad_bodies(self):
+        for body in (b"{not json", b"{}", json.dumps({"loan_ids": "x"}).encode()):
+            with self.subTest(body=body):
+                response = _call(functionapp.validate_batch, method="POST", body=body)
+                self.assertEqual(response.status_code, 400)
+
+    def test_validate_batch_duplicate_and_malformed_ids(self):
+        loan_ids = [LOAN_A, "garbage", LOAN_A, {"id": 1}, LOAN_B]
+
+        response = _call(
+            functionapp.validate_batch, method="POST", body=json.dumps({"loan_ids": loan_ids}).encode()
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.get_body())
+        self.assertEqual(body["total_loans"], 5)
+        self.assertEqual(
+            [result.get("LOAN_NAME") for result in body["results"]],
+            ["Loan A", None, "Loan A", None, "Loan B"],
+        )
+        self.assertIn("not found", body["results"][1]["error"])
+        self.assertIn("not found", body["results"][3]["error"])
+        self.assertEqual(self.sf.loan_queries, [[LOAN_A, LOAN_B]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""
+Unit tests for SalesforceFetcher's batched loan fetch, run against a fake
+Salesforce client (no network or credentials needed).
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import re
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from simple_salesforce.exceptions import SalesforceGeneralError
+
+from core.salesforce_fetcher import SalesforceFetcher
+
+
+LOAN_A = "a0ial00000364X3AAI"
+LOAN_B = "a0iVy00000ETkIkIAL"
+
+
+def _loan_record(loan_id, name):
+    return {
+        "attributes": {"type": "LLC_BI__Loan__c"},
+        "Id": loan_id,
+        "Name": name,
+        "LLC_BI__Amount__c": 1000000.0,
+        "LLC_BI__CloseDate__c": "2024-01-01",
+        "LLC_BI__ParentLoan__c": None,
+        "LLC_BI__ParentLoan__r": None,
+    }
+
+
+class FakeSalesforce:
+    """Answers composite/batch queries from in-memory loan and fee records."""
+
+    sf_version = "59.0"
+
+    def __init__(self, loans, fees=None, failing_objects=()):
+        self.loans = {loan["Id"]: loan for loan in loans}
+        self.fees = fees or []
+        self.failing_objects = set(failing_objects)
+        # Loan IDs placed in each loan query, one list per composite request
+        self.loan_queries = []
+
+    def restful(self, path, method="GET", json=None, timeout=None):
+        assert path == "composite/batch" and method == "POST"
+        assert timeout is not None, "Salesforce calls must set a timeout"
+        results = []
+        for request in json["batchRequests"]:
+            soql = parse_qs(urlsplit(request["url"]).query)["q"][0]
+            object_name = re.search(r"FROM (\w+)", soql).group(1)
+            ids = re.findall(r"'([^']*)'", soql)
+            if object_name in self.failing_objects:
+                results.append({"statusCode": 400, "result": [{"errorCode": "MALFORMED_QUERY"}]})
+                continue
+            if object_name == "LLC_BI__Loan__c":
+                self.loan_queries.append(ids)
+                records = [
+                    loan for loan_id, loan in self.loans.items()
+                    if loan_id in ids or loan_id[:15] in ids
+                ]
+            elif object_name == "LLC_BI__Fee__c":
+                records = [fee for fee in self.fees if fee["LLC_BI__Loan__c"] in ids]
+            else:
+                records = []
+            results.append({"statusCode": 200, "result": {"done": True, "records": records}})
+        return {"hasErrors": False, "results": results}
+
+
+class FakeTokenSession(requests.Session):
+    """Answers OAuth token posts, timing out the first `timeouts` of them."""
+
+    def __init__(self, timeouts=0):
+        super().__init__()
+        self.timeouts = timeouts
+        # Keyword arguments of each post
+        self.posts = []
+
+    def post(self, url, **kwargs):
+        self.posts.append(kwargs)
+        if len(self.posts) <= self.timeouts:
+            raise requests.Timeout("read timed out")
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"access_token": "token", "instance_url": "https://example.invalid"}'
+        return response
+
+
+def _fetcher(sf):
+    fetcher = SalesforceFetcher("client_id", "client_secret", "https://example.invalid/token")
+    fetcher._connect = lambda: sf
+    return fetcher
+
+
+class GetLoanTermsByIdsTest(unittest.TestCase):
+
+    def test_skips_malformed_and_duplicate_ids(self):
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A"), _loan_record(LOAN_B, "Loan B")])
+        fetcher = _fetcher(sf)
+
+        results = fetcher.get_loan_terms_by_ids(
+            [LOAN_A, LOAN_A, "garbage", "x' OR Name != '", None, LOAN_B]
+        )
+
+        self.assertEqual(set(results), {LOAN_A, LOAN_B})
+        self.assertEqual(sf.loan_queries, [[LOAN_A, LOAN_B]])
+        self.assertEqual(results[LOAN_A]["NAME"], "Loan A")
+
+    def test_builds_loan_terms(self):
+        fee = {
+            "Id": "a0Fal00000000AAAAA",
+            "Name": "Origination",
+            "LLC_BI__Loan__c": LOAN_A,
+            "LLC_BI__Fee_Type__c": "Closing Fee",
+            "LLC_BI__Amount__c": 5000.0,
+        }
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A")], fees=[fee])
+
+        loan_terms = _fetcher(sf).get_loan_terms_by_ids([LOAN_A])[LOAN_A]
+
+        self.assertEqual(loan_terms["A_B_AMOUNT_FACTOR"], 1)
+        self.assertEqual([f["NAME"] for f in loan_terms["FEE_DETAILS"]], ["Origination"])
+        self.assertEqual(loan_terms["PRICING_DETAILS"], [])
+        # Only the synthetic "Funded At Closing" draw
+        self.assertEqual(len(loan_terms["DRAW_DETAILS"]), 1)
+        self.assertEqual(loan_terms["DRAW_DETAILS"][0]["CM_FEE_DATE__C"], "2024-01-01")
+
+    def test_missing_loans_are_left_out(self):
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A")])
+
+        results = _fetcher(sf).get_loan_terms_by_ids([LOAN_A, LOAN_B])
+
+        self.assertEqual(set(results), {LOAN_A})
+
+    def test_matches_15_character_ids(self):
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A")])
+
+        results = _fetcher(sf).get_loan_terms_by_ids([LOAN_A[:15]])
+
+        self.assertEqual(results[LOAN_A[:15]]["ID"], LOAN_A)
+
+    def test_chunks_in_clause(self):
+        loan_ids = [f"a0i{n:015d}" for n in range(450)]
+        sf = FakeSalesforce([_loan_record(loan_id, f"Loan {loan_id}") for loan_id in loan_ids])
+
+        results = _fetcher(sf).get_loan_terms_by_ids(loan_ids)
+
+        self.assertEqual(len(results), 450)
+        self.assertEqual([len(ids) for ids in sf.loan_queries], [200, 200, 50])
+
+    def test_reuses_cached_loans(self):
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A"), _loan_record(LOAN_B, "Loan B")])
+        fetcher = _fetcher(sf)
+
+        fetcher.get_loan_terms_by_ids([LOAN_A])
+        results = fetcher.get_loan_terms_by_ids([LOAN_A, LOAN_B])
+
+        self.assertEqual(set(results), {LOAN_A, LOAN_B})
+        self.assertEqual(sf.loan_queries, [[LOAN_A], [LOAN_B]])
+
+    def test_failed_subrequest_raises(self):
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A")], failing_objects={"LLC_BI__Fee__c"})
+
+        with self.assertRaises(SalesforceGeneralError):
+            _fetcher(sf).get_loan_terms_by_ids([LOAN_A])
+
+
+class CreateConnectionTest(unittest.TestCase):
+
+    def test_token_request_times_out_and_retries(self):
+        fetcher = SalesforceFetcher("client_id", "client_secret", "https://example.invalid/token")
+        fetcher._session = FakeTokenSession(timeouts=1)
+
+        with mock.patch("core.salesforce_fetcher.time.sleep"):
+            sf = fetcher._create_connection()
+
+        self.assertEqual(sf.session_id, "token")
+        self.assertEqual(len(fetcher._session.posts), 2)
+        self.assertTrue(all(post.get("timeout") for post in fetcher._session.posts))
+
+    def test_token_request_gives_up_after_retries(self):
+        fetcher = SalesforceFetcher("client_id", "client_secret", "https://example.invalid/token")
+        fetcher._session = FakeTokenSession(timeouts=3)
+
+        with mock.patch("core.salesforce_fetcher.time.sleep"), self.assertRaises(requests.Timeout):
+            fetcher._create_connection()
+
+
+class GetLoanTermsByIdTest(unittest.TestCase):
+
+    def test_malformed_id_is_not_found(self):
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A")])
+
+        with self.assertRaisesRegex(ValueError, "not found"):
+            _fetcher(sf).get_loan_terms_by_id("garbage")
+        self.assertEqual(sf.loan_queries, [])
+
+    def test_unknown_id_is_not_found(self):
+        sf = FakeSalesforce([])
+
+        with self.assertRaisesRegex(ValueError, "not found"):
+            _fetcher(sf).get_loan_terms_by_id(LOAN_A)
+
+    def test_returns_copies_of_cached_loans(self):
+        sf = FakeSalesforce([_loan_record(LOAN_A, "Loan A")])
+        fetcher = _fetcher(sf)
+
+        fetcher.get_loan_terms_by_id(LOAN_A)["NAME"] = "changed"
+
+        self.assertEqual(fetcher.get_loan_terms_by_id(LOAN_A)["NAME"], "Loan A")
+        self.assertEqual(len(sf.loan_queries), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Unit tests for the exit fee helpers in core/reference code/step6.py.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'reference code'))
+from step6 import calculate_exit_fee, canonicalize_exit_fee
+
+
+class CanonicalizeExitFeeTest(unittest.TestCase):
+
+    def test_percentage_fee_defaults(self):
+        fee = canonicalize_exit_fee({
+            'LLC_BI__CALCULATION_TYPE__C': 'Percentage',
+            'LLC_BI__PERCENTAGE__C': 1.0,
+        })
+
+        self.assertEqual(fee.share, 1.0)
+        self.assertFalse(fee.reduction_met)
+        self.assertTrue(fee.is_percentage)
+        self.assertEqual(fee.perc, 0.01)
+        self.assertIsNone(fee.amt)
+        self.assertIsNone(fee.reduced_perc)
+
+    def test_flat_fee_with_share(self):
+        fee = canonicalize_exit_fee({
+            'LLC_BI__CALCULATION_TYPE__C': 'Flat Amount',
+            'LLC_BI__AMOUNT__C': 10000.0,
+            'CM_FEE_SHARE__C': 50.0,
+        })
+
+        self.assertEqual(fee.share, 0.5)
+        self.assertFalse(fee.is_percentage)
+        self.assertIsNone(fee.perc)
+        self.assertEqual(fee.amt, 10000.0)
+
+    def test_reduction_needs_both_flags(self):
+        record = {
+            'LLC_BI__CALCULATION_TYPE__C': 'Percentage',
+            'LLC_BI__PERCENTAGE__C': 2.0,
+            'CM_CONDITIONAL_EXIT_FEE_REDUCTION__C': True,
+            'CM_CONDITIONAL_EXIT_FEE_PERCENTAGE__C': 1.0,
+        }
+        self.assertFalse(canonicalize_exit_fee(record).reduction_met)
+
+        record['CM_EXIT_FEE_REDUCTION_CONDITION_MET__C'] = True
+        fee = canonicalize_exit_fee(record)
+        self.assertTrue(fee.reduction_met)
+        self.assertEqual(fee.reduced_perc, 0.01)
+
+
+class CalculateExitFeeTest(unittest.TestCase):
+
+    def test_percentage_of_principal(self):
+        fee = canonicalize_exit_fee({
+            'LLC_BI__CALCULATION_TYPE__C': 'Percentage',
+            'LLC_BI__PERCENTAGE__C': 1.0,
+            'CM_FEE_SHARE__C': 50.0,
+        })
+
+        fees = calculate_exit_fee(fee, np.array([100000.0, 200000.0]), 1000000.0)
+
+        np.testing.assert_allclose(fees, [500.0, 1000.0])
+
+    def test_flat_amount_prorated_by_principal(self):
+        fee = canonicalize_exit_fee({
+            'LLC_BI__CALCULATION_TYPE__C': 'Flat Amount',
+            'LLC_BI__AMOUNT__C': 10000.0,
+        })
+
+        self.assertAlmostEqual(calculate_exit_fee(fee, 250000.0, 1000000.0), 2500.0)
+
+    def test_reduced_amount(self):
+        fee = canonicalize_exit_fee({
+            'LLC_BI__CALCULATION_TYPE__C': 'Percentage',
+            'LLC_BI__PERCENTAGE__C': 2.0,
+            'CM_CONDITIONAL_EXIT_FEE_REDUCTION__C': True,
+            'CM_EXIT_FEE_REDUCTION_CONDITION_MET__C': True,
+            'CM_CONDITIONAL_EXIT_FEE_AMOUNT__C': 3000.0,
+        })
+
+        self.assertEqual(calculate_exit_fee(fee, 250000.0, 1000000.0), 3000.0)
+
+    def test_reduction_without_percentage_or_amount_raises(self):
+        fee = canonicalize_exit_fee({
+            'LLC_BI__CALCULATION_TYPE__C': 'Percentage',
+            'LLC_BI__PERCENTAGE__C': 2.0,
+            'CM_CONDITIONAL_EXIT_FEE_REDUCTION__C': True,
+            'CM_EXIT_FEE_REDUCTION_CONDITION_MET__C': True,
+        })
+
+        with self.assertRaises(ValueError):
+            calculate_exit_fee(fee, 250000.0, 1000000.0)
+
+
+if __name__ == "__main__":
+    unittest.main()